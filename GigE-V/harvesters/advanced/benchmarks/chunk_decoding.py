@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Compares parse_chunk_selector + get_transformation_matrix_from_chunk with the
+TransformationMatrixDecoder and the calibration decoders on synthetic selector chunks.
+
+Both still write the selector and read the value node once per entry, the decoders save the node
+lookups, the symbolics evaluation and the dict to matrix conversion per frame. The synthetic
+nodes are plain Python attributes, so on a device the node accesses themselves weigh more.
+
+Run from the `advanced` folder:
+    python -m benchmarks.chunk_decoding
+"""
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from photoneo_genicam.chunks import (CALIBRATION_CHUNKS, TRANSFORMATION_MATRIX_ORDER,
+                                     TransformationMatrixDecoder, calibration_decoders,
+                                     get_transformation_matrix_from_chunk, parse_chunk_selector)
+
+from .common import SyntheticChunkNodeMap, time_per_frame_ms
+
+TRANSFORMATION_CHUNK = "CurrentCameraToCoordinateSpaceTransformation"
+CALIBRATION_SIZES = {
+    "CameraMatrix": 9,
+    "DistortionCoefficients": 14,
+    "SensorAxis": 3,
+    "SensorPosition": 3,
+}
+
+
+def synthetic_chunks() -> SyntheticChunkNodeMap:
+    rng = np.random.default_rng(0)
+    chunks = {TRANSFORMATION_CHUNK: dict(zip(TRANSFORMATION_MATRIX_ORDER, rng.random(12)))}
+    for chunk in CALIBRATION_CHUNKS:
+        values = rng.random(CALIBRATION_SIZES[chunk])
+        chunks[f"MainCamera{chunk}"] = {f"Value{i}": value for i, value in enumerate(values)}
+    return SyntheticChunkNodeMap(chunks)
+
+
+class CountingNodeMap:
+    """Counts the node lookups, symbolics evaluations and node value accesses per frame."""
+
+    def __init__(self, features: SyntheticChunkNodeMap):
+        self.features = features
+        self.counts = dict.fromkeys(("get_node", "symbolics", "selector writes", "value reads"), 0)
+
+    def get_node(self, name: str):
+        self.counts["get_node"] += 1
+        node = self.features.get_node(name)
+        counts: Dict[str, int] = self.counts
+
+        class CountingNode:
+            @property
+            def symbolics(self):
+                counts["symbolics"] += 1
+                return node.symbolics
+
+            @property
+            def value(self):
+                counts["value reads"] += 1
+                return node.value
+
+            @value.setter
+            def value(self, value):
+                counts["selector writes"] += 1
+                node.value = value
+
+        return CountingNode()
+
+
+def accesses_per_frame(decode: Callable[[], object], counts: Dict[str, int]) -> str:
+    decode()
+    counts.update(dict.fromkeys(counts, 0))
+    decode()
+    return ", ".join(f"{name}: {count}" for name, count in counts.items())
+
+
+def report_us(name: str, make_decode: Callable[[object], Callable[[], object]]):
+    """Times the decoding on the synthetic nodes and counts its node accesses on wrapped ones."""
+    samples = time_per_frame_ms(make_decode(synthetic_chunks()), frames=2000) * 1e3
+    print(f"  {name:<32} mean: {samples.mean():7.1f} us   min: {samples.min():7.1f} us")
+    counting = CountingNodeMap(synthetic_chunks())
+    print(f"  {'':<32} {accesses_per_frame(make_decode(counting), counting.counts)}")
+
+
+def parse_transformation(features) -> Callable[[], np.ndarray]:
+    def parse():
+        chunk: dict = parse_chunk_selector(features, TRANSFORMATION_CHUNK)
+        return get_transformation_matrix_from_chunk(chunk)
+
+    return parse
+
+
+def parse_calibration(features) -> Callable[[], List[np.ndarray]]:
+    # Converted to arrays like the decoders return them
+    names = [f"MainCamera{chunk}" for chunk in CALIBRATION_CHUNKS]
+    return lambda: [
+        np.array(list(parse_chunk_selector(features, name).values())) for name in names
+    ]
+
+
+def decode_calibration(features) -> Callable[[], List[np.ndarray]]:
+    decoders = calibration_decoders(features)
+    return lambda: [decoder.decode() for decoder in decoders.values()]
+
+
+def main():
+    print("Transformation matrix")
+    report_us("parse_chunk_selector", parse_transformation)
+    report_us(
+        "TransformationMatrixDecoder",
+        lambda features: TransformationMatrixDecoder(features, TRANSFORMATION_CHUNK).decode,
+    )
+    print("Calibration chunks")
+    report_us("parse_chunk_selector", parse_calibration)
+    report_us("calibration_decoders", decode_calibration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import multiprocessing
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+import numpy as np
+
+# Full resolution of the MotionCam-3D depth sensor
+MOTIONCAM_WIDTH = 2064
+MOTIONCAM_HEIGHT = 1544
+
+
+@dataclass
+class SyntheticComponent:
+    """Stand-in for harvesters Component2DImage with the attributes used by the processing code."""
+
+    data: np.ndarray
+    width: int
+    height: int
+    data_format: str
+    num_components_per_pixel: int = 1
+
+
+def synthetic_range(
+    width: int = MOTIONCAM_WIDTH, height: int = MOTIONCAM_HEIGHT, invalid_ratio=0.3, seed=0
+) -> SyntheticComponent:
+    """Random Coord3D_ABC32f frame with invalid (0, 0, 0) points, laid out like Range data."""
+    rng = np.random.default_rng(seed)
+    num_points = width * height
+    points = rng.uniform(-500.0, 500.0, (num_points, 3)).astype(np.float32)
+    points[:, 2] = rng.uniform(300.0, 1500.0, num_points)
+    points[rng.random(num_points) < invalid_ratio] = 0.0
+    return SyntheticComponent(points.reshape(-1), width, height, "Coord3D_ABC32f", 3)
+
+
+def time_per_frame_ms(func: Callable[[], object], frames=20, warmup=2) -> np.ndarray:
+    for _ in range(warmup):
+        func()
+    samples = np.empty(frames)
+    for i in range(frames):
+        start = time.perf_counter_ns()
+        func()
+        samples[i] = (time.perf_counter_ns() - start) / 1e6
+    return samples
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process, NaN where the resource module is missing."""
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+
+
+def run_isolated(func: Callable, *args):
+    """Runs func in a fresh process, so each benchmark case gets its own peak RSS."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def report(name: str, samples: np.ndarray, rss_mb: float = None):
+    line = (
+        f"{name:<40} mean: {samples.mean():8.2f} ms   "
+        f"min: {samples.min():8.2f} ms   max: {samples.max():8.2f} ms"
+    )
+    if rss_mb is not None:
+        line += f"   peak RSS +{rss_mb:.1f} MB"
+    print(line)
+
+
+class SyntheticSelector:
+    def __init__(self, symbolics: List[str]):
+        self.symbolics: List[str] = symbolics
+        self.value: str = symbolics[0]
+
+
+class SyntheticSelectorValue:
+    def __init__(self, selector: SyntheticSelector, entries: Dict[str, float]):
+        self._selector = selector
+        self._entries = entries
+
+    @property
+    def value(self) -> float:
+        return self._entries[self._selector.value]
+
+
+class SyntheticChunkNodeMap:
+    """Stand-in for the NodeMap of a buffer with selector chunks (Chunk<Name>Selector / Value)."""
+
+    def __init__(self, chunks: Dict[str, Dict[str, float]]):
+        self._nodes: Dict[str, object] = {}
+        for name, entries in chunks.items():
+            selector = SyntheticSelector(list(entries))
+            self._nodes[f"Chunk{name}Selector"] = selector
+            self._nodes[f"Chunk{name}Value"] = SyntheticSelectorValue(selector, entries)
+
+    def get_node(self, name: str):
+        return self._nodes[name]
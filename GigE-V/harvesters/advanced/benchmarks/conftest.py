@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Ensure the project's root directory is in PYTHONPATH
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+# The example scripts import the GenTL producer path on import, the benchmarks don't need a device
+os.environ.setdefault("GENICAM_GENTL64_PATH", "")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Compares the downsampling of photoneo_genicam.pointcloud on the Range buffer with building an
+Open3D point cloud and calling voxel_down_sample, on a synthetic organised frame.
+
+Run from the `advanced` folder:
+    python -m benchmarks.downsampling [voxel size in mm]
+"""
+import sys
+
+import numpy as np
+import open3d as o3d
+
+from photoneo_genicam.pointcloud import (block_median_downsample, create_3d_vector,
+                                         stride_downsample, voxel_downsample)
+
+from .common import report, synthetic_range, time_per_frame_ms
+
+
+def open3d_voxel_down_sample(points: np.ndarray, voxel_size: float) -> np.ndarray:
+    point_cloud = o3d.geometry.PointCloud(create_3d_vector(points))
+    valid = point_cloud.select_by_index(np.flatnonzero(points.reshape(-1, 3)[:, 2]))
+    return np.asarray(valid.voxel_down_sample(voxel_size).points)
+
+
+def main(voxel_size: float = 10.0):
+    frame = synthetic_range()
+    points, width, height = frame.data, frame.width, frame.height
+    print(f"Range frame: {width}x{height}, voxel size: {voxel_size} mm")
+
+    cases = {
+        "Open3D PointCloud + voxel_down_sample": lambda: open3d_voxel_down_sample(
+            points, voxel_size
+        ),
+        "voxel_downsample": lambda: voxel_downsample(points, voxel_size),
+        "block_median_downsample (4x4)": lambda: block_median_downsample(points, width, height, 4),
+        "stride_downsample (4)": lambda: stride_downsample(points, width, height, 4),
+    }
+    reference = None
+    for name, func in cases.items():
+        num_points: int = len(func())
+        samples = time_per_frame_ms(func, frames=5, warmup=1)
+        report(f"{name} ({num_points} pts)", samples)
+        if reference is None:
+            reference = samples
+        else:
+            print(f"{'':<40} speedup: {reference.mean() / samples.mean():.1f}x")
+
+
+if __name__ == "__main__":
+    main(*map(float, sys.argv[1:2]))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Throughput of the ProcessingPipeline reconstructing ProjectedC frames when scaling the number of
+worker processes from 1 to the number of cores, compared with processing in the acquisition process.
+
+Run from the `advanced` folder:
+    python -m benchmarks.pipeline_scaling [frames]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from photoneo_genicam.pipeline import ProcessingPipeline, projected_c_task
+from photoneo_genicam.pointcloud import ProjectedCReconstructor
+
+from .common import MOTIONCAM_HEIGHT, MOTIONCAM_WIDTH
+
+
+def main(num_frames: int = 100):
+    num_points = MOTIONCAM_WIDTH * MOTIONCAM_HEIGHT
+    rng = np.random.default_rng(0)
+    coordinate_map = rng.uniform(-1.0, 1.0, (num_points, 3)).astype(np.float32)
+    depth_map = rng.uniform(300.0, 1500.0, num_points).astype(np.float32)
+
+    reconstructor = ProjectedCReconstructor(coordinate_map)
+    start = time.perf_counter()
+    for _ in range(num_frames):
+        reconstructor.reconstruct(depth_map)
+    print(f"{'in-process':<20} {num_frames / (time.perf_counter() - start):8.1f} FPS")
+
+    for num_workers in range(1, os.cpu_count() + 1):
+        with ProcessingPipeline(
+            projected_c_task,
+            input_layouts=[(depth_map.shape, np.float32)],
+            output_layouts=[(coordinate_map.shape, np.float32)],
+            task_args=(coordinate_map,),
+            num_workers=num_workers,
+        ) as pipeline:
+            for _ in pipeline.process([depth_map] for _ in range(num_frames)):
+                pass
+            print(f"{f'{num_workers} worker(s)':<20} {pipeline.throughput():8.1f} FPS")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Compares the float64 Open3D path (create_3d_vector) with the float32 tensor path
+(create_tensor_point_cloud) from a Range buffer to a saved PLY file.
+
+Run from the `advanced` folder:
+    python -m benchmarks.pointcloud_float32 [frames]
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import open3d as o3d
+
+from photoneo_genicam.pointcloud import create_3d_vector, create_tensor_point_cloud
+
+from .common import peak_rss_mb, report, run_isolated, synthetic_range, time_per_frame_ms
+
+
+def float64_path(data, filename: str):
+    point_cloud = o3d.geometry.PointCloud(create_3d_vector(data))
+    o3d.io.write_point_cloud(filename, point_cloud)
+
+
+def float32_path(data, filename: str):
+    o3d.t.io.write_point_cloud(filename, create_tensor_point_cloud(data))
+
+
+PATHS = {
+    "float64 (create_3d_vector)": float64_path,
+    "float32 (create_tensor_point_cloud)": float32_path,
+}
+
+
+def run_case(name: str, frames: int):
+    data = synthetic_range().data
+    rss_before = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = str(Path(tmp_dir) / "pointcloud.ply")
+        samples = time_per_frame_ms(lambda: PATHS[name](data, filename), frames=frames)
+    return samples, peak_rss_mb() - rss_before
+
+
+def main(frames: int = 10):
+    for name in PATHS:
+        samples, rss_mb = run_isolated(run_case, name, frames)
+        report(name, samples, rss_mb)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
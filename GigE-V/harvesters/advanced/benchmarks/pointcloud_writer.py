@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Compares saving a frame (Range, Normal, Intensity) through an Open3D PointCloud and
+o3d.io.write_point_cloud with the streaming write_ply / write_pcd writers.
+
+Run from the `advanced` folder:
+    python -m benchmarks.pointcloud_writer
+"""
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import open3d as o3d
+
+from photoneo_genicam.pointcloud import create_3d_vector, map_texture
+from photoneo_genicam.pointcloud_writer import write_pcd, write_ply
+
+from .common import SyntheticComponent, report, synthetic_range, time_per_frame_ms
+
+
+def open3d_write(filename: str, points, normals, intensity):
+    point_cloud = o3d.geometry.PointCloud(create_3d_vector(points.data))
+    point_cloud.normals = create_3d_vector(normals.data)
+    point_cloud.colors = map_texture(intensity)
+    o3d.io.write_point_cloud(filename, point_cloud)
+
+
+def main():
+    points = synthetic_range()
+    normals = synthetic_range(seed=1)
+    rng = np.random.default_rng(0)
+    intensity_data = rng.integers(0, 1 << 10, points.width * points.height, dtype=np.uint16)
+    intensity = SyntheticComponent(intensity_data, points.width, points.height, "Mono10")
+    size_mb = (points.data.nbytes + normals.data.nbytes + intensity_data.nbytes) / 1024**2
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ply, pcd = str(Path(tmp_dir) / "cloud.ply"), str(Path(tmp_dir) / "cloud.pcd")
+        cases = {
+            "o3d.io.write_point_cloud": lambda: open3d_write(ply, points, normals, intensity),
+            "write_ply": lambda: write_ply(ply, points.data, normals.data, intensity.data),
+            "write_ply (skip_invalid)": lambda: write_ply(
+                ply, points.data, normals.data, intensity.data, skip_invalid=True
+            ),
+            "write_pcd": lambda: write_pcd(pcd, points.data, normals.data, intensity.data),
+        }
+        for name, func in cases.items():
+            samples = time_per_frame_ms(func, frames=5, warmup=1)
+            report(name, samples)
+            print(f"{'':<40} {size_mb / samples.mean() * 1000:.0f} MB/s of component data")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Profiles the point cloud processing on a recording made with record_frames.py, i.e. on real
+frames but without a device: ValidPoints, create_tensor_point_cloud and texture_colors.
+
+Run from the `advanced` folder:
+    python -m benchmarks.replay_processing <recording dir>
+"""
+import sys
+from typing import Dict
+
+import numpy as np
+
+from photoneo_genicam.grabber import FrameComponent
+from photoneo_genicam.pointcloud import ValidPoints, create_tensor_point_cloud, texture_colors
+from photoneo_genicam.replay import ReplayAcquirer
+
+from .common import report, time_per_frame_ms
+
+
+def main(recording: str):
+    ia = ReplayAcquirer(recording, loop=True)
+    print(f"Recording: {recording}, {len(ia)} frames of {', '.join(ia.component_names)}")
+    if "Range" not in ia.component_names:
+        print("The recording has no Range component")
+        sys.exit(1)
+
+    ia.start()
+
+    def process():
+        with ia.fetch() as buffer:
+            frame: Dict[str, FrameComponent] = dict(
+                zip(ia.component_names, buffer.payload.components)
+            )
+            valid_points = ValidPoints.from_frame(frame["Range"].data)
+            points: np.ndarray = valid_points.compact(frame["Range"].data)
+            colors = None
+            if "Intensity" in frame:
+                colors = texture_colors(frame["Intensity"], valid_points=valid_points)
+            create_tensor_point_cloud(points, colors=colors)
+
+    report("replayed frame to compacted point cloud", time_per_frame_ms(process, frames=len(ia)))
+    print(f"replay rate: {ia.statistics.fps:.1f} FPS")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Error: no recording given, record one with record_frames.py first")
+        sys.exit(1)
+    main(sys.argv[1])
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Sustained archiving rate of ComponentSaver for a Range + Intensity frame at the MotionCam-3D
+resolution, vs. the serial cv2.imwrite + raw write done inside the fetch context, for several
+writer counts, PNG compression levels and raw formats.
+
+Run from the `advanced` folder:
+    python -m benchmarks.saver_throughput [frames]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from photoneo_genicam.saver import ComponentSaver
+
+from .common import MOTIONCAM_HEIGHT, MOTIONCAM_WIDTH, SyntheticComponent, synthetic_range
+
+
+def synthetic_frame() -> list:
+    rng = np.random.default_rng(0)
+    # Smooth texture, noise would make PNG compression unrealistically slow
+    row = np.linspace(0, 4095, MOTIONCAM_WIDTH).astype(np.uint16)
+    intensity = np.tile(row, MOTIONCAM_HEIGHT) + rng.integers(0, 16, row.size * MOTIONCAM_HEIGHT)
+    return [
+        ("Range", synthetic_range()),
+        (
+            "Intensity",
+            SyntheticComponent(
+                intensity.astype(np.uint16), MOTIONCAM_WIDTH, MOTIONCAM_HEIGHT, "Mono12"
+            ),
+        ),
+    ]
+
+
+def save_serially(frame: list, output_dir: Path, frames: int) -> float:
+    start = time.perf_counter()
+    for i in range(frames):
+        for name, part in frame:
+            path = output_dir / f"{name}_{part.data_format}_{i}"
+            if name == "Intensity":
+                image = (part.data.astype(np.uint16) << 4).reshape(part.height, part.width, 1)
+                cv2.imwrite(f"{path}.png", image)
+            else:
+                part.data.tofile(f"{path}.dat")
+    return frames / (time.perf_counter() - start)
+
+
+def save_with_saver(frame: list, output_dir: Path, frames: int, **kwargs) -> ComponentSaver:
+    with ComponentSaver(str(output_dir), **kwargs) as saver:
+        for i in range(frames):
+            saver.save(frame, suffix=f"_{i}")
+    return saver
+
+
+def main(frames: int = 10):
+    frame = synthetic_frame()
+    print(f"{frames} frames of Range + Intensity (Mono12), {MOTIONCAM_WIDTH}x{MOTIONCAM_HEIGHT}")
+    cases = [
+        ("1 writer, PNG", dict(max_workers=1)),
+        ("4 writers, PNG", dict(max_workers=4)),
+        ("4 writers, PNG level 1", dict(max_workers=4, png_compression=1)),
+        ("4 writers, PNG level 0", dict(max_workers=4, png_compression=0)),
+        ("4 writers, npy", dict(max_workers=4, raw_format="npy", image_format="npy")),
+        ("4 writers, npz", dict(max_workers=4, raw_format="npz", image_format="npz")),
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fps = save_serially(frame, Path(tmp_dir), frames)
+        print(f"{'serial imwrite + tofile':<40} {fps:6.1f} FPS")
+        for name, kwargs in cases:
+            with tempfile.TemporaryDirectory() as case_dir:
+                stats = save_with_saver(frame, Path(case_dir), frames, **kwargs).statistics()
+            print(
+                f"{name:<40} {stats.frames_per_second:6.1f} FPS   "
+                f"copy: {stats.copy_seconds / stats.submitted * 1e3:.1f} ms/frame   "
+                f"{stats.bytes_written / stats.frames / 1e6:.1f} MB/frame"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,161 @@
+"""
+pytest-benchmark suite of the photoneo_genicam processing functions on synthetic frames at the
+MotionCam-3D resolution. See README.md for running it and comparing the results across commits.
+"""
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("open3d")
+
+from photoneo_genicam.chunks import (TRANSFORMATION_MATRIX_ORDER, TransformationMatrixDecoder,
+                                     get_transformation_matrix_from_chunk, parse_chunk_selector)
+from photoneo_genicam.depth_colormap import DepthColorMapper
+from photoneo_genicam.pointcloud import (calculate_point_cloud_from_projc,
+                                         construct_coordinate_map, create_3d_vector, map_texture)
+from photoneo_genicam.visualizer import VisualisationConverter, process_for_visualisation
+from ycocg_color_convert import convert_to_rgb
+
+from .common import (MOTIONCAM_HEIGHT, MOTIONCAM_WIDTH, SyntheticChunkNodeMap, SyntheticComponent,
+                     synthetic_range)
+
+NUM_PIXELS = MOTIONCAM_WIDTH * MOTIONCAM_HEIGHT
+TRANSFORMATION_CHUNK = "CurrentCameraToCoordinateSpaceTransformation"
+
+
+def synthetic_image(data_format: str, seed=0) -> SyntheticComponent:
+    rng = np.random.default_rng(seed)
+    if data_format in ("Mono10", "Mono12", "Mono16"):
+        bits = int(data_format[4:])
+        data = rng.integers(0, 1 << bits, NUM_PIXELS, dtype=np.uint16)
+        return SyntheticComponent(data, MOTIONCAM_WIDTH, MOTIONCAM_HEIGHT, data_format)
+    if data_format == "Confidence8":
+        data = rng.integers(0, 256, NUM_PIXELS, dtype=np.uint8)
+        return SyntheticComponent(data, MOTIONCAM_WIDTH, MOTIONCAM_HEIGHT, data_format)
+    if data_format == "RGB8":
+        data = rng.integers(0, 256, 3 * NUM_PIXELS, dtype=np.uint8)
+        return SyntheticComponent(data, MOTIONCAM_WIDTH, MOTIONCAM_HEIGHT, data_format, 3)
+    if data_format == "Coord3D_C32f":
+        data = rng.uniform(300.0, 1500.0, NUM_PIXELS).astype(np.float32)
+        return SyntheticComponent(data, MOTIONCAM_WIDTH, MOTIONCAM_HEIGHT, data_format)
+    if data_format == "Coord3D_ABC32f":
+        data = rng.uniform(-1.0, 1.0, 3 * NUM_PIXELS).astype(np.float32)
+        return SyntheticComponent(data, MOTIONCAM_WIDTH, MOTIONCAM_HEIGHT, data_format, 3)
+    raise Exception(f"Unexpected pixel format: {data_format}")
+
+
+@pytest.fixture(scope="module")
+def coordinate_maps():
+    u, v = np.meshgrid(
+        np.arange(MOTIONCAM_WIDTH, dtype=np.float32), np.arange(MOTIONCAM_HEIGHT, dtype=np.float32)
+    )
+    return u.reshape(-1), v.reshape(-1)
+
+
+@pytest.fixture(scope="module")
+def coordinate_map(coordinate_maps):
+    return construct_coordinate_map(*coordinate_maps, 2400.0, 1.0, 1032.0, 772.0).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def range_frame():
+    return synthetic_range()
+
+
+@pytest.fixture(scope="module")
+def depth_map(range_frame):
+    z = np.ascontiguousarray(range_frame.data[2::3])
+    return z.reshape(MOTIONCAM_HEIGHT, MOTIONCAM_WIDTH)
+
+
+@pytest.fixture(scope="module")
+def chunk_features():
+    entries = dict(zip(TRANSFORMATION_MATRIX_ORDER, np.random.default_rng(0).random(12)))
+    return SyntheticChunkNodeMap({TRANSFORMATION_CHUNK: entries})
+
+
+@pytest.mark.benchmark(group="coordinate map")
+def test_construct_coordinate_map(benchmark, coordinate_maps):
+    benchmark(construct_coordinate_map, *coordinate_maps, 2400.0, 1.0, 1032.0, 772.0)
+
+
+@pytest.mark.benchmark(group="projected c")
+def test_calculate_point_cloud_from_projc(benchmark, coordinate_map):
+    depth_map = synthetic_image("Coord3D_C32f").data
+    benchmark(calculate_point_cloud_from_projc, depth_map, coordinate_map)
+
+
+@pytest.mark.benchmark(group="projected c")
+def test_calculate_point_cloud_from_projc_into_out(benchmark, coordinate_map):
+    depth_map = synthetic_image("Coord3D_C32f").data
+    out = np.empty_like(coordinate_map)
+    benchmark(calculate_point_cloud_from_projc, depth_map, coordinate_map, out)
+
+
+@pytest.mark.benchmark(group="open3d conversion")
+def test_create_3d_vector(benchmark, range_frame):
+    benchmark(create_3d_vector, range_frame.data)
+
+
+@pytest.mark.benchmark(group="open3d conversion")
+@pytest.mark.parametrize("data_format", ["Mono12", "Mono16", "RGB8"])
+def test_map_texture(benchmark, data_format):
+    benchmark(map_texture, synthetic_image(data_format))
+
+
+@pytest.mark.benchmark(group="visualisation")
+@pytest.mark.parametrize(
+    "data_format",
+    ["Mono10", "Mono12", "Mono16", "Confidence8", "RGB8", "Coord3D_C32f", "Coord3D_ABC32f"],
+)
+def test_process_for_visualisation(benchmark, data_format):
+    benchmark(process_for_visualisation, synthetic_image(data_format))
+
+
+@pytest.mark.benchmark(group="visualisation")
+@pytest.mark.parametrize(
+    "data_format",
+    ["Mono10", "Mono12", "Mono16", "Confidence8", "RGB8", "Coord3D_C32f", "Coord3D_ABC32f"],
+)
+def test_visualisation_converter(benchmark, data_format):
+    image = synthetic_image(data_format)
+    benchmark(VisualisationConverter.for_image(image), image)
+
+
+@pytest.mark.benchmark(group="depth colormap")
+def test_normalize_and_apply_colormap(benchmark, depth_map):
+    def colorize():
+        normalized = cv2.normalize(depth_map, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
+        return cv2.applyColorMap(normalized, cv2.COLORMAP_TURBO)
+
+    benchmark(colorize)
+
+
+@pytest.mark.benchmark(group="depth colormap")
+def test_depth_color_mapper(benchmark, depth_map):
+    mapper = DepthColorMapper(MOTIONCAM_WIDTH, MOTIONCAM_HEIGHT)
+    benchmark(mapper, depth_map)
+
+
+@pytest.mark.benchmark(group="ycocg")
+def test_convert_to_rgb(benchmark):
+    image = synthetic_image("Mono16").data.reshape(MOTIONCAM_HEIGHT, MOTIONCAM_WIDTH)
+    # The first call compiles the numba function
+    convert_to_rgb(image)
+    benchmark(convert_to_rgb, image)
+
+
+@pytest.mark.benchmark(group="chunks")
+def test_parse_transformation_chunk(benchmark, chunk_features):
+    def parse():
+        chunk: dict = parse_chunk_selector(chunk_features, TRANSFORMATION_CHUNK)
+        return get_transformation_matrix_from_chunk(chunk)
+
+    benchmark(parse)
+
+
+@pytest.mark.benchmark(group="chunks")
+def test_transformation_matrix_decoder(benchmark, chunk_features):
+    decoder = TransformationMatrixDecoder(chunk_features, TRANSFORMATION_CHUNK)
+    benchmark(decoder.decode)
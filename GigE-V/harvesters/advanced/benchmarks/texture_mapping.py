@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Compares the float64 normalize + np.repeat texture mapping that map_texture used before with the
+lookup-table based texture_colors, for the mono pixel formats.
+
+Run from the `advanced` folder:
+    python -m benchmarks.texture_mapping
+"""
+import numpy as np
+
+from photoneo_genicam.pointcloud import MONO_TEXTURE_LEVELS, texture_colors
+
+from .common import (MOTIONCAM_HEIGHT, MOTIONCAM_WIDTH, SyntheticComponent, report,
+                     time_per_frame_ms)
+
+
+def normalize_and_repeat(texture: SyntheticComponent) -> np.ndarray:
+    levels: int = MONO_TEXTURE_LEVELS[texture.data_format]
+    normalized = texture.data.reshape(-1, 1).astype(np.float64) / levels
+    return np.repeat(normalized, 3, axis=-1)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for data_format, levels in MONO_TEXTURE_LEVELS.items():
+        data = rng.integers(0, levels, MOTIONCAM_WIDTH * MOTIONCAM_HEIGHT, dtype=np.uint16)
+        texture = SyntheticComponent(data, MOTIONCAM_WIDTH, MOTIONCAM_HEIGHT, data_format)
+        print(data_format)
+        samples = time_per_frame_ms(lambda: normalize_and_repeat(texture))
+        report("  normalize + np.repeat (float64)", samples)
+        for dtype in (np.float64, np.float32, np.uint8):
+            samples = time_per_frame_ms(lambda: texture_colors(texture, dtype))
+            report(f"  texture_colors ({np.dtype(dtype).name})", samples)
+        out = np.empty((data.size, 3), dtype=np.float32)
+        samples = time_per_frame_ms(lambda: texture_colors(texture, np.float32, out))
+        report("  texture_colors (float32, reused out)", samples)
+
+
+if __name__ == "__main__":
+    main()
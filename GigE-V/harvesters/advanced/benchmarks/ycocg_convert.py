@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Compares the serial reference YCoCg to RGB conversion from ycocg_color_convert.py with the
+parallel numba and the vectorized NumPy converters from photoneo_genicam.ycocg.
+
+Run from the `advanced` folder:
+    python -m benchmarks.ycocg_convert [width height]
+"""
+import sys
+
+import numpy as np
+
+from photoneo_genicam.ycocg import NUMBA_AVAILABLE, ycocg_to_rgb, ycocg_to_rgb_numpy
+from ycocg_color_convert import convert_to_rgb
+
+from .common import MOTIONCAM_HEIGHT, MOTIONCAM_WIDTH, report, time_per_frame_ms
+
+
+def main(width: int = MOTIONCAM_WIDTH, height: int = MOTIONCAM_HEIGHT):
+    ycocg_img = np.random.default_rng(0).integers(0, 1 << 16, (height, width), dtype=np.uint16)
+    out = np.empty((height, width, 3), dtype=np.uint16)
+    print(f"Mono16 YCoCg frame: {width}x{height}")
+
+    reference = time_per_frame_ms(lambda: convert_to_rgb(ycocg_img), frames=5)
+    report("convert_to_rgb (reference)", reference)
+    cases = {"ycocg_to_rgb_numpy": lambda: ycocg_to_rgb_numpy(ycocg_img, out)}
+    if NUMBA_AVAILABLE:
+        cases["ycocg_to_rgb (numba parallel)"] = lambda: ycocg_to_rgb(ycocg_img, out)
+    for name, func in cases.items():
+        samples = time_per_frame_ms(func, frames=10)
+        report(name, samples)
+        print(f"{'':<40} speedup: {reference.mean() / samples.mean():.1f}x")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
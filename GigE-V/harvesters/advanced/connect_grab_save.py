@@ -2,45 +2,14 @@
 import sys
 from pathlib import Path
 
-import cv2
-import numpy as np
-from genicam.genapi import NodeMap
-from harvesters.core import Component2DImage, Harvester
+from harvesters.core import Harvester
 
-from photoneo_genicam.components import (enable_components, enabled_components,
-                                         get_component_statuses)
+from photoneo_genicam.components import get_component_statuses
 from photoneo_genicam.default_gentl_producer import producer_path
+from photoneo_genicam.feature_cache import CachedFeatures
 from photoneo_genicam.features import enable_software_trigger
-from photoneo_genicam.user_set import load_default_user_set
-from photoneo_genicam.utils import data_stream_reset, logger, write_raw_array
-
-
-def process_component(component_name: str, component: Component2DImage):
-    pixel_format = component.data_format
-    if component_name in ("Intensity", "ColorCamera"):
-        component_data = component.data.copy()
-        if pixel_format == "Mono10":
-            data = (component_data.astype(np.uint16) << 6).reshape(
-                component.height, component.width, 1
-            )
-        elif pixel_format == "Mono12":
-            data = (component_data.astype(np.uint16) << 4).reshape(
-                component.height, component.width, 1
-            )
-        elif pixel_format == "Mono16":
-            data = component.data.reshape(component.height, component.width, 1)
-        elif pixel_format == "RGB8":
-            data = cv2.cvtColor(
-                component.data.reshape((component.height, component.width, 3)), cv2.COLOR_RGB2BGR
-            )
-        else:
-            raise Exception(f"Unknown pixel format option for component: {component_name}")
-        cv2.imwrite(f"{component_name}_{pixel_format}.png", data)
-    elif component_name == "Confidence":
-        data = component.data.reshape(component.height, component.width, 1)
-        cv2.imwrite(f"{component_name}_{pixel_format}.png", data)
-    else:
-        write_raw_array(f"{component_name}_{pixel_format}.dat", component.data)
+from photoneo_genicam.saver import ComponentSaver
+from photoneo_genicam.utils import data_stream_reset, logger
 
 
 def main(device_sn: str, *components: str):
@@ -55,25 +24,29 @@ def main(device_sn: str, *components: str):
 
         logger.info(f"Connecting to: {device_sn}")
         with h.create({"serial_number": device_sn}) as ia:
-            features: NodeMap = ia.remote_device.node_map
+            features = CachedFeatures(ia.remote_device.node_map)
             logger.info(f"Device Firmware version: {features.DeviceFirmwareVersion.value}")
 
-            load_default_user_set(features)
+            features.load_default_user_set()
             enable_software_trigger(features)
 
             logger.info(f"Requested component(s): {components}")
-            enable_components(features, list(components))
-            print(get_component_statuses(features, include_pixel_format=True))
+            features.enable_components(list(components))
+            print(get_component_statuses(features.node_map, include_pixel_format=True))
 
             data_stream_reset(ia)
             ia.start()
             features.TriggerSoftware.execute()
-            enabled_comps: list = enabled_components(features)
-            with ia.fetch(timeout=10) as buff:
-                # match the components based on their order
-                for component_name, part in zip(enabled_comps, buff.payload.components):
-                    logger.info(f"Saving component: {component_name}")
-                    process_component(component_name, part)
+            # Known from enable_components, doesn't access the device
+            enabled_comps: list = features.enabled_components()
+            logger.info(f"Saving component(s): {enabled_comps}")
+            with ComponentSaver() as saver:
+                with ia.fetch(timeout=10) as buff:
+                    # match the components based on their order, only the copy happens here,
+                    # the buffer is released before the files are written
+                    parts = zip(enabled_comps, buff.payload.components)
+                    saver.save(parts, timestamp_ns=buff.timestamp_ns)
+            logger.info(f"Saved {saver.statistics()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import sys
+import time
+from pathlib import Path
+
+from genicam.genapi import NodeMap
+from harvesters.core import Harvester
+
+from photoneo_genicam.default_gentl_producer import producer_path
+from photoneo_genicam.grabber import FrameGrabber
+from photoneo_genicam.metrics import metrics
+from photoneo_genicam.user_set import load_default_user_set
+from photoneo_genicam.utils import data_stream_reset, logger
+
+FRAME_COUNT = 50
+# Simulated per-frame processing time, slower than the acquisition on purpose
+PROCESSING_TIME_S = 0.2
+
+
+def main(device_sn: str):
+    with Harvester() as h:
+        h.add_file(str(producer_path), check_existence=True, check_validity=True)
+        h.update()
+
+        logger.info(f"Connecting to: {device_sn}")
+        with h.create({"serial_number": device_sn}) as ia:
+            features: NodeMap = ia.remote_device.node_map
+            logger.info(f"Device Firmware version: {features.DeviceFirmwareVersion.value}")
+
+            # The Default user set uses continuous acquisition mode.
+            load_default_user_set(features)
+
+            data_stream_reset(ia)
+            ia.start()
+            logger.info(f"Processing {FRAME_COUNT} frames.")
+            with FrameGrabber(ia, num_slots=4) as grabber:
+                for _ in range(FRAME_COUNT):
+                    with grabber.next_frame(timeout=15) as frame, metrics.timer("processing"):
+                        time.sleep(PROCESSING_TIME_S)
+                        print(
+                            f"Frame ID: {frame.frame_id}  FPS: {round(ia.statistics.fps, 2)}  "
+                            f"Dropped: {grabber.dropped}  ",
+                            end="\r",
+                        )
+
+            print("\n")
+            print(f"Max FPS: {round(ia.statistics.fps_max, 2)}")
+            print(grabber.statistics())
+            if metrics.enabled:
+                print(metrics.report())
+
+
+if __name__ == "__main__":
+    try:
+        device_id = sys.argv[1]
+    except IndexError:
+        print("Error: no device given, please run it with the device serial number as argument:")
+        print(f"    {Path(__file__).name} <device serial>")
+        sys.exit(1)
+    main(device_id)
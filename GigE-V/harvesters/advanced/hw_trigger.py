@@ -4,13 +4,23 @@ from pathlib import Path
 from typing import List
 
 from genicam.genapi import NodeMap
-from harvesters.core import Component2DImage, Harvester
+from harvesters.core import Buffer, Component2DImage, Harvester
 
 from photoneo_genicam.default_gentl_producer import producer_path
 from photoneo_genicam.features import enable_hardware_trigger
+from photoneo_genicam.latency import LatencyProfiler
+from photoneo_genicam.timestamp_index import ClockTracker
 from photoneo_genicam.user_set import load_default_user_set
 from photoneo_genicam.utils import data_stream_reset, logger
 
+FRAME_COUNT = 10
+
+
+def log_components(buffer: Buffer):
+    component_list: List[Component2DImage] = buffer.payload.components
+    for component in component_list:
+        logger.debug(component)
+
 
 def main(device_sn: str):
     with Harvester() as h:
@@ -27,11 +37,17 @@ def main(device_sn: str):
             data_stream_reset(ia)
             ia.start()
             timeout = 180
-            logger.info(f"Wait {timeout}s for hw-trigger signal...")
-            with ia.fetch(timeout=timeout) as buffer:
-                component_list: List[Component2DImage] = buffer.payload.components
-                for component in component_list:
-                    logger.debug(component)
+            # The trigger edge isn't visible to the host, the latencies are measured from the
+            # device timestamp of each frame, converted to host time with the latched clock
+            clock = ClockTracker()
+            clock.latch(device_sn, features)
+            profiler = LatencyProfiler(clock, device_sn)
+            for i in range(FRAME_COUNT):
+                logger.info(f"Wait {timeout}s for hw-trigger signal {i + 1}/{FRAME_COUNT}...")
+                profiler.profile_frame(ia, log_components, software_trigger=False, timeout=timeout)
+                # Keeps tracking the clock drift between the frames
+                clock.latch(device_sn, features)
+            logger.info(profiler.report())
 
 
 if __name__ == "__main__":
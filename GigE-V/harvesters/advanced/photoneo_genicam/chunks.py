@@ -1,34 +1,132 @@
+from typing import Dict, List, Tuple
+
 import numpy as np
 from genicam.genapi import NodeMap
 
+# We can not trust the Harvesters .symbolics order of the Enum node, so we explicitly set the order
+TRANSFORMATION_MATRIX_ORDER = [
+    "Rot00",
+    "Rot01",
+    "Rot02",
+    "TransX",
+    "Rot10",
+    "Rot11",
+    "Rot12",
+    "TransY",
+    "Rot20",
+    "Rot21",
+    "Rot22",
+    "TransZ",
+]
+
+CALIBRATION_CHUNKS = ["CameraMatrix", "DistortionCoefficients", "SensorAxis", "SensorPosition"]
+
 
 def parse_chunk_selector(features: NodeMap, chunk_feature_name: str) -> dict:
-    selector_alias: str = f"Chunk{chunk_feature_name}Selector"
-    value_alias: str = f"Chunk{chunk_feature_name}Value"
+    selector = features.get_node(f"Chunk{chunk_feature_name}Selector")
+    value = features.get_node(f"Chunk{chunk_feature_name}Value")
     chunk_data = {}
-    for s_opts in features.get_node(selector_alias).symbolics:
-        features.get_node(selector_alias).value = s_opts
-        chunk_data[s_opts] = features.get_node(value_alias).value
+    for s_opts in selector.symbolics:
+        selector.value = s_opts
+        chunk_data[s_opts] = value.value
     return chunk_data
 
 
 def get_transformation_matrix_from_chunk(parsed_chunk: dict) -> np.ndarray:
-    # We can not trust the Harvesters .symbolics order of the Enum node, so we explicitly set the order
-    order = [
-        "Rot00",
-        "Rot01",
-        "Rot02",
-        "TransX",
-        "Rot10",
-        "Rot11",
-        "Rot12",
-        "TransY",
-        "Rot20",
-        "Rot21",
-        "Rot22",
-        "TransZ",
-    ]
-
-    chunk_data: list = [parsed_chunk.get(key) for key in order]
+    chunk_data: list = [parsed_chunk.get(key) for key in TRANSFORMATION_MATRIX_ORDER]
     transformation_matrix_3x4 = np.array(chunk_data).reshape(3, 4)
     return np.vstack([transformation_matrix_3x4, [0.0, 0.0, 0.0, 1.0]])
+
+
+class ChunkSelectorDecoder:
+    """
+    Reads all entries of a selector chunk (Chunk<Name>Selector / Chunk<Name>Value) into an array.
+
+    The nodes and the entry order are resolved once, decode() then still sets the selector and
+    reads the value node for every entry of the chunk data attached to the current buffer, but
+    without node lookups and without re-evaluating the selector symbolics. Create the decoder once
+    and call decode() per frame.
+    """
+
+    def __init__(
+        self,
+        features: NodeMap,
+        chunk_feature_name: str,
+        entries: List[str] = None,
+        shape: Tuple[int, ...] = None,
+    ):
+        self._selector = features.get_node(f"Chunk{chunk_feature_name}Selector")
+        self._value = features.get_node(f"Chunk{chunk_feature_name}Value")
+        self.entries: List[str] = list(self._selector.symbolics if entries is None else entries)
+        self.shape: Tuple[int, ...] = shape or (len(self.entries),)
+
+    def decode(self, out: np.ndarray = None) -> np.ndarray:
+        """Decodes into `out`, a C-contiguous float64 array of `shape`, or into a new array."""
+        if out is None:
+            values = np.empty(len(self.entries))
+        else:
+            # reshape() of a non-contiguous array copies, the values would never reach `out`
+            if out.shape != self.shape or out.dtype != np.float64 or not out.flags.c_contiguous:
+                raise Exception(
+                    f"Expected a C-contiguous float64 array of shape {self.shape}, got "
+                    f"{out.dtype} {out.shape}, contiguous: {out.flags.c_contiguous}"
+                )
+            values = out.reshape(-1)
+        selector, value = self._selector, self._value
+        read: List[float] = []
+        for entry in self.entries:
+            selector.value = entry
+            read.append(value.value)
+        # One conversion of all entries instead of a NumPy scalar assignment per entry
+        values[:] = read
+        return values.reshape(self.shape)
+
+    def as_dict(self, values: np.ndarray) -> Dict[str, float]:
+        return dict(zip(self.entries, values.reshape(-1).tolist()))
+
+
+class TransformationMatrixDecoder(ChunkSelectorDecoder):
+    """Decodes a transformation chunk straight into a 4x4 matrix, reused between frames."""
+
+    def __init__(
+        self,
+        features: NodeMap,
+        chunk_feature_name: str = "CurrentCameraToCoordinateSpaceTransformation",
+    ):
+        super().__init__(features, chunk_feature_name, TRANSFORMATION_MATRIX_ORDER, (3, 4))
+        self.matrix: np.ndarray = np.eye(4)
+
+    def decode(self, out: np.ndarray = None) -> np.ndarray:
+        matrix: np.ndarray = self.matrix if out is None else out
+        if matrix.shape != (4, 4):
+            raise Exception(f"Expected a 4x4 matrix, got shape {matrix.shape}")
+        super().decode(out=matrix[:3])
+        matrix[3] = (0.0, 0.0, 0.0, 1.0)
+        return matrix
+
+
+def enable_chunks(features: NodeMap, chunk_names: List[str]):
+    """Enables the chunks, their values are then readable while a fetched buffer is attached."""
+    features.ChunkModeActive.value = True
+    for chunk_name in chunk_names:
+        features.ChunkSelector.value = chunk_name
+        features.ChunkEnable.value = True
+
+
+def calibration_chunk_names(camera: str = "MainCamera") -> List[str]:
+    return [f"{camera}{chunk}" for chunk in CALIBRATION_CHUNKS]
+
+
+def calibration_decoders(
+    features: NodeMap, camera: str = "MainCamera"
+) -> Dict[str, ChunkSelectorDecoder]:
+    """Decoders of the camera matrix, distortion, sensor axis and position calibration chunks."""
+    return {
+        chunk: ChunkSelectorDecoder(features, chunk_name)
+        for chunk, chunk_name in zip(CALIBRATION_CHUNKS, calibration_chunk_names(camera))
+    }
+
+
+def decode_calibration(decoders: Dict[str, ChunkSelectorDecoder]) -> Dict[str, List[float]]:
+    """The calibration chunk values of the attached buffer, e.g. for coordinate_map_cache_key."""
+    return {chunk: decoder.decode().tolist() for chunk, decoder in decoders.items()}
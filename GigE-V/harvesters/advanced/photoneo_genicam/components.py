@@ -17,8 +17,9 @@ def sorted_components(features: NodeMap) -> List[str]:
         features.ComponentSelector.value = comp
         return features.ComponentIDValue.value
 
-    componentIdValues = {c: component_id_value(c) for c in features.ComponentSelector.symbolics}
-    return sorted(features.ComponentSelector.symbolics, key=lambda x: componentIdValues[x])
+    components: List[str] = features.ComponentSelector.symbolics
+    componentIdValues = {c: component_id_value(c) for c in components}
+    return sorted(components, key=lambda x: componentIdValues[x])
 
 
 def is_component_enabled(features: NodeMap, component: str) -> bool:
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from genicam.genapi import NodeMap
+from harvesters.core import ImageAcquirer
+
+from .features import read_feature
+from .pointcloud import pre_fetch_coordinate_maps
+from .utils import logger
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "photoneo_genicam" / "coordinate_maps"
+
+# Everything the coordinate map depends on, i.e. the device, its resolution and calibration.
+# A failed read of these raises, a key without them could match the map of other settings.
+CACHE_KEY_FEATURES = [
+    "DeviceSerialNumber",
+    "DeviceFirmwareVersion",
+    "Width",
+    "Height",
+    "Scan3dFocalLength",
+    "Scan3dAspectRatio",
+    "Scan3dPrincipalPointU",
+    "Scan3dPrincipalPointV",
+]
+# Only on some device types, they're None in the key where they don't exist
+OPTIONAL_CACHE_KEY_FEATURES = ["CameraSpace"]
+
+
+def coordinate_map_cache_key(features: NodeMap, calibration: dict) -> str:
+    """
+    Returns the cache key of the current coordinate map.
+
+    `calibration` holds the calibration chunk values of a frame (see chunks.decode_calibration),
+    the distortion isn't covered by any feature but changes the map, e.g. after a recalibration.
+    """
+    key_values = {name: read_feature(features, name, required=True) for name in CACHE_KEY_FEATURES}
+    for name in OPTIONAL_CACHE_KEY_FEATURES:
+        key_values[name] = read_feature(features, name)
+    key_values["calibration"] = calibration
+    serialized: str = json.dumps(key_values, sort_keys=True, default=str)
+    digest: str = hashlib.sha256(serialized.encode()).hexdigest()
+    return f"{key_values['DeviceSerialNumber']}_{digest[:16]}"
+
+
+def load_coordinate_map(
+    ia: ImageAcquirer, cache_dir: Path = DEFAULT_CACHE_DIR, calibration: dict = None
+) -> np.ndarray:
+    """
+    Returns the float32 coordinate map of the device, fetching it only if it's not cached yet.
+
+    Cached maps are stored as .npy files and memory-mapped read-only, a cold start then doesn't
+    need to fetch the map. Without the `calibration` chunk values of a previous frame a cached
+    map can't be told from a stale one, the map is then always fetched. Same preconditions as
+    pre_fetch_coordinate_maps.
+    """
+    if not calibration:
+        logger.warning("No calibration chunk values given, the CoordinateMap isn't cached")
+        return pre_fetch_coordinate_maps(ia).astype(np.float32, copy=False)
+
+    cache_key: str = coordinate_map_cache_key(ia.remote_device.node_map, calibration)
+    cache_file = Path(cache_dir) / f"{cache_key}.npy"
+    if cache_file.exists():
+        logger.debug(f"Loading cached CoordinateMap: {cache_file}")
+        return np.load(cache_file, mmap_mode="r")
+
+    coordinate_map: np.ndarray = pre_fetch_coordinate_maps(ia).astype(np.float32, copy=False)
+
+    # Write to a temporary file first, so concurrent workers never load a partially written map
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as file:
+        np.save(file, coordinate_map)
+    os.replace(tmp_file, cache_file)
+    logger.debug(f"Cached CoordinateMap: {cache_file}")
+    return coordinate_map
@@ -0,0 +1,98 @@
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+# Index 0 of the lookup table is reserved for invalid pixels, valid depths use 1..255
+INVALID_COLOR = (0, 0, 0)
+NUM_COLORS = 255
+
+
+def colormap_lut(colormap: int = cv2.COLORMAP_TURBO) -> np.ndarray:
+    """(256, 1, 3) uint8 BGR lookup table of the OpenCV colormap with black at index 0."""
+    indices = np.linspace(0, 255, NUM_COLORS).astype(np.uint8).reshape(-1, 1)
+    lut = np.empty((NUM_COLORS + 1, 1, 3), dtype=np.uint8)
+    lut[0] = INVALID_COLOR
+    lut[1:] = cv2.applyColorMap(indices, colormap)
+    return lut
+
+
+def depth_display_range(
+    depth: np.ndarray, percentiles: Tuple[float, float] = (1.0, 99.0), subsample: int = 16
+) -> Tuple[float, float]:
+    """
+    Display range of the valid (non zero) depths, estimated on every `subsample`-th pixel.
+    Percentiles instead of min / max keep outliers from stretching the range.
+    """
+    samples = depth.reshape(-1)[::subsample]
+    valid = samples[samples > 0]
+    if len(valid) == 0:
+        return 0.0, 0.0
+    low, high = np.percentile(valid, percentiles)
+    # Keeps a flat scene from collapsing the range to a single value
+    return float(low), float(max(high, low + 1))
+
+
+class DepthColorMapper:
+    """
+    Colorizes depth maps for live previews. The display range is re-estimated every
+    `update_interval` frames on a subsample of the frame, so there is no min / max pass per frame
+    and the colors don't flicker with outliers. Depths outside the range are clamped, invalid
+    pixels are black. All intermediate images are preallocated and the returned image is reused
+    by the next call.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        update_interval: int = 10,
+        percentiles: Tuple[float, float] = (1.0, 99.0),
+        subsample: int = 16,
+        colormap: int = cv2.COLORMAP_TURBO,
+    ):
+        self.width = width
+        self.height = height
+        self.update_interval = update_interval
+        self.percentiles = percentiles
+        self.subsample = subsample
+        self.lut: np.ndarray = colormap_lut(colormap)
+        self.output = np.empty((height, width, 3), dtype=np.uint8)
+        self._clamped = np.empty((height, width), dtype=np.float32)
+        self._indices = np.empty((height, width), dtype=np.uint8)
+        self._valid = np.empty((height, width), dtype=np.uint8)
+        self.display_range: Tuple[float, float] = (0.0, 0.0)
+        self.frame_count = 0
+
+    def update_range(self, depth: np.ndarray):
+        low, high = depth_display_range(depth, self.percentiles, self.subsample)
+        # Keep the last range when the frame has no valid depth
+        if high > low:
+            self.display_range = (low, high)
+
+    def __call__(self, depth: np.ndarray) -> np.ndarray:
+        depth = depth.reshape(self.height, self.width)
+        if self.frame_count % self.update_interval == 0 or self.display_range[1] <= 0:
+            self.update_range(depth)
+        self.frame_count += 1
+
+        low, high = self.display_range
+        if high <= low:
+            self.output[:] = INVALID_COLOR
+            return self.output
+        return self.colorize(depth, low, high)
+
+    def colorize(self, depth: np.ndarray, low: float, high: float) -> np.ndarray:
+        # Maps [low, high] to the LUT indices 1..255, farther depths saturate at 255
+        alpha = (NUM_COLORS - 1) / (high - low)
+        np.maximum(depth, low, out=self._clamped)
+        cv2.convertScaleAbs(self._clamped, self._indices, alpha, 1 - low * alpha)
+        # Invalid (zero or NaN) pixels go to index 0
+        cv2.compare(depth, 0, cv2.CMP_GT, dst=self._valid)
+        cv2.bitwise_and(self._indices, self._valid, dst=self._indices)
+        return cv2.applyColorMap(self._indices, self.lut, dst=self.output)
+
+
+def normals_to_image(normals: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Maps the unit normal components from the fixed [-1, 1] range to [0, 255]."""
+    return cv2.convertScaleAbs(normals, out, alpha=127.5, beta=127.5)
@@ -0,0 +1,116 @@
+from typing import Callable, Dict, List
+
+from genicam.genapi import NodeMap
+
+from .components import enable_components, sorted_components
+from .user_set import load_default_user_set
+
+# Commands which don't change the configuration, executing them keeps the cached settings
+NON_CONFIGURING_COMMANDS = (
+    "TriggerSoftware",
+    "TimestampLatch",
+    "AcquisitionStart",
+    "AcquisitionStop",
+)
+
+
+class CachedNode:
+    """Forwards to a node, writing its value or executing it invalidates the cached settings."""
+
+    def __init__(self, name: str, node, features: "CachedFeatures"):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_node", node)
+        object.__setattr__(self, "_features", features)
+
+    def __getattr__(self, name: str):
+        return getattr(self._node, name)
+
+    def __setattr__(self, name: str, value):
+        setattr(self._node, name, value)
+        if name == "value":
+            self._features.invalidate()
+
+    def execute(self):
+        self._node.execute()
+        if self._name not in NON_CONFIGURING_COMMANDS:
+            self._features.invalidate()
+
+
+class CachedFeatures:
+    """
+    NodeMap façade which memoises device metadata, so per-frame code doesn't access the device.
+
+    Each GenApi access can be a register read on the device. The component order (by
+    ComponentIDValue) is read once per device, the enabled components and the values read with
+    value() (e.g. the IsMotionCam3D_Val device type flags) once per configuration.
+
+    Any other feature is forwarded to the NodeMap, e.g. `features.TriggerSoftware.execute()`.
+    Writing a forwarded node's value (`features.Scan3dOutputMode.value = ...`) or executing a
+    command other than NON_CONFIGURING_COMMANDS invalidates the cached settings. Only writes
+    through the NodeMap itself (`features.node_map`) need an explicit invalidate().
+    """
+
+    def __init__(self, features: NodeMap):
+        self.node_map: NodeMap = features
+        # Facts fixed for the device
+        self._static: Dict[str, object] = {}
+        # Facts depending on the current settings
+        self._settings: Dict[str, object] = {}
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.node_map, name)
+        # NodeMap methods (get_node, ...) are callable, its nodes aren't
+        return attribute if callable(attribute) else CachedNode(name, attribute, self)
+
+    def get_node(self, name: str) -> CachedNode:
+        return CachedNode(name, self.node_map.get_node(name), self)
+
+    @staticmethod
+    def _memoise(cache: Dict[str, object], key: str, read: Callable[[], object]):
+        if key not in cache:
+            cache[key] = read()
+        return cache[key]
+
+    def invalidate(self):
+        self._settings.clear()
+
+    def value(self, name: str):
+        return self._memoise(self._settings, name, lambda: self.node_map.get_node(name).value)
+
+    def set_value(self, name: str, value):
+        self.node_map.get_node(name).value = value
+        self.invalidate()
+
+    def sorted_components(self) -> List[str]:
+        return self._memoise(
+            self._static, "sorted_components", lambda: sorted_components(self.node_map)
+        )
+
+    def component_states(self) -> Dict[str, bool]:
+        def read_states() -> Dict[str, bool]:
+            states = {}
+            for component in self.sorted_components():
+                self.node_map.ComponentSelector.value = component
+                states[component] = self.node_map.ComponentEnable.value
+            return states
+
+        return self._memoise(self._settings, "component_states", read_states)
+
+    def is_component_enabled(self, component: str) -> bool:
+        return self.component_states()[component]
+
+    def enabled_components(self) -> List[str]:
+        """Same as components.enabled_components, without accessing the device once cached."""
+        return [component for component, enabled in self.component_states().items() if enabled]
+
+    def enable_components(self, component_list: List[str]):
+        enable_components(self.node_map, component_list)
+        self.invalidate()
+        # The new states are known, there's no need to read them back
+        self._settings["component_states"] = {
+            component: component in component_list for component in self.sorted_components()
+        }
+
+    def load_default_user_set(self):
+        load_default_user_set(self.node_map)
+        self.invalidate()
@@ -1,4 +1,4 @@
-from genicam.genapi import NodeMap
+from genicam.genapi import AccessException, LogicalErrorException, NodeMap
 
 
 def enable_trigger(features: NodeMap, source: str):
@@ -13,3 +13,17 @@ def enable_software_trigger(features: NodeMap):
 
 def enable_hardware_trigger(features: NodeMap):
     enable_trigger(features, "Line1")
+
+
+def read_feature(features: NodeMap, name: str, required: bool = False):
+    """
+    Returns the value of the feature. Optional features which don't exist or aren't available
+    on the device (e.g. CameraSpace is MotionCam3DColor only) read as None, any other error and
+    every error of a required feature is raised.
+    """
+    if required:
+        return features.get_node(name).value
+    try:
+        return features.get_node(name).value
+    except (LogicalErrorException, AccessException):
+        return None
@@ -0,0 +1,170 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List
+
+import numpy as np
+from genicam.gentl import TimeoutException
+from harvesters.core import Buffer, Component2DImage, ImageAcquirer
+
+from .metrics import metrics
+from .utils import logger
+
+
+@dataclass
+class FrameComponent:
+    """Copy of a Component2DImage with the same attributes, which outlives the fetched buffer."""
+
+    data: np.ndarray
+    width: int
+    height: int
+    data_format: str
+    num_components_per_pixel: int
+
+
+def copy_component(component: Component2DImage, target: FrameComponent = None) -> FrameComponent:
+    """Copies the component into `target`, reusing its array when the layout didn't change."""
+    data: np.ndarray = component.data
+    if target is None or target.data.shape != data.shape or target.data.dtype != data.dtype:
+        target = FrameComponent(np.empty_like(data), 0, 0, "", 0)
+    np.copyto(target.data, data)
+    target.width, target.height = component.width, component.height
+    target.data_format = component.data_format
+    target.num_components_per_pixel = component.num_components_per_pixel
+    return target
+
+
+@dataclass
+class Frame:
+    frame_id: int = -1
+    timestamp_ns: int = 0
+    components: List[FrameComponent] = field(default_factory=list)
+
+    def copy_from(self, buffer: Buffer, frame_id: int):
+        old: List[FrameComponent] = self.components
+        self.components = [
+            copy_component(component, old[i] if i < len(old) else None)
+            for i, component in enumerate(buffer.payload.components)
+        ]
+        self.frame_id, self.timestamp_ns = frame_id, buffer.timestamp_ns
+
+
+class FrameGrabber:
+    """
+    Fetches frames on a background thread and copies them into a ring of preallocated slots.
+
+    Processing or rendering on the consumer side then doesn't lower the acquisition rate and the
+    fetched buffers are returned to the producer immediately. Consumers take frames in order with
+    next_frame(), or only the newest one with latest_frame() (e.g. for visualisation).
+
+    When the consumer is too slow, the oldest unread frame is overwritten. Overwritten frames and
+    frames skipped by latest_frame() are counted in `dropped`.
+
+    The acquisition has to be started (`ia.start()`) by the caller. The background thread fetches
+    with the short `fetch_timeout` and retries, so stop() returns within about one fetch_timeout
+    even when no frames arrive.
+    """
+
+    def __init__(self, ia: ImageAcquirer, num_slots: int = 4, fetch_timeout: float = 0.1):
+        self.ia = ia
+        self.fetch_timeout = fetch_timeout
+        self.fetched = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._slots: List[Frame] = [Frame() for _ in range(num_slots)]
+        self._free: List[int] = list(range(num_slots))
+        self._ready: deque = deque()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread = None
+        self._running = False
+        self._error: Exception = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        logger.debug(f"FrameGrabber: {self.statistics()}")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def statistics(self) -> str:
+        return f"fetched: {self.fetched}, delivered: {self.delivered}, dropped: {self.dropped}"
+
+    def _take_slot(self) -> int:
+        with self._condition:
+            if self._free:
+                return self._free.pop()
+            # Either the oldest unread frame is overwritten or, when all slots are held by
+            # consumers, the new frame is dropped
+            self.dropped += 1
+            return self._ready.popleft() if self._ready else -1
+
+    def _run(self):
+        while self._running:
+            try:
+                with self.ia.fetch(timeout=self.fetch_timeout) as buffer:
+                    slot: int = self._take_slot()
+                    if slot < 0:
+                        continue
+                    with metrics.timer("FrameGrabber.copy"):
+                        self._slots[slot].copy_from(buffer, self.fetched)
+            except TimeoutException:
+                continue
+            except Exception as e:
+                with self._condition:
+                    self._error = e
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                self.fetched += 1
+                self._ready.append(slot)
+                self._condition.notify_all()
+
+    def _wait_for_frame(self, pick: Callable[[], int], timeout: float) -> int:
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._ready or self._error or not self._running, timeout
+            )
+            if self._error is not None:
+                raise self._error
+            if not self._ready:
+                raise TimeoutError("No frame grabbed in time")
+            self.delivered += 1
+            return pick()
+
+    @contextmanager
+    def _hold(self, slot: int) -> Iterator[Frame]:
+        try:
+            yield self._slots[slot]
+        finally:
+            with self._condition:
+                self._free.append(slot)
+
+    def next_frame(self, timeout: float = None):
+        """Context manager with the oldest unread frame, the frame is valid inside the context."""
+        return self._hold(self._wait_for_frame(self._ready.popleft, timeout))
+
+    def latest_frame(self, timeout: float = None):
+        """Context manager with the newest frame, older unread frames are dropped."""
+
+        def newest() -> int:
+            slot: int = self._ready.pop()
+            self.dropped += len(self._ready)
+            self._free.extend(self._ready)
+            self._ready.clear()
+            return slot
+
+        return self._hold(self._wait_for_frame(newest, timeout))
@@ -0,0 +1,106 @@
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+import numpy as np
+from harvesters.core import Buffer, ImageAcquirer
+
+from .timestamp_index import ClockTracker
+
+# In the order in which they happen within one frame
+STAGES = ("trigger", "exposure", "transfer", "delivery", "parse", "processing", "total")
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyProfiler:
+    """
+    Measures where the time between a trigger and the processed frame goes.
+
+    Every profiled frame records these stages with perf_counter_ns:
+    - trigger: the TriggerSoftware.execute() call (software trigger only)
+    - exposure: end of the trigger call to the device timestamp of the frame
+    - transfer: the device timestamp of the frame to the buffer delivery by ia.fetch()
+    - delivery: end of the trigger call to delivery (software trigger only)
+    - parse: accessing the payload components and their data
+    - processing: the `process` callback
+    - total: from the trigger to the end of processing
+
+    The arrival of the first packet isn't exposed by GenTL, the device timestamp of the frame is
+    the closest observable point. Exposure and transfer need a ClockTracker with samples of the
+    device (see ClockTracker.latch) to convert the device timestamp to host time, so they're only
+    recorded when one is given and measured with time_ns instead.
+
+    A hardware trigger edge isn't visible to the host, so with software_trigger=False there is no
+    trigger, exposure or delivery stage, total is measured from the device timestamp of the frame
+    (converted to host time) and only recorded with a ClockTracker, like transfer; without one,
+    the time spent waiting in ia.fetch() would be how long it took to fire the trigger, not a
+    latency. The last `max_samples` frames are kept per stage.
+    """
+
+    def __init__(self, clock: ClockTracker = None, device: str = "", max_samples: int = 100_000):
+        self.clock = clock
+        self.device = device
+        self.frames = 0
+        self.samples: Dict[str, deque] = {stage: deque(maxlen=max_samples) for stage in STAGES}
+
+    def record(self, stage: str, duration_ns: int):
+        self.samples[stage].append(duration_ns)
+
+    def profile_frame(
+        self,
+        ia: ImageAcquirer,
+        process: Callable[[Buffer], Any] = None,
+        software_trigger: bool = True,
+        timeout: float = 10,
+    ) -> Any:
+        """Triggers (optionally), fetches and processes one frame, returns what `process` does."""
+        start: int = time.perf_counter_ns()
+        if software_trigger:
+            ia.remote_device.node_map.TriggerSoftware.execute()
+        triggered: int = time.perf_counter_ns()
+        triggered_wall: int = time.time_ns()
+        with ia.fetch(timeout=timeout) as buffer:
+            delivered: int = time.perf_counter_ns()
+            delivered_wall: int = time.time_ns()
+            # Harvesters parses the payload lazily, on the first access
+            [component.data for component in buffer.payload.components]
+            parsed: int = time.perf_counter_ns()
+            result: Any = process(buffer) if process is not None else None
+            processed: int = time.perf_counter_ns()
+            processed_wall: int = time.time_ns()
+            timestamp_ns: int = buffer.timestamp_ns
+
+        if software_trigger:
+            self.record("trigger", triggered - start)
+            self.record("delivery", delivered - triggered)
+            self.record("total", processed - start)
+        if self.clock is not None and self.device in self.clock.samples:
+            frame_wall: int = self.clock.to_host_ns(self.device, timestamp_ns)
+            if software_trigger:
+                self.record("exposure", frame_wall - triggered_wall)
+            else:
+                self.record("total", processed_wall - frame_wall)
+            self.record("transfer", delivered_wall - frame_wall)
+        self.record("parse", parsed - delivered)
+        self.record("processing", processed - parsed)
+        self.frames += 1
+        return result
+
+    def percentiles_ms(self) -> Dict[str, Dict[int, float]]:
+        """{stage: {percentile: milliseconds}} of the stages with samples."""
+        return {
+            stage: dict(zip(PERCENTILES, np.percentile(samples, PERCENTILES) / 1e6))
+            for stage, samples in self.samples.items()
+            if samples
+        }
+
+    def histogram(self, stage: str, bins: int = 20):
+        """(counts, bin edges in ms) of one stage."""
+        return np.histogram(np.asarray(self.samples[stage]) / 1e6, bins=bins)
+
+    def report(self) -> str:
+        lines = [f"Latency over {self.frames} frames [ms]:"]
+        lines.append(f"{'stage':>12} " + " ".join(f"{f'p{p}':>9}" for p in PERCENTILES))
+        for stage, values in self.percentiles_ms().items():
+            lines.append(f"{stage:>12} " + " ".join(f"{values[p]:9.3f}" for p in PERCENTILES))
+        return "\n".join(lines)
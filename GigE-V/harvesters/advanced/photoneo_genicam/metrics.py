@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Log-linear histogram buckets (like HdrHistogram): every power of two is split into
+# SUB_BUCKETS buckets, so a recorded value is off by at most 1 / SUB_BUCKETS (6.25 %).
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+NUM_BUCKETS = 64 * SUB_BUCKETS
+
+ENV_VARIABLE = "PHOTONEO_METRICS"
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return max(value, 0)
+    shift: int = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def bucket_value(index: int) -> int:
+    """The middle of the values in the bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift: int = index // SUB_BUCKETS - 1
+    return ((index - shift * SUB_BUCKETS) << shift) + (1 << shift) // 2
+
+
+class TimerShard:
+    """Statistics of one timer, written by a single thread only."""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.buckets: List[int] = [0] * NUM_BUCKETS
+
+    def record(self, value: int):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.buckets[bucket_index(value)] += 1
+
+
+class Timing:
+    __slots__ = ("shard", "start")
+
+    def __init__(self, shard: TimerShard):
+        self.shard = shard
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shard.record(time.perf_counter_ns() - self.start)
+
+
+class NoTiming:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+NO_TIMING = NoTiming()
+
+
+def percentile(buckets: List[int], count: int, q: float) -> int:
+    rank: float = q / 100 * count
+    seen = 0
+    for index, bucket_count in enumerate(buckets):
+        seen += bucket_count
+        if bucket_count and seen >= rank:
+            return bucket_value(index)
+    return 0
+
+
+class Metrics:
+    """
+    Registry of named timers (in nanoseconds, from perf_counter_ns) and counters.
+
+    Every thread records into its own shards, so the hot path takes no lock; only the first use of
+    a name in a thread registers its shard. snapshot() merges the shards of all threads, values
+    recorded concurrently may show up in the next snapshot only.
+
+    Disabled (the default, unless the PHOTONEO_METRICS environment variable is set to 1) timer()
+    returns a shared no-op context manager and record() / count() return right away.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._timers: Dict[str, List[TimerShard]] = {}
+        self._counters: Dict[str, List[List[int]]] = {}
+        self._exporter: threading.Thread = None
+        self._stop_export = threading.Event()
+
+    def _shard(self, kind: str, registry: Dict[str, list], name: str, factory):
+        shards: Dict[str, object] = self._local.__dict__.setdefault(kind, {})
+        shard = shards.get(name)
+        if shard is None:
+            shard = shards[name] = factory()
+            with self._lock:
+                registry.setdefault(name, []).append(shard)
+        return shard
+
+    def timer(self, name: str):
+        """Context manager measuring its body into the timer `name`."""
+        if not self.enabled:
+            return NO_TIMING
+        return Timing(self._shard("timers", self._timers, name, TimerShard))
+
+    def record(self, name: str, duration_ns: int):
+        if self.enabled:
+            self._shard("timers", self._timers, name, TimerShard).record(duration_ns)
+
+    def count(self, name: str, value: int = 1):
+        if self.enabled:
+            self._shard("counters", self._counters, name, lambda: [0])[0] += value
+
+    def reset(self):
+        """Drops all values, the threads start with new shards on their next record."""
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self._local = threading.local()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            timers = {name: list(shards) for name, shards in self._timers.items()}
+            counters = {name: list(shards) for name, shards in self._counters.items()}
+
+        result = {"timers": {}, "counters": {}}
+        for name, shards in timers.items():
+            count: int = sum(shard.count for shard in shards)
+            if count == 0:
+                continue
+            buckets: List[int] = [sum(column) for column in zip(*(s.buckets for s in shards))]
+            total: int = sum(shard.total for shard in shards)
+            result["timers"][name] = {
+                "count": count,
+                "mean_ms": total / count / 1e6,
+                "min_ms": min(s.min for s in shards if s.min is not None) / 1e6,
+                "max_ms": max(s.max for s in shards) / 1e6,
+                **{f"p{q}_ms": percentile(buckets, count, q) / 1e6 for q in (50, 95, 99)},
+            }
+        for name, shards in counters.items():
+            result["counters"][name] = sum(shard[0] for shard in shards)
+        return result
+
+    def report(self) -> str:
+        snapshot: dict = self.snapshot()
+        lines: List[str] = [
+            f"{name}: {t['count']} calls, mean {t['mean_ms']:.3f} ms, p50 {t['p50_ms']:.3f} ms, "
+            f"p99 {t['p99_ms']:.3f} ms, max {t['max_ms']:.3f} ms"
+            for name, t in snapshot["timers"].items()
+        ]
+        lines += [f"{name}: {value}" for name, value in snapshot["counters"].items()]
+        return "\n".join(lines)
+
+    def export_json(self, path: Path):
+        Path(path).write_text(json.dumps(self.snapshot(), indent=2))
+
+    def start_export(self, logger: logging.Logger, interval: float = 10, path: Path = None):
+        """Logs the report (and writes it to `path` as JSON) every `interval` seconds."""
+
+        def export():
+            while not self._stop_export.wait(interval):
+                logger.info(f"Metrics:\n{self.report()}")
+                if path is not None:
+                    self.export_json(path)
+
+        self._stop_export.clear()
+        self._exporter = threading.Thread(target=export, name="MetricsExport", daemon=True)
+        self._exporter.start()
+
+    def stop_export(self):
+        self._stop_export.set()
+        if self._exporter is not None:
+            self._exporter.join()
+            self._exporter = None
+
+
+metrics = Metrics(enabled=os.environ.get(ENV_VARIABLE, "0") == "1")
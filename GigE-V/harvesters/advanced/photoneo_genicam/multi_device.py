@@ -0,0 +1,239 @@
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+from genicam.genapi import NodeMap
+from genicam.gentl import TimeoutException
+from harvesters.core import Harvester, ImageAcquirer
+
+from .grabber import Frame
+from .timestamp_index import ClockTracker, TimestampIndex
+from .utils import data_stream_reset, logger
+
+
+@dataclass
+class DeviceStatistics:
+    """Per-device counters, the latency is measured from the trigger to the copied frame."""
+
+    serial_number: str
+    frames: int = 0
+    dropped: int = 0
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def record(self, latency_ms: float):
+        self.frames += 1
+        self.latencies_ms.append(latency_ms)
+
+    def __str__(self) -> str:
+        if not self.latencies_ms:
+            return f"{self.serial_number}: frames: {self.frames}, dropped: {self.dropped}"
+        p50, p95 = np.percentile(self.latencies_ms, [50, 95])
+        return (
+            f"{self.serial_number}: frames: {self.frames}, dropped: {self.dropped}, "
+            f"latency p50: {p50:.1f} ms, p95: {p95:.1f} ms, max: {max(self.latencies_ms):.1f} ms"
+        )
+
+
+@dataclass
+class FrameGroup:
+    """Frames taken together, keyed by the device serial number. Incomplete groups are empty."""
+
+    cycle: int
+    frames: Dict[str, Frame]
+    missing: List[str]
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+    @property
+    def timestamp_spread_ns(self) -> int:
+        """Difference of the PTP timestamps of the earliest and the latest frame."""
+        timestamps: List[int] = [frame.timestamp_ns for frame in self.frames.values()]
+        return max(timestamps) - min(timestamps) if timestamps else 0
+
+
+class MultiDeviceAcquirer:
+    """
+    Opens, configures and triggers several devices from one Harvester in parallel.
+
+    Every device operation (opening, configuration, trigger and fetch) runs as a task on a thread
+    pool with one worker per device, so the cycle time follows the slowest device instead of the
+    sum of all of them. `configure` is called with the NodeMap of each device, e.g. to load a user
+    set and enable the software trigger and PTP.
+
+    With `stagger` > 0 the devices are triggered one after another with that delay in seconds,
+    e.g. for projection based scanners whose patterns would interfere.
+
+    The fetched frames are grouped by their PTP timestamps with a TimestampIndex (converted with
+    `clock` when the devices aren't synchronised by PTP), a group has a frame of every device
+    within `tolerance_ns` (plus the stagger) of the first device. Frames which don't match yet
+    are held for the next cycles, at most `max_pending` per device, and discarded once they can't
+    be matched anymore, see `index.unmatched`.
+
+    The frames are copied into a ring of `max_pending` + 1 buffers per device, a group is valid
+    until the next grab().
+    """
+
+    def __init__(
+        self,
+        h: Harvester,
+        serial_numbers: List[str],
+        configure: Callable[[NodeMap], None] = None,
+        stagger: float = 0.0,
+        tolerance_ns: int = 1_000_000,
+        timeout: float = 10,
+        max_pending: int = 4,
+        clock: ClockTracker = None,
+    ):
+        self.h = h
+        self.serial_numbers: List[str] = list(serial_numbers)
+        self.configure = configure
+        self.stagger = stagger
+        self.tolerance_ns = tolerance_ns
+        self.timeout = timeout
+        self.devices: Dict[str, ImageAcquirer] = {}
+        self.stats: Dict[str, DeviceStatistics] = {
+            sn: DeviceStatistics(sn) for sn in self.serial_numbers
+        }
+        self.cycles = 0
+        self.cycle_times_ms: deque = deque(maxlen=1000)
+        self.index = TimestampIndex(
+            self.serial_numbers,
+            tolerance_ns + int(stagger * 1e9) * (len(self.serial_numbers) - 1),
+            max_frames=max_pending,
+            clock=clock,
+        )
+        # Frames held by the index and the last group are never overwritten by the next fetch
+        self._frames: Dict[str, List[Frame]] = {
+            sn: [Frame() for _ in range(max_pending + 1)] for sn in self.serial_numbers
+        }
+        self._fetched: Dict[str, int] = {sn: 0 for sn in self.serial_numbers}
+        self._matched: deque = deque()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(len(self.serial_numbers), 1), thread_name_prefix="MultiDevice"
+        )
+
+    def _open(self, serial_number: str) -> ImageAcquirer:
+        logger.info(f"Connecting to: {serial_number}")
+        ia: ImageAcquirer = self.h.create({"serial_number": serial_number})
+        if self.configure is not None:
+            self.configure(ia.remote_device.node_map)
+        data_stream_reset(ia)
+        ia.start()
+        return ia
+
+    def _close(self, serial_number: str):
+        ia: ImageAcquirer = self.devices[serial_number]
+        ia.stop()
+        ia.destroy()
+
+    def open(self):
+        futures: Dict[str, Future] = {
+            sn: self._executor.submit(self._open, sn) for sn in self.serial_numbers
+        }
+        errors: List[Exception] = []
+        for serial_number, future in futures.items():
+            try:
+                self.devices[serial_number] = future.result()
+            except Exception as e:
+                logger.error(f"{serial_number}: {e}")
+                errors.append(e)
+        if errors:
+            # Don't leave the devices which were opened successfully running
+            self.close()
+            raise errors[0]
+
+    def close(self):
+        try:
+            list(self._executor.map(self._close, list(self.devices)))
+        finally:
+            self.devices.clear()
+            self._executor.shutdown()
+        logger.debug(f"MultiDeviceAcquirer: {self.statistics()}")
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def latch_clocks(self, clock: ClockTracker):
+        """Samples the clock of every device at the same time, see ClockTracker."""
+        list(
+            self._executor.map(
+                lambda sn: clock.latch(sn, self.devices[sn].remote_device.node_map), self.devices
+            )
+        )
+
+    def _acquire(self, serial_number: str, trigger_time: float) -> Frame:
+        ia: ImageAcquirer = self.devices[serial_number]
+        delay: float = trigger_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        start: float = time.perf_counter()
+        ia.remote_device.node_map.TriggerSoftware.execute()
+        slots: List[Frame] = self._frames[serial_number]
+        frame: Frame = slots[self._fetched[serial_number] % len(slots)]
+        try:
+            with ia.fetch(timeout=self.timeout) as buffer:
+                frame.copy_from(buffer, self.cycles)
+        except TimeoutException:
+            self.stats[serial_number].dropped += 1
+            return None
+        self._fetched[serial_number] += 1
+        self.stats[serial_number].record((time.perf_counter() - start) * 1000)
+        return frame
+
+    def grab(self) -> FrameGroup:
+        """
+        Returns the oldest group which wasn't returned yet. Triggers all devices once when there is
+        none, the group is empty (incomplete) when the new frames don't complete a group either.
+        """
+        if not self._matched:
+            self._trigger_cycle()
+        if self._matched:
+            frames: Dict[str, Tuple[int, Any]] = self._matched.popleft()
+            return FrameGroup(
+                cycle=min(frame.frame_id for _, frame in frames.values()),
+                frames={sn: frame for sn, (_, frame) in frames.items()},
+                missing=[],
+            )
+        return FrameGroup(cycle=self.cycles - 1, frames={}, missing=list(self.serial_numbers))
+
+    def _trigger_cycle(self):
+        start: float = time.perf_counter()
+        trigger_times: List[float] = [
+            start + i * self.stagger for i in range(len(self.serial_numbers))
+        ]
+        received: List[Frame] = list(
+            self._executor.map(self._acquire, self.serial_numbers, trigger_times)
+        )
+        for serial_number, frame in zip(self.serial_numbers, received):
+            if frame is not None:
+                self.index.add(serial_number, frame.timestamp_ns, frame)
+        self._matched.extend(self.index.match())
+        if not self._matched:
+            lost = [sn for sn, frame in zip(self.serial_numbers, received) if frame is None]
+            reason: str = f"no frame from: {', '.join(lost)}" if lost else "not within tolerance"
+            logger.warning(f"Cycle {self.cycles}: no matching frame set, {reason}")
+        self.cycles += 1
+        self.cycle_times_ms.append((time.perf_counter() - start) * 1000)
+
+    def groups(self, count: int = None) -> Iterator[FrameGroup]:
+        """Yields `count` frame groups, or endless when None. A group is valid until the next."""
+        grabbed = 0
+        while count is None or grabbed < count:
+            yield self.grab()
+            grabbed += 1
+
+    def statistics(self) -> str:
+        lines: List[str] = [str(stats) for stats in self.stats.values()]
+        if self.cycle_times_ms:
+            lines.append(f"cycles: {self.cycles}, mean: {np.mean(self.cycle_times_ms):.1f} ms")
+        lines.append(f"matched: {self.index.matched}, unmatched frames: {self.index.unmatched}")
+        return "\n".join(lines)
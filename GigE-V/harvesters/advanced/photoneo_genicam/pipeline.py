@@ -0,0 +1,245 @@
+import multiprocessing
+import os
+import queue
+import time
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from .pointcloud import calculate_point_cloud_from_projc
+from .utils import logger
+from .ycocg import ycocg_to_rgb
+
+# How often result() checks that the worker processes are still alive while waiting, in seconds
+WORKER_CHECK_INTERVAL = 0.5
+
+# (shape, dtype) of one array of a frame slot
+ArrayLayout = Tuple[Tuple[int, ...], np.dtype]
+
+# task(inputs, outputs, *task_args) processes the input arrays of a slot into its output arrays
+Task = Callable[..., None]
+
+
+class SharedSlots:
+    """
+    Frame slots in shared memory, one block per slot holding one array per layout.
+
+    Created by the acquisition process and attached by name in the worker processes, so the frame
+    data is never pickled.
+    """
+
+    def __init__(self, layouts: List[ArrayLayout], num_slots: int = 0, names: List[str] = None):
+        self.layouts = [(tuple(shape), np.dtype(dtype)) for shape, dtype in layouts]
+        offsets, slot_size = [], 0
+        for shape, dtype in self.layouts:
+            offsets.append(slot_size)
+            # Keep every array 64-byte aligned
+            slot_size += -(-int(np.prod(shape)) * dtype.itemsize // 64) * 64
+
+        self.owner: bool = names is None
+        if self.owner:
+            self.blocks = [
+                SharedMemory(create=True, size=max(slot_size, 1)) for _ in range(num_slots)
+            ]
+        else:
+            self.blocks = [SharedMemory(name=name) for name in names]
+        self.arrays: List[List[np.ndarray]] = [
+            [
+                np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+                for (shape, dtype), offset in zip(self.layouts, offsets)
+            ]
+            for block in self.blocks
+        ]
+
+    @property
+    def names(self) -> List[str]:
+        return [block.name for block in self.blocks]
+
+    def close(self):
+        # The arrays have to be released before the shared memory can be closed
+        self.arrays = []
+        for block in self.blocks:
+            block.close()
+            if self.owner:
+                block.unlink()
+
+
+def worker_loop(
+    task: Task, task_args: tuple, inputs_spec: tuple, outputs_spec: tuple, tasks, results
+):
+    inputs, outputs = SharedSlots(*inputs_spec), SharedSlots(*outputs_spec)
+    try:
+        for sequence, slot in iter(tasks.get, None):
+            try:
+                task(inputs.arrays[slot], outputs.arrays[slot], *task_args)
+                results.put((sequence, slot, None))
+            except Exception as e:
+                results.put((sequence, slot, repr(e)))
+    finally:
+        inputs.close()
+        outputs.close()
+
+
+class ProcessingPipeline:
+    """
+    Processes frames in a pool of worker processes through shared-memory slots.
+
+    submit() copies the frame arrays into a free input slot and queues it, the workers run
+    `task(inputs, outputs, *task_args)` on the slot and result() returns the output arrays in the
+    order the frames were submitted. A slot is only freed by result(), so submit() raises when all
+    slots are in flight, unless a `timeout` is given for another thread taking the results, which
+    then applies backpressure to the acquisition. result() raises when a worker process died.
+    `task` and `task_args` have to be picklable, `task_args` are sent to each worker once.
+
+    Use process() to keep the pipeline full from a single thread.
+    """
+
+    def __init__(
+        self,
+        task: Task,
+        input_layouts: List[ArrayLayout],
+        output_layouts: List[ArrayLayout],
+        task_args: tuple = (),
+        num_workers: int = None,
+        num_slots: int = None,
+    ):
+        self.num_workers: int = num_workers or os.cpu_count()
+        self.num_slots: int = num_slots or 2 * self.num_workers
+        self.submitted = 0
+        self.completed = 0
+        self._start_time: float = None
+        self._inputs = SharedSlots(input_layouts, self.num_slots)
+        self._outputs = SharedSlots(output_layouts, self.num_slots)
+        self._free: queue.Queue = queue.Queue()
+        for slot in range(self.num_slots):
+            self._free.put(slot)
+        self._done = {}
+
+        context = multiprocessing.get_context("spawn")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        inputs_spec = (self._inputs.layouts, 0, self._inputs.names)
+        outputs_spec = (self._outputs.layouts, 0, self._outputs.names)
+        self._workers = [
+            context.Process(
+                target=worker_loop,
+                args=(task, task_args, inputs_spec, outputs_spec, self._tasks, self._results),
+                daemon=True,
+            )
+            for _ in range(self.num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._inputs.close()
+        self._outputs.close()
+        logger.debug(f"ProcessingPipeline: {self.statistics()}")
+
+    def submit(self, arrays: List[np.ndarray], timeout: float = 0) -> int:
+        """
+        Copies the frame into a free slot. Waits at most `timeout` seconds for one (None waits
+        until another thread takes a result), raises when none is free.
+        """
+        try:
+            slot: int = self._free.get(block=timeout != 0, timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError(
+                f"All {self.num_slots} slots are in flight, take a result() before submitting"
+            ) from None
+        for target, source in zip(self._inputs.arrays[slot], arrays):
+            np.copyto(target, source.reshape(target.shape))
+        if self._start_time is None:
+            self._start_time = time.perf_counter()
+        self._tasks.put((self.submitted, slot))
+        self.submitted += 1
+        return self.submitted - 1
+
+    @contextmanager
+    def result(self, timeout: float = None) -> Iterator[List[np.ndarray]]:
+        """
+        Context manager with the output arrays of the next frame in submission order.
+        The slot is reused after the context exits.
+        """
+        deadline: float = None if timeout is None else time.perf_counter() + timeout
+        while self.completed not in self._done:
+            remaining: float = WORKER_CHECK_INTERVAL
+            if deadline is not None:
+                remaining = max(min(remaining, deadline - time.perf_counter()), 0)
+            try:
+                sequence, slot, error = self._results.get(timeout=remaining)
+            except queue.Empty:
+                self._check_workers()
+                if deadline is not None and time.perf_counter() >= deadline:
+                    raise TimeoutError(f"No result of frame {self.completed} in time") from None
+                continue
+            self._done[sequence] = (slot, error)
+        slot, error = self._done.pop(self.completed)
+        self.completed += 1
+        try:
+            if error is not None:
+                raise RuntimeError(f"Processing frame {self.completed - 1} failed: {error}")
+            yield self._outputs.arrays[slot]
+        finally:
+            self._free.put(slot)
+
+    def _check_workers(self):
+        for worker in self._workers:
+            if not worker.is_alive():
+                raise RuntimeError(
+                    f"Worker process {worker.pid} exited with code {worker.exitcode}, "
+                    f"frame {self.completed} won't be processed"
+                )
+
+    def process(self, frames: Iterable[List[np.ndarray]]) -> Iterator[List[np.ndarray]]:
+        """Yields the outputs of the frames in order, the arrays are valid until the next step."""
+        in_flight = 0
+        for arrays in frames:
+            if in_flight == self.num_slots:
+                with self.result() as outputs:
+                    yield outputs
+                in_flight -= 1
+            self.submit(arrays)
+            in_flight += 1
+        for _ in range(in_flight):
+            with self.result() as outputs:
+                yield outputs
+
+    def throughput(self) -> float:
+        """Completed frames per second since the first submitted frame."""
+        if self._start_time is None or self.completed == 0:
+            return 0.0
+        return self.completed / (time.perf_counter() - self._start_time)
+
+    def statistics(self) -> str:
+        return (
+            f"workers: {self.num_workers}, submitted: {self.submitted}, "
+            f"completed: {self.completed}, throughput: {self.throughput():.1f} FPS"
+        )
+
+
+def projected_c_task(inputs: List[np.ndarray], outputs: List[np.ndarray], coordinate_map):
+    """ProjectedC depth map -> (num_points, 3) point cloud, see ProjectedCReconstructor."""
+    calculate_point_cloud_from_projc(inputs[0], coordinate_map, outputs[0])
+
+
+def ycocg_task(inputs: List[np.ndarray], outputs: List[np.ndarray]):
+    """
+    (height, width) YCoCg image -> (height, width, 3) RGB image, see ycocg_to_rgb.
+
+    ycocg_to_rgb already uses all cores with numba, set NUMBA_NUM_THREADS=1 before starting the
+    pipeline to avoid oversubscribing them with several workers.
+    """
+    ycocg_to_rgb(inputs[0], outputs[0])
@@ -1,3 +1,7 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List
+
 import numpy as np
 import open3d as o3d
 from genicam.genapi import NodeMap
@@ -10,8 +14,80 @@ from .utils import measure_time, setup_logger
 logger = setup_logger()
 
 
-def calculate_point_cloud_from_projc(depth_map: np.ndarray, coordinate_map: np.ndarray) -> np.array:
-    return depth_map[:, np.newaxis] * coordinate_map
+def calculate_point_cloud_from_projc(
+    depth_map: np.ndarray, coordinate_map: np.ndarray, out: np.ndarray = None
+) -> np.array:
+    return np.multiply(depth_map.reshape(-1, 1), coordinate_map, out=out)
+
+
+class ProjectedCReconstructor:
+    """
+    Reconstructs point clouds from ProjectedC depth maps into a preallocated output buffer.
+
+    Same computation as calculate_point_cloud_from_projc, but the result is written in place, so
+    reconstructing a frame doesn't allocate. The depth map can be passed directly from the fetched
+    buffer, no copy is needed. The returned array is reused by the next reconstruct() call.
+    """
+
+    def __init__(self, coordinate_map: np.ndarray):
+        self.coordinate_map: np.ndarray = np.ascontiguousarray(
+            coordinate_map.reshape(-1, 3), dtype=np.float32
+        )
+        self.points: np.ndarray = np.empty_like(self.coordinate_map)
+        self._transformed_coordinate_map: np.ndarray = None
+        self._translation: np.ndarray = None
+        self._valid: np.ndarray = np.empty((len(self.coordinate_map), 1), dtype=bool)
+
+    @classmethod
+    def from_device(cls, ia: ImageAcquirer) -> "ProjectedCReconstructor":
+        return cls(pre_fetch_coordinate_maps(ia))
+
+    def set_transformation(self, transformation_matrix: np.ndarray = None):
+        """
+        Fuses a 4x4 rigid transformation (e.g. into marker space) into reconstruct().
+
+        Since R (d * c) + t = d * (R c) + t, the rotation is applied to the coordinate map once
+        here and reconstruct() stays a single pass over the depth map. Pass None to reset it.
+        """
+        if transformation_matrix is None:
+            self._transformed_coordinate_map = self._translation = None
+            return
+        rotation, translation = rigid_transformation(transformation_matrix)
+        self._transformed_coordinate_map = self.coordinate_map @ rotation
+        self._translation = translation
+
+    def reconstruct(self, depth_map: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Pass `out` to write the points into another (num_points, 3) float32 array."""
+        out = self.points if out is None else out
+        if self._translation is None:
+            return calculate_point_cloud_from_projc(depth_map, self.coordinate_map, out)
+
+        calculate_point_cloud_from_projc(depth_map, self._transformed_coordinate_map, out)
+        # Invalid points (zero depth) stay (0, 0, 0)
+        np.not_equal(depth_map.reshape(-1, 1), 0, out=self._valid)
+        return np.add(out, self._translation, out=out, where=self._valid)
+
+
+def rigid_transformation(transformation_matrix: np.ndarray) -> tuple:
+    """Splits a 4x4 matrix into the float32 (transposed rotation, translation) for row vectors."""
+    rotation = np.ascontiguousarray(transformation_matrix[:3, :3].T, dtype=np.float32)
+    translation = np.asarray(transformation_matrix[:3, 3], dtype=np.float32)
+    return rotation, translation
+
+
+def transform_points(
+    points: np.ndarray, transformation_matrix: np.ndarray, out: np.ndarray = None
+) -> np.ndarray:
+    """
+    Applies a 4x4 rigid transformation (e.g. from TransformationMatrixDecoder) to a float32 Range
+    buffer with one batched matmul, into `out` when given. Invalid (0, 0, 0) points are kept.
+    """
+    points = as_point_array(points)
+    rotation, translation = rigid_transformation(transformation_matrix)
+    # Masked before the matmul, which overwrites the points when transforming in place
+    valid = points[:, 2:3] != 0
+    out = np.matmul(points, rotation, out=out)
+    return np.add(out, translation, out=out, where=valid)
 
 
 def construct_coordinate_map(
@@ -33,19 +109,215 @@ def create_3d_vector(input_array_as_np: np.ndarray):
     return o3d.utility.Vector3dVector(input_array_as_np.reshape(-1, 3).astype(np.float64))
 
 
-def map_texture(texture: Component2DImage) -> o3d.utility.Vector3dVector:
-    # o3d point colors property expect (num_points, 3), range [0, 1] format
+def as_point_array(data: np.ndarray) -> np.ndarray:
+    """Returns a (num_points, 3) view of a Range / Normal buffer without copying or upcasting it."""
+    return data.reshape(-1, 3)
+
+
+def create_tensor_point_cloud(
+    points: np.ndarray, normals: np.ndarray = None, colors: np.ndarray = None
+) -> o3d.t.geometry.PointCloud:
+    """
+    Creates a float32 tensor point cloud which shares memory with the given arrays.
+
+    Unlike create_3d_vector, no float64 copy is made. The arrays have to stay valid while the point
+    cloud is used, i.e. use it inside the `ia.fetch()` context when passing component data directly.
+    Use `o3d.t.io.write_point_cloud` to export it and `.to_legacy()` for the legacy visualizer.
+    """
+    point_cloud = o3d.t.geometry.PointCloud(o3d.core.Tensor.from_numpy(as_point_array(points)))
+    if normals is not None:
+        point_cloud.point.normals = o3d.core.Tensor.from_numpy(as_point_array(normals))
+    if colors is not None:
+        point_cloud.point.colors = o3d.core.Tensor.from_numpy(as_point_array(colors))
+    return point_cloud
+
+
+@dataclass
+class ValidPoints:
+    """
+    Indices of the valid points of one frame, computed once and shared by all of its components.
+
+    Compacting Range, Normal and texture data with the same indices keeps them aligned, while the
+    downstream processing only handles the real points instead of the full sensor resolution.
+    """
+
+    indices: np.ndarray
+    num_points: int
+
+    @classmethod
+    def from_frame(
+        cls, range_data: np.ndarray = None, confidence: np.ndarray = None, min_confidence: int = 1
+    ) -> "ValidPoints":
+        """Invalid points are (0, 0, 0) in the Range data and / or below `min_confidence`."""
+        if range_data is None and confidence is None:
+            raise ValueError("Range or Confidence data is required")
+        mask: np.ndarray = None
+        if range_data is not None:
+            mask = as_point_array(range_data)[:, 2] != 0
+        if confidence is not None:
+            confident = confidence.reshape(-1) >= min_confidence
+            mask = confident if mask is None else np.logical_and(mask, confident, out=mask)
+        return cls(np.flatnonzero(mask), len(mask))
+
+    def compact(self, data: np.ndarray) -> np.ndarray:
+        """Returns the values of the valid points, (num_valid, channels) or (num_valid,)."""
+        compacted = data.reshape(self.num_points, -1).take(self.indices, axis=0)
+        return compacted[:, 0] if compacted.shape[1] == 1 else compacted
+
+
+def organised_grid(points: np.ndarray, width: int, height: int) -> np.ndarray:
+    """(height, width, 3) view of an organised Range buffer, e.g. Component2DImage.data."""
+    return as_point_array(points).reshape(height, width, 3)
+
+
+def stride_downsample(
+    points: np.ndarray, width: int, height: int, stride: int = 2, skip_invalid: bool = True
+) -> np.ndarray:
+    """Every `stride`-th point of every `stride`-th row of the organised grid."""
+    grid: np.ndarray = organised_grid(points, width, height)[::stride, ::stride].reshape(-1, 3)
+    return grid[grid[:, 2] != 0] if skip_invalid else grid
+
+
+def block_median_downsample(
+    points: np.ndarray, width: int, height: int, block: int = 4
+) -> np.ndarray:
+    """
+    One point per `block` x `block` pixels of the organised grid: the per-coordinate median of
+    the valid points in the block. Blocks without valid points are skipped, partial blocks at the
+    right and bottom border are cropped.
+    """
+    rows, cols = height // block, width // block
+    grid: np.ndarray = organised_grid(points, width, height)[: rows * block, : cols * block]
+    blocks = grid.reshape(rows, block, cols, block, 3).transpose(0, 2, 1, 3, 4)
+    blocks = blocks.reshape(rows * cols, block * block, 3)
+    # Invalid points become NaN, which sorts last, so the valid points come first in every block
+    blocks = np.where(blocks[:, :, 2:3] != 0, blocks, np.float32(np.nan))
+    blocks.sort(axis=1)
+    num_valid: np.ndarray = np.count_nonzero(blocks[:, :, 2] == blocks[:, :, 2], axis=1)
+    occupied: np.ndarray = np.flatnonzero(num_valid)
+    lower = ((num_valid[occupied] - 1) // 2)[:, None, None]
+    upper = (num_valid[occupied] // 2)[:, None, None]
+    blocks = blocks[occupied]
+    median = np.take_along_axis(blocks, lower, axis=1) + np.take_along_axis(blocks, upper, axis=1)
+    return (median.reshape(-1, 3) * 0.5).astype(np.float32, copy=False)
+
+
+def voxel_downsample(points: np.ndarray, voxel_size: float) -> np.ndarray:
+    """
+    The average of the valid points in each occupied voxel, like Open3D's voxel_down_sample but
+    straight on the (num_points, 3) buffer.
+
+    The voxel coordinates are hashed into one int64 key per point. When the keys are dense enough
+    they index the per-voxel sums directly, otherwise np.unique maps them to voxels. When the
+    voxel grid has more cells than int64 keys (e.g. far outliers), np.unique maps the voxel
+    coordinates themselves.
+    """
+    points = as_point_array(points)
+    # (3, num_valid), reductions over contiguous rows are much faster than over the columns
+    valid: np.ndarray = np.ascontiguousarray(points.take(np.flatnonzero(points[:, 2]), axis=0).T)
+    if valid.shape[1] == 0:
+        return np.empty((0, 3), dtype=np.float32)
+
+    scaled: np.ndarray = valid * np.float32(1 / voxel_size)
+    scaled -= np.floor(scaled.min(axis=1, keepdims=True))
+    upper: np.ndarray = scaled.max(axis=1)
+    if upper.max() >= np.iinfo(np.int64).max:
+        raise Exception(f"Voxel size {voxel_size} is too small for the extent of the points")
+    # Non-negative, so truncating is flooring
+    cells: np.ndarray = scaled.astype(np.int64)
+    dims: List[int] = (upper.astype(np.int64) + 1).tolist()
+
+    # Python ints, the number of cells can exceed int64
+    num_cells: int = dims[0] * dims[1] * dims[2]
+    if num_cells > np.iinfo(np.int64).max:
+        _, inverse, counts = np.unique(cells, axis=1, return_inverse=True, return_counts=True)
+        return _average_voxels(valid, inverse.reshape(-1), counts)
+
+    keys: np.ndarray = (cells[0] * dims[1] + cells[1]) * dims[2] + cells[2]
+    if num_cells <= 4 * len(keys):
+        counts: np.ndarray = np.bincount(keys, minlength=num_cells)
+        occupied: np.ndarray = np.flatnonzero(counts)
+        voxel_of_cell = np.empty(num_cells, dtype=np.int64)
+        voxel_of_cell[occupied] = np.arange(len(occupied))
+        inverse: np.ndarray = voxel_of_cell[keys]
+        counts = counts[occupied]
+    else:
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    return _average_voxels(valid, inverse, counts)
+
+
+def _average_voxels(valid: np.ndarray, inverse: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    downsampled = np.empty((len(counts), 3), dtype=np.float32)
+    for axis in range(3):
+        sums = np.bincount(inverse, weights=valid[axis], minlength=len(counts))
+        downsampled[:, axis] = sums / counts
+    return downsampled
+
+
+# Number of texture levels of the mono pixel formats, texture values are normalized by them
+MONO_TEXTURE_LEVELS = {"Mono10": 1 << 10, "Mono12": 1 << 12, "Mono16": 1 << 16}
+
+
+@lru_cache(maxsize=None)
+def texture_lut(data_format: str, dtype=np.float32) -> np.ndarray:
+    """
+    Returns the lookup table from texture values to colors, so mapping a texture is a single gather.
+
+    Mono formats map to gray (levels, 3) triplets, RGB8 maps each channel separately (256,).
+    Float tables are normalized to [0, 1], uint8 tables are scaled to [0, 255].
+    """
+    if data_format == "RGB8":
+        levels, scale = 256, 255.0
+    elif data_format in MONO_TEXTURE_LEVELS:
+        levels = scale = MONO_TEXTURE_LEVELS[data_format]
+    else:
+        raise Exception(f"Unexpected pixel format: {data_format}")
+
+    values = np.arange(levels)
+    if np.dtype(dtype) == np.uint8:
+        lut = (values * 256 // levels).astype(np.uint8)
+    else:
+        lut = (values / scale).astype(dtype)
+    if data_format != "RGB8":
+        lut = np.repeat(lut[:, np.newaxis], 3, axis=-1)
+    lut.flags.writeable = False
+    return lut
+
+
+def texture_colors(
+    texture: Component2DImage,
+    dtype=np.float32,
+    out: np.ndarray = None,
+    valid_points: ValidPoints = None,
+) -> np.ndarray:
+    """
+    Returns the (num_points, 3) colors of the texture, float in range [0, 1] or uint8.
+
+    Pass a preallocated `out` of the same dtype to reuse it between frames, and `valid_points`
+    to map only the valid points. The colors never share memory with the texture buffer, which
+    is returned to the driver after the fetch.
+    """
+    data: np.ndarray = texture.data if valid_points is None else valid_points.compact(texture.data)
+    if texture.data_format == "RGB8" and np.dtype(dtype) == np.uint8:
+        colors: np.ndarray = data.reshape(-1, 3)
+        if out is not None:
+            np.copyto(out, colors)
+            return out
+        # compact() already returns a copy
+        return colors if valid_points is not None else colors.copy()
+    lut: np.ndarray = texture_lut(texture.data_format, dtype)
     if texture.data_format == "RGB8":
-        return o3d.utility.Vector3dVector(texture.data.reshape(-1, 3).astype(np.float64) / 255.0)
-    if texture.data_format == "Mono10":
-        normalized = texture.data.reshape(-1, 1).astype(np.float64) / 1024.0
-        return o3d.utility.Vector3dVector(np.repeat(normalized, 3, axis=-1))
-    if texture.data_format == "Mono12":
-        normalized = texture.data.reshape(-1, 1).astype(np.float64) / 4096.0
-        return o3d.utility.Vector3dVector(np.repeat(normalized, 3, axis=-1))
-    if texture.data_format == "Mono16":
-        normalized = texture.data.reshape(-1, 1).astype(np.float64) / 65536.0
-        return o3d.utility.Vector3dVector(np.repeat(normalized, 3, axis=-1))
+        return lut.take(data.reshape(-1, 3), out=out, mode="clip")
+    return lut.take(data, axis=0, out=out, mode="clip")
+
+
+def map_texture(
+    texture: Component2DImage, valid_points: ValidPoints = None
+) -> o3d.utility.Vector3dVector:
+    # o3d point colors property expect (num_points, 3), range [0, 1] format
+    return o3d.utility.Vector3dVector(
+        texture_colors(texture, dtype=np.float64, valid_points=valid_points)
+    )
 
 
 @measure_time
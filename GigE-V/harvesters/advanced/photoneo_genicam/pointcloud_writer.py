@@ -0,0 +1,150 @@
+from typing import BinaryIO, Callable, List, Tuple
+
+import numpy as np
+
+# Number of points interleaved and written at once
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+PLY_TYPES = {"f4": "float", "u1": "uchar", "u2": "ushort", "u4": "uint"}
+PCD_TYPES = {"f4": "F", "u1": "U", "u2": "U", "u4": "U"}
+
+Column = Callable[[slice], np.ndarray]
+Field = Tuple[str, np.dtype, Column]
+
+
+def column(array: np.ndarray, index: int) -> Column:
+    return lambda rows: array[rows, index]
+
+
+def packed_rgb(colors: np.ndarray) -> Column:
+    """PCD stores colors as one 0x00RRGGBB value."""
+
+    def pack(rows: slice) -> np.ndarray:
+        rgb = colors[rows].astype(np.uint32)
+        return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+    return pack
+
+
+def point_fields(
+    points: np.ndarray,
+    normals: np.ndarray = None,
+    intensity: np.ndarray = None,
+    confidence: np.ndarray = None,
+    pcd: bool = False,
+) -> List[Field]:
+    """
+    Describes the interleaved per-point record, one (name, dtype, column) entry per field.
+
+    Range / Normal data can be passed as they are, Intensity either as Mono (one value per point)
+    or RGB8 (three values per point).
+    """
+    points = points.reshape(-1, 3)
+    num_points: int = len(points)
+    float32 = np.dtype("<f4")
+
+    fields: List[Field] = [(name, float32, column(points, i)) for i, name in enumerate("xyz")]
+    if normals is not None:
+        names = ("normal_x", "normal_y", "normal_z") if pcd else ("nx", "ny", "nz")
+        normals = normals.reshape(-1, 3)
+        fields += [(name, float32, column(normals, i)) for i, name in enumerate(names)]
+    if intensity is not None:
+        if intensity.size == 3 * num_points:
+            colors = intensity.reshape(-1, 3)
+            if pcd:
+                fields.append(("rgb", np.dtype("<u4"), packed_rgb(colors)))
+            else:
+                names = ("red", "green", "blue")
+                uint8 = np.dtype("u1")
+                fields += [(name, uint8, column(colors, i)) for i, name in enumerate(names)]
+        else:
+            dtype = intensity.dtype.newbyteorder("<")
+            fields.append(("intensity", dtype, column(intensity.reshape(-1, 1), 0)))
+    if confidence is not None:
+        fields.append(("confidence", np.dtype("u1"), column(confidence.reshape(-1, 1), 0)))
+    return fields
+
+
+def count_points(points: np.ndarray, skip_invalid: bool, chunk_size: int) -> int:
+    points = points.reshape(-1, 3)
+    if not skip_invalid:
+        return len(points)
+    # Invalid points are (0, 0, 0), a zero Z is enough to detect them
+    return sum(
+        int(np.count_nonzero(points[start : start + chunk_size, 2]))
+        for start in range(0, len(points), chunk_size)
+    )
+
+
+def write_records(
+    file: BinaryIO, points: np.ndarray, fields: List[Field], skip_invalid: bool, chunk_size: int
+):
+    """Interleaves the fields chunk by chunk into one reused structured buffer and writes it."""
+    points = points.reshape(-1, 3)
+    record = np.empty(chunk_size, dtype=np.dtype([(name, dtype) for name, dtype, _ in fields]))
+    for start in range(0, len(points), chunk_size):
+        rows = slice(start, min(start + chunk_size, len(points)))
+        chunk = record[: rows.stop - rows.start]
+        for name, _, values in fields:
+            chunk[name] = values(rows)
+        if skip_invalid:
+            chunk = chunk[points[rows, 2] != 0]
+        file.write(chunk.data)
+
+
+def write_ply(
+    filename: str,
+    points: np.ndarray,
+    normals: np.ndarray = None,
+    intensity: np.ndarray = None,
+    confidence: np.ndarray = None,
+    skip_invalid: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Streams the point cloud into a binary little-endian PLY file.
+    Returns the number of points written.
+
+    The component arrays are read chunk by chunk, the whole point cloud is never copied.
+    With `skip_invalid` the (0, 0, 0) points are left out.
+    """
+    fields = point_fields(points, normals, intensity, confidence)
+    num_points: int = count_points(points, skip_invalid, chunk_size)
+    header = ["ply", "format binary_little_endian 1.0", f"element vertex {num_points}"]
+    header += [f"property {PLY_TYPES[dtype.str[1:]]} {name}" for name, dtype, _ in fields]
+    header.append("end_header")
+    with open(filename, "wb") as file:
+        file.write(("\n".join(header) + "\n").encode("ascii"))
+        write_records(file, points, fields, skip_invalid, chunk_size)
+    return num_points
+
+
+def write_pcd(
+    filename: str,
+    points: np.ndarray,
+    normals: np.ndarray = None,
+    intensity: np.ndarray = None,
+    confidence: np.ndarray = None,
+    skip_invalid: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Same as write_ply, but writes a binary PCD (v0.7) file."""
+    fields = point_fields(points, normals, intensity, confidence, pcd=True)
+    num_points: int = count_points(points, skip_invalid, chunk_size)
+    header = [
+        "# .PCD v0.7 - Point Cloud Data file format",
+        "VERSION 0.7",
+        "FIELDS " + " ".join(name for name, _, _ in fields),
+        "SIZE " + " ".join(str(dtype.itemsize) for _, dtype, _ in fields),
+        "TYPE " + " ".join(PCD_TYPES[dtype.str[1:]] for _, dtype, _ in fields),
+        "COUNT " + " ".join("1" for _ in fields),
+        f"WIDTH {num_points}",
+        "HEIGHT 1",
+        "VIEWPOINT 0 0 0 1 0 0 0",
+        f"POINTS {num_points}",
+        "DATA binary",
+    ]
+    with open(filename, "wb") as file:
+        file.write(("\n".join(header) + "\n").encode("ascii"))
+        write_records(file, points, fields, skip_invalid, chunk_size)
+    return num_points
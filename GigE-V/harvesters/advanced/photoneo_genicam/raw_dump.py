@@ -0,0 +1,123 @@
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from harvesters.core import Component2DImage
+
+MAGIC = b"PHORAW\x00\x00"
+VERSION = 1
+# Keeps the data 64 byte aligned in the file and in memory maps of it
+HEADER_SIZE = 128
+HEADER_FORMAT = "<8sIIIII8s32sQ"
+
+
+@dataclass
+class RawDumpHeader:
+    """
+    Fixed size header of a raw dump, followed by the component data exactly as in the buffer, so
+    dumps can be reloaded with np.memmap without guessing the shape.
+
+    Layout (little endian, zero padded to HEADER_SIZE bytes): magic (8s), version (u32),
+    header size (u32), width (u32), height (u32), components per pixel (u32),
+    dtype (8s, NumPy dtype string), pixel format (32s), timestamp in ns (u64)
+    """
+
+    width: int
+    height: int
+    pixel_format: str
+    dtype: str
+    components_per_pixel: int = 1
+    timestamp_ns: int = 0
+
+    @classmethod
+    def for_component(
+        cls, component: "Component2DImage", timestamp_ns: int = 0
+    ) -> "RawDumpHeader":
+        return cls(
+            component.width,
+            component.height,
+            component.data_format,
+            component.data.dtype.str,
+            int(component.num_components_per_pixel),
+            timestamp_ns,
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.height, self.width, self.components_per_pixel
+
+    @property
+    def data_size(self) -> int:
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+    def pack(self) -> bytes:
+        header = struct.pack(
+            HEADER_FORMAT,
+            MAGIC,
+            VERSION,
+            HEADER_SIZE,
+            self.width,
+            self.height,
+            self.components_per_pixel,
+            self.dtype.encode(),
+            self.pixel_format.encode(),
+            self.timestamp_ns,
+        )
+        return header.ljust(HEADER_SIZE, b"\x00")
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "RawDumpHeader":
+        if len(data) < struct.calcsize(HEADER_FORMAT) or not data.startswith(MAGIC):
+            raise Exception("Not a raw dump, the header is missing")
+        fields = struct.unpack_from(HEADER_FORMAT, data)
+        _, version, header_size, width, height, channels, dtype, pixel_format, timestamp = fields
+        if version != VERSION or header_size != HEADER_SIZE:
+            raise Exception(f"Unsupported raw dump version: {version}")
+        return cls(
+            width,
+            height,
+            pixel_format.rstrip(b"\x00").decode(),
+            dtype.rstrip(b"\x00").decode(),
+            channels,
+            timestamp,
+        )
+
+
+def write_raw_dump(filename: str, header: RawDumpHeader, data: np.ndarray):
+    """Writes the header and the whole data buffer in one write call each."""
+    data = np.ascontiguousarray(data, dtype=header.dtype)
+    if data.nbytes != header.data_size:
+        raise Exception(f"Data size {data.nbytes} doesn't match the header: {header.data_size}")
+    with open(filename, "wb") as file:
+        file.write(header.pack())
+        file.write(memoryview(data).cast("B"))
+
+
+def dump_component(filename: str, component: "Component2DImage", timestamp_ns: int = 0):
+    write_raw_dump(filename, RawDumpHeader.for_component(component, timestamp_ns), component.data)
+
+
+def create_raw_dump(filename: str, header: RawDumpHeader) -> np.memmap:
+    """
+    Preallocates a dump file and returns a writable (height, width, components) memory map of its
+    data, e.g. to copy frames into with np.copyto. Call flush() on it once it's filled.
+    """
+    with open(filename, "wb") as file:
+        file.write(header.pack())
+        file.truncate(HEADER_SIZE + header.data_size)
+    return np.memmap(filename, header.dtype, "r+", offset=HEADER_SIZE, shape=header.shape)
+
+
+def read_raw_dump_header(filename: str) -> RawDumpHeader:
+    with open(filename, "rb") as file:
+        return RawDumpHeader.unpack(file.read(HEADER_SIZE))
+
+
+def read_raw_dump(filename: str, mode: str = "r") -> Tuple[RawDumpHeader, np.memmap]:
+    """Memory maps the data of a dump as a (height, width, components) array."""
+    header = read_raw_dump_header(filename)
+    data = np.memmap(filename, header.dtype, mode, offset=HEADER_SIZE, shape=header.shape)
+    return header, data
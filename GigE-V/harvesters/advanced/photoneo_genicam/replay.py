@@ -0,0 +1,262 @@
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+from genicam.genapi import NodeMap
+from genicam.gentl import TimeoutException
+from harvesters.core import Buffer, Component2DImage
+
+from .features import read_feature
+from .grabber import FrameComponent
+from .utils import logger
+
+INDEX_FILE = "index.json"
+FORMAT_VERSION = 1
+
+# Device features stored with a recording, e.g. for the coordinate map or a report
+RECORDED_FEATURES = [
+    "DeviceSerialNumber",
+    "DeviceModelName",
+    "DeviceFirmwareVersion",
+    "Width",
+    "Height",
+    "Scan3dOutputMode",
+    "Scan3dFocalLength",
+    "Scan3dAspectRatio",
+    "Scan3dPrincipalPointU",
+    "Scan3dPrincipalPointV",
+]
+
+
+class FrameRecorder:
+    """
+    Records multipart frames into a directory, to replay them later with ReplayAcquirer.
+
+    Each component is saved as a .npy file (its flat buffer, like Component2DImage.data) and
+    index.json describes the frames: component names and formats, timestamps and optional chunk
+    values, e.g. TransformationMatrixDecoder.as_dict(). `component_names` are the enabled
+    components in payload order, see components.enabled_components().
+    """
+
+    def __init__(self, path: Path, component_names: List[str], features: NodeMap = None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.component_names: List[str] = list(component_names)
+        self.features: Dict[str, Any] = {}
+        if features is not None:
+            self.features = {name: read_feature(features, name) for name in RECORDED_FEATURES}
+        self.frames: List[dict] = []
+
+    def record(self, buffer: Buffer, chunks: Dict[str, Any] = None):
+        frame_index: int = len(self.frames)
+        components: List[dict] = []
+        for name, component in zip(self.component_names, buffer.payload.components):
+            component: Component2DImage
+            file_name = f"{frame_index:06d}_{name}.npy"
+            np.save(self.path / file_name, component.data)
+            components.append(
+                {
+                    "name": name,
+                    "file": file_name,
+                    "width": component.width,
+                    "height": component.height,
+                    "data_format": component.data_format,
+                    "num_components_per_pixel": component.num_components_per_pixel,
+                }
+            )
+        self.frames.append(
+            {
+                "timestamp_ns": buffer.timestamp_ns,
+                "components": components,
+                "chunks": chunks or {},
+            }
+        )
+
+    def close(self):
+        index = {"version": FORMAT_VERSION, "features": self.features, "frames": self.frames}
+        (self.path / INDEX_FILE).write_text(json.dumps(index, indent=1, default=_to_json))
+        logger.info(f"Recorded {len(self.frames)} frames to: {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _to_json(value: Any):
+    # Chunk values are often NumPy arrays or scalars
+    return value.tolist() if isinstance(value, (np.ndarray, np.generic)) else str(value)
+
+
+@dataclass
+class ReplayStatistics:
+    """The subset of harvesters' Statistics the examples use."""
+
+    num_images: int = 0
+    fps: float = 0.0
+    fps_max: float = 0.0
+    _start: float = field(default=0.0, repr=False)
+
+    def reset(self):
+        self.num_images, self.fps, self.fps_max, self._start = 0, 0.0, 0.0, time.perf_counter()
+
+    def update(self):
+        self.num_images += 1
+        elapsed: float = time.perf_counter() - self._start
+        if elapsed > 0:
+            self.fps = self.num_images / elapsed
+            self.fps_max = max(self.fps_max, self.fps)
+
+
+@dataclass
+class ReplayNode:
+    value: Any = None
+
+    def execute(self):
+        """Commands, e.g. TriggerSoftware, do nothing on a recording."""
+
+
+class ReplayNodeMap:
+    """Recorded features and the chunk values of the last fetched frame as `.value` nodes."""
+
+    def __init__(self, features: Dict[str, Any]):
+        self._nodes: Dict[str, ReplayNode] = {n: ReplayNode(v) for n, v in features.items()}
+
+    def get_node(self, name: str) -> ReplayNode:
+        return self._nodes.setdefault(name, ReplayNode())
+
+    def __getattr__(self, name: str) -> ReplayNode:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_node(name)
+
+    def update(self, values: Dict[str, Any]):
+        for name, value in values.items():
+            self.get_node(name).value = value
+
+
+@dataclass
+class ReplayDevice:
+    node_map: ReplayNodeMap
+
+
+@dataclass
+class ReplayPayload:
+    components: List[FrameComponent]
+
+
+@dataclass
+class ReplayBuffer:
+    payload: ReplayPayload
+    timestamp_ns: int
+    frame_id: int
+
+    @property
+    def timestamp(self) -> int:
+        return self.timestamp_ns
+
+
+class ReplayAcquirer:
+    """
+    Replays a FrameRecorder recording with the ImageAcquirer surface the examples use.
+
+    fetch() yields a buffer whose payload.components are memory-mapped read-only from the .npy
+    files, so replaying doesn't load the whole recording. Frames are delivered at `fps` (as fast
+    as requested when None) and start over at the end with `loop`, otherwise fetch() raises
+    TimeoutException like a device without new frames. The chunk values of the fetched frame are
+    set on `remote_device.node_map`, next to the recorded device features.
+    """
+
+    def __init__(self, path: Path, fps: float = None, loop: bool = False):
+        self.path = Path(path)
+        index: dict = json.loads((self.path / INDEX_FILE).read_text())
+        if index.get("version") != FORMAT_VERSION:
+            raise Exception(f"Unsupported recording version: {index.get('version')}")
+        self.frames: List[dict] = index["frames"]
+        self.fps = fps
+        self.loop = loop
+        self.remote_device = ReplayDevice(ReplayNodeMap(index["features"]))
+        self.statistics = ReplayStatistics()
+        self._next_frame = 0
+        self._next_time = 0.0
+        self._acquiring = False
+        self._components: List[List[FrameComponent]] = [None] * len(self.frames)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def component_names(self) -> List[str]:
+        return [component["name"] for component in self.frames[0]["components"]]
+
+    def start(self):
+        self._acquiring = True
+        self._next_time = time.perf_counter()
+        self.statistics.reset()
+
+    def stop(self):
+        self._acquiring = False
+
+    def is_acquiring(self) -> bool:
+        return self._acquiring
+
+    def destroy(self):
+        self.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.destroy()
+
+    def _load(self, index: int) -> List[FrameComponent]:
+        if self._components[index] is None:
+            self._components[index] = [
+                FrameComponent(
+                    np.load(self.path / component["file"], mmap_mode="r"),
+                    component["width"],
+                    component["height"],
+                    component["data_format"],
+                    component["num_components_per_pixel"],
+                )
+                for component in self.frames[index]["components"]
+            ]
+        return self._components[index]
+
+    def _wait_for_next_frame(self, timeout: float):
+        if self._next_frame >= len(self.frames):
+            if not self.loop:
+                logger.debug("ReplayAcquirer: end of the recording")
+                # Raised without arguments, like harvesters does on a fetch timeout
+                raise TimeoutException
+            self._next_frame = 0
+        if self.fps:
+            delay: float = self._next_time - time.perf_counter()
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise TimeoutException
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = max(self._next_time, time.perf_counter() - 1 / self.fps)
+            self._next_time += 1 / self.fps
+
+    @contextmanager
+    def fetch(self, timeout: float = None) -> Iterator[ReplayBuffer]:
+        assert self._acquiring, "Acquisition is not started"
+        self._wait_for_next_frame(timeout)
+        index: int = self._next_frame
+        self._next_frame += 1
+        frame: dict = self.frames[index]
+        self.remote_device.node_map.update(frame["chunks"])
+        self.statistics.update()
+        yield ReplayBuffer(ReplayPayload(self._load(index)), frame["timestamp_ns"], index)
+
+    def frames_by_name(self) -> Iterator[Dict[str, FrameComponent]]:
+        """All frames as {component name: component}, without rate limit."""
+        for index in range(len(self.frames)):
+            yield dict(zip(self.component_names, self._load(index)))
@@ -0,0 +1,216 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .raw_dump import RawDumpHeader, write_raw_dump
+
+if TYPE_CHECKING:
+    from harvesters.core import Component2DImage
+
+RAW_FORMATS = ("raw", "npy", "npz")
+IMAGE_FORMATS = ("png",) + RAW_FORMATS
+# Components saved as images, the others (Range, Normal, ...) are always saved in the raw format
+IMAGE_COMPONENTS = ("Intensity", "ColorCamera", "Confidence")
+
+
+@dataclass
+class ComponentCopy:
+    """Component data copied out of the buffer, so the buffer can be queued again right away."""
+
+    name: str
+    data: np.ndarray
+    width: int
+    height: int
+    data_format: str
+    num_components_per_pixel: int = 1
+    timestamp_ns: int = 0
+
+    @classmethod
+    def from_component(
+        cls, name: str, component: "Component2DImage", timestamp_ns: int = 0
+    ) -> "ComponentCopy":
+        return cls(
+            name,
+            component.data.copy(),
+            component.width,
+            component.height,
+            component.data_format,
+            int(component.num_components_per_pixel),
+            timestamp_ns,
+        )
+
+
+@dataclass
+class SaverStatistics:
+    frames: int = 0
+    components: int = 0
+    bytes_written: int = 0
+    seconds: float = 0.0
+    submitted: int = 0
+    copy_seconds: float = 0.0
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        copy_ms = self.copy_seconds / self.submitted * 1e3 if self.submitted else 0.0
+        return (
+            f"{self.frames} frames ({self.components} components, "
+            f"{self.bytes_written / 1e6:.1f} MB) in {self.seconds:.2f} s: "
+            f"{self.frames_per_second:.1f} FPS sustained, copy {copy_ms:.2f} ms/frame"
+        )
+
+
+def to_png_image(component: ComponentCopy) -> np.ndarray:
+    """Converts the copied data in place to an image cv2.imwrite can save."""
+    pixel_format = component.data_format
+    data = component.data
+    if pixel_format in ("Mono10", "Mono12"):
+        data = data.astype(np.uint16, copy=False)
+        np.left_shift(data, 16 - int(pixel_format[4:]), out=data)
+        return data.reshape(component.height, component.width, 1)
+    if pixel_format in ("Mono16", "Confidence8"):
+        return data.reshape(component.height, component.width, 1)
+    if pixel_format == "RGB8":
+        image = data.reshape(component.height, component.width, 3)
+        return cv2.cvtColor(image, cv2.COLOR_RGB2BGR, dst=image)
+    raise Exception(f"Unknown pixel format option for component: {component.name}")
+
+
+def write_raw_component(component: ComponentCopy, path: Path, file_format: str):
+    if file_format == "raw":
+        header = RawDumpHeader.for_component(component, component.timestamp_ns)
+        write_raw_dump(str(path), header, component.data)
+    elif file_format == "npy":
+        np.save(path, component.data.reshape(component.height, component.width, -1))
+    elif file_format == "npz":
+        data = component.data.reshape(component.height, component.width, -1)
+        np.savez_compressed(path, data=data)
+    else:
+        raise Exception(f"Unknown file format: {file_format}")
+
+
+class ComponentSaver:
+    """
+    Saves the components of fetched buffers on a thread pool. `save` only copies the component
+    data, so the buffer can be released as soon as it returns; the encoding and disk writes run on
+    the `max_workers` writer threads (cv2.imwrite and NumPy release the GIL while they work).
+
+    At most `max_pending` frames are kept in memory, `save` blocks when the writers fall behind.
+    Image components are saved as PNG unless `image_format` selects one of the raw formats; the
+    other components are saved as `raw_format`: raw (.raw, see raw_dump), npy or npz (compressed).
+    `png_compression` sets the zlib level (0-9), None keeps the OpenCV defaults, which are faster
+    than any explicit level as they also switch to the RLE strategy.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = ".",
+        raw_format: str = "raw",
+        image_format: str = "png",
+        png_compression: Optional[int] = None,
+        max_workers: int = 4,
+        max_pending: int = 8,
+    ):
+        if raw_format not in RAW_FORMATS:
+            raise Exception(f"Unknown raw format: {raw_format}, expected: {RAW_FORMATS}")
+        if image_format not in IMAGE_FORMATS:
+            raise Exception(f"Unknown image format: {image_format}, expected: {IMAGE_FORMATS}")
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.raw_format = raw_format
+        self.image_format = image_format
+        self.png_params = []
+        if png_compression is not None:
+            self.png_params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="ComponentSaver")
+        self.pending = threading.BoundedSemaphore(max_pending)
+        self.futures: List[Future] = []
+        self.stats = SaverStatistics()
+        self.lock = threading.Lock()
+        self.start_time: Optional[float] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def file_format(self, component_name: str) -> str:
+        return self.image_format if component_name in IMAGE_COMPONENTS else self.raw_format
+
+    def save(
+        self,
+        components: Iterable[Tuple[str, "Component2DImage"]],
+        suffix: str = "",
+        timestamp_ns: int = 0,
+    ) -> Future:
+        """
+        Copies the (name, component) pairs of one buffer and queues them for writing to
+        `<output_dir>/<name>_<pixel format><suffix>.<extension>`. The buffer timestamp is stored
+        in the header of raw dumps.
+        """
+        self.pending.acquire()
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        try:
+            start = time.perf_counter()
+            copies = [
+                ComponentCopy.from_component(name, part, timestamp_ns) for name, part in components
+            ]
+            with self.lock:
+                self.stats.submitted += 1
+                self.stats.copy_seconds += time.perf_counter() - start
+            future = self.executor.submit(self._write_frame, copies, suffix)
+        except BaseException:
+            self.pending.release()
+            raise
+        future.add_done_callback(lambda _: self.pending.release())
+        # Keeps the failed writes around for wait() to raise
+        self.futures = [f for f in self.futures if not f.done() or f.exception() is not None]
+        self.futures.append(future)
+        return future
+
+    def _write_frame(self, copies: List[ComponentCopy], suffix: str):
+        written = 0
+        for component in copies:
+            written += self._write_component(component, suffix)
+        with self.lock:
+            self.stats.frames += 1
+            self.stats.components += len(copies)
+            self.stats.bytes_written += written
+            self.stats.seconds = time.perf_counter() - self.start_time
+
+    def _write_component(self, component: ComponentCopy, suffix: str) -> int:
+        file_format = self.file_format(component.name)
+        extension = {"png": "png", "raw": "raw", "npy": "npy", "npz": "npz"}[file_format]
+        path = self.output_dir / f"{component.name}_{component.data_format}{suffix}.{extension}"
+        if file_format == "png":
+            if not cv2.imwrite(str(path), to_png_image(component), self.png_params):
+                raise Exception(f"Failed to write {path}")
+        else:
+            write_raw_component(component, path, file_format)
+        return path.stat().st_size
+
+    def wait(self):
+        """Waits for the queued frames, raises the first error of a failed write."""
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+
+    def statistics(self) -> SaverStatistics:
+        with self.lock:
+            return replace(self.stats)
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown(wait=True)
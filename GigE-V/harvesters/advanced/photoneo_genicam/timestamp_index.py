@@ -0,0 +1,188 @@
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from genicam.genapi import NodeMap
+
+
+@dataclass
+class ClockSamples:
+    """Pairs of host and device time taken at the same moment by TimestampLatch."""
+
+    host_ns: deque = field(default_factory=lambda: deque(maxlen=32))
+    device_ns: deque = field(default_factory=lambda: deque(maxlen=32))
+
+
+class ClockTracker:
+    """
+    Tracks the offset and drift of the device clocks against the host clock.
+
+    Each latch() executes TimestampLatch and pairs TimestampLatchValue with the host time in the
+    middle of the command. The offset (device - host) is fitted linearly over the last samples,
+    the slope is the drift. With a single sample the drift is 0. Devices synchronised by PTP share
+    the same clock, so their relative offset shows how well the synchronisation works.
+    """
+
+    def __init__(self):
+        self.samples: Dict[str, ClockSamples] = {}
+        # Fitted once per new sample, the conversions run for every frame
+        self._fits: Dict[str, Tuple[float, float, int, int]] = {}
+
+    def add_sample(self, device: str, host_ns: int, device_ns: int):
+        samples: ClockSamples = self.samples.setdefault(device, ClockSamples())
+        samples.host_ns.append(host_ns)
+        samples.device_ns.append(device_ns)
+        self._fits[device] = self._fit(device)
+
+    def latch(self, device: str, features: "NodeMap"):
+        before: int = time.time_ns()
+        features.TimestampLatch.execute()
+        after: int = time.time_ns()
+        self.add_sample(device, (before + after) // 2, features.TimestampLatchValue.value)
+
+    def _fit(self, device: str) -> Tuple[float, float, int, int]:
+        """Returns (drift, offset correction, reference host time, reference offset)."""
+        samples: ClockSamples = self.samples[device]
+        host = np.array(samples.host_ns, dtype=np.int64)
+        offsets = np.array(samples.device_ns, dtype=np.int64) - host
+        # Relative to the first sample, nanoseconds since epoch don't fit into float64 precisely
+        reference_host, reference_offset = int(host[0]), int(offsets[0])
+        if len(host) < 2 or host[-1] == host[0]:
+            return 0.0, float(offsets[-1] - reference_offset), reference_host, reference_offset
+        drift, correction = np.polyfit(
+            (host - reference_host).astype(np.float64),
+            (offsets - reference_offset).astype(np.float64),
+            1,
+        )
+        return drift, correction, reference_host, reference_offset
+
+    def offset_ns(self, device: str, host_ns: int = None) -> int:
+        """Device minus host time at `host_ns` (now by default)."""
+        drift, correction, reference_host, reference_offset = self._fits[device]
+        host_ns = time.time_ns() if host_ns is None else host_ns
+        return reference_offset + int(round(correction + drift * (host_ns - reference_host)))
+
+    def drift_ppm(self, device: str) -> float:
+        return self._fits[device][0] * 1e6
+
+    def to_host_ns(self, device: str, device_ns: int) -> int:
+        """Converts a device timestamp (e.g. Buffer.timestamp_ns) to host time."""
+        drift, correction, reference_host, reference_offset = self._fits[device]
+        # device = host + offset(host), with the offset linear in host, solved for host
+        delta: int = device_ns - reference_host - reference_offset
+        return reference_host + int(round((delta - correction) / (1 + drift)))
+
+
+class TimestampIndex:
+    """
+    Matches frames of several devices by their nearest timestamp.
+
+    Frames are kept per device sorted by timestamp, so looking up the nearest frame is a bisect
+    instead of a scan over all pairs. match() returns the sets in which every device has a frame
+    within `tolerance_ns` of the oldest frame of the reference device (the first device). With a
+    ClockTracker the device timestamps are converted to host time first, which is only needed
+    when the devices aren't synchronised by PTP.
+
+    Frames which can't be matched anymore, and the oldest ones over `max_frames` per device, are
+    discarded and counted in `unmatched`.
+    """
+
+    def __init__(
+        self,
+        devices: List[str],
+        tolerance_ns: int = 1_000_000,
+        max_frames: int = 64,
+        clock: ClockTracker = None,
+    ):
+        self.devices: List[str] = list(devices)
+        self.tolerance_ns = tolerance_ns
+        self.max_frames = max_frames
+        self.clock = clock
+        self.matched = 0
+        self.unmatched = 0
+        self._timestamps: Dict[str, List[int]] = {device: [] for device in self.devices}
+        self._frames: Dict[str, List[Any]] = {device: [] for device in self.devices}
+
+    def __len__(self) -> int:
+        return sum(len(timestamps) for timestamps in self._timestamps.values())
+
+    def add(self, device: str, timestamp_ns: int, frame: Any = None):
+        if self.clock is not None:
+            timestamp_ns = self.clock.to_host_ns(device, timestamp_ns)
+        timestamps: List[int] = self._timestamps[device]
+        frames: List[Any] = self._frames[device]
+        if not timestamps or timestamp_ns >= timestamps[-1]:
+            # Frames mostly arrive in order
+            timestamps.append(timestamp_ns)
+            frames.append(frame)
+        else:
+            index: int = bisect_left(timestamps, timestamp_ns)
+            timestamps.insert(index, timestamp_ns)
+            frames.insert(index, frame)
+        if len(timestamps) > self.max_frames:
+            self._discard(device, len(timestamps) - self.max_frames)
+
+    def _remove(self, device: str, count: int):
+        del self._timestamps[device][:count]
+        del self._frames[device][:count]
+
+    def _discard(self, device: str, count: int):
+        self._remove(device, count)
+        self.unmatched += count
+
+    def nearest(self, device: str, timestamp_ns: int) -> Optional[int]:
+        """Index of the frame of `device` nearest to `timestamp_ns` within the tolerance."""
+        timestamps: List[int] = self._timestamps[device]
+        index: int = bisect_left(timestamps, timestamp_ns)
+        candidates = [i for i in (index - 1, index) if 0 <= i < len(timestamps)]
+        if not candidates:
+            return None
+        best: int = min(candidates, key=lambda i: abs(timestamps[i] - timestamp_ns))
+        return best if abs(timestamps[best] - timestamp_ns) <= self.tolerance_ns else None
+
+    def _match_oldest(self) -> Optional[Dict[str, Tuple[int, Any]]]:
+        reference: str = self.devices[0]
+        while self._timestamps[reference]:
+            timestamp_ns: int = self._timestamps[reference][0]
+            indices: Dict[str, Optional[int]] = {
+                device: self.nearest(device, timestamp_ns) for device in self.devices
+            }
+            if all(index is not None for index in indices.values()):
+                matched = {
+                    device: (self._timestamps[device][index], self._frames[device][index])
+                    for device, index in indices.items()
+                }
+                for device, index in indices.items():
+                    # Older frames of the other devices can't be matched by later frames either
+                    self._discard(device, index)
+                    self._remove(device, 1)
+                self.matched += 1
+                return matched
+            # Wait for the missing frames, unless a newer frame of that device already arrived
+            pending = [
+                device
+                for device, index in indices.items()
+                if index is None
+                and (
+                    not self._timestamps[device]
+                    or self._timestamps[device][-1] < timestamp_ns + self.tolerance_ns
+                )
+            ]
+            if pending:
+                return None
+            self._discard(reference, 1)
+        return None
+
+    def match(self) -> List[Dict[str, Tuple[int, Any]]]:
+        """Removes and returns all complete sets as {device: (timestamp_ns, frame)}."""
+        sets: List[Dict[str, Tuple[int, Any]]] = []
+        while True:
+            matched = self._match_oldest()
+            if matched is None:
+                return sets
+            sets.append(matched)
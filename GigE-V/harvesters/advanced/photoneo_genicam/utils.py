@@ -5,10 +5,14 @@ import sys
 import time
 from enum import Enum, auto
 from functools import wraps
+
+import numpy as np
 from genicam.genapi import NodeMap
 from harvesters.core import ImageAcquirer
 from packaging import version
 
+from .metrics import metrics
+
 
 def get_system_info() -> str:
     return f"OS: {platform.system()} ({platform.version().split()[0]}) | Python: {sys.version.split()[0]}"
@@ -24,22 +28,29 @@ logger = setup_logger()
 
 
 def measure_time(func):
+    """
+    Records the execution time of every call into the `metrics` timer named after the function.
+
+    Costs a single check per call while the metrics are disabled, see photoneo_genicam.metrics.
+    """
+    name: str = func.__name__
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        execution_time_ms = (end_time - start_time) * 1000
-        logger.debug(f"Execution time of {func.__name__}: {execution_time_ms:.2f} milliseconds")
-        return result
+        if not metrics.enabled:
+            return func(*args, **kwargs)
+        start_time = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.record(name, time.perf_counter_ns() - start_time)
 
     return wrapper
 
 
 def write_raw_array(filename: str, array):
-    with open(filename, "wb") as file:
-        for element in array:
-            file.write(element.tobytes())
+    """Writes the bare array data, see raw_dump for dumps with a header describing the data."""
+    np.ascontiguousarray(array).tofile(filename)
 
 
 def data_stream_reset(ia: ImageAcquirer):
@@ -1,5 +1,8 @@
+import threading
+import time
 from dataclasses import dataclass
-from typing import List
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
 
 import cv2
 import glfw
@@ -8,6 +11,8 @@ import open3d as o3d
 from harvesters.core import Component2DImage
 from open3d.visualization import VisualizerWithKeyCallback
 
+from .depth_colormap import DepthColorMapper, normals_to_image
+from .pointcloud import voxel_downsample
 from .utils import logger
 
 
@@ -23,42 +28,76 @@ def render_static(objects: List, axes_size=70, width=1000, height=800, top=300,
     )
 
 
-def process_for_visualisation(image: Component2DImage):
-    isRGB: bool = image.data_format == "RGB8"
-    isDepth: bool = image.data_format == "Coord3D_C32f"
-    isConfidence: bool = image.data_format == "Confidence8"
-    isMono10: bool = image.data_format == "Mono10"
-    isMono12: bool = image.data_format == "Mono12"
-    isMono16: bool = image.data_format == "Mono16"
-    isNormal: bool = image.data_format == "Coord3D_ABC32f"
-
-    if isMono10:
-        upscaled_to_16bit = image.data.astype(np.uint16) << 6
-        return upscaled_to_16bit.reshape(image.height, image.width, 1).copy()
-    if isMono12:
-        upscaled_to_16bit = image.data.astype(np.uint16) << 4
-        return upscaled_to_16bit.reshape(image.height, image.width, 1).copy()
-    if isConfidence or isMono16:
-        return image.data.reshape(image.height, image.width, 1).copy()
-    if isDepth:
-        image_array = image.data.reshape((image.height, image.width, 1))
-        normalized_image = cv2.normalize(image_array, None, 0, 65535, cv2.NORM_MINMAX)
-        return normalized_image.astype(np.uint16)
-    if isRGB:
-        return cv2.cvtColor(image.data.reshape((image.height, image.width, 3)), cv2.COLOR_RGB2BGR)
-    if isNormal:
-        image_array = image.data.reshape((image.height, image.width, 3))
-        normalized_image = cv2.normalize(image_array, None, 0, 255, cv2.NORM_MINMAX)
-        return normalized_image.astype(np.uint8)
-    else:
-        raise Exception("Unexpected pixel format")
+class VisualisationConverter:
+    """
+    Converts frames of one component to an image for cv2.imshow. The pixel format is dispatched
+    once and every frame is written into the same preallocated output, so the returned image is
+    only valid until the next call; copy it if it has to outlive the next frame.
+    """
+
+    def __init__(self, data_format: str, width: int, height: int):
+        self.data_format = data_format
+        self.width = width
+        self.height = height
+        if data_format in ("Mono10", "Mono12"):
+            self.shift = 16 - int(data_format[4:])
+            self.output = np.empty((height, width, 1), dtype=np.uint16)
+            self.convert = self._upscale_to_16bit
+        elif data_format in ("Confidence8", "Mono16"):
+            dtype = np.uint8 if data_format == "Confidence8" else np.uint16
+            self.output = np.empty((height, width, 1), dtype=dtype)
+            self.convert = self._copy
+        elif data_format == "Coord3D_C32f":
+            self.depth_mapper = DepthColorMapper(width, height)
+            self.output = self.depth_mapper.output
+            self.convert = self.depth_mapper
+        elif data_format == "RGB8":
+            self.output = np.empty((height, width, 3), dtype=np.uint8)
+            self.convert = self._rgb_to_bgr
+        elif data_format == "Coord3D_ABC32f":
+            self.output = np.empty((height, width, 3), dtype=np.uint8)
+            self.convert = self._scale_normals
+        else:
+            raise Exception("Unexpected pixel format")
+        channels = 3 if data_format in ("RGB8", "Coord3D_ABC32f") else 1
+        self.input_shape = (height, width, channels)
+
+    @classmethod
+    def for_image(cls, image: Component2DImage) -> "VisualisationConverter":
+        return cls(image.data_format, image.width, image.height)
+
+    def __call__(self, image: Component2DImage) -> np.ndarray:
+        return self.convert(image.data.reshape(self.input_shape))
+
+    def _upscale_to_16bit(self, data: np.ndarray) -> np.ndarray:
+        return np.left_shift(data, self.shift, out=self.output, casting="unsafe")
+
+    def _copy(self, data: np.ndarray) -> np.ndarray:
+        np.copyto(self.output, data)
+        return self.output
+
+    def _rgb_to_bgr(self, data: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(data, cv2.COLOR_RGB2BGR, dst=self.output)
+
+    def _scale_normals(self, data: np.ndarray) -> np.ndarray:
+        return normals_to_image(data, self.output)
+
+
+def process_for_visualisation(image: Component2DImage) -> np.ndarray:
+    """One-off conversion, use a VisualisationConverter per stream for live previews."""
+    return VisualisationConverter.for_image(image)(image)
 
 
 class TextureImage:
-    def __init__(self, name: str, image: Component2DImage):
+    def __init__(self, name: str, image: Component2DImage, converter=None):
         self.name = name
         self.image: Component2DImage = image
-        self.processed_image = process_for_visualisation(self.image)
+        self.converter = converter or VisualisationConverter.for_image(image)
+        self.processed_image = self.converter(self.image)
+
+    def update(self, image: Component2DImage):
+        self.image = image
+        self.processed_image = self.converter(image)
 
     def show(self):
         cv2.namedWindow(self.name, cv2.WINDOW_GUI_NORMAL)
@@ -86,6 +125,129 @@ class RealTimePCLRenderer:
         self.should_close = True
 
 
+class ThreadedPCLRenderer:
+    """
+    Shows the latest submitted point cloud in a RealTimePCLRenderer window, decoupled from the
+    thread which acquires and submits the frames.
+
+    update() only copies the points into a preallocated buffer and returns, so the acquisition
+    runs at the full sensor rate while the window renders at most `max_fps` frames per second.
+    Frames submitted faster than that replace each other and are counted in `skipped`. The
+    geometry is updated in place, it's only reallocated when the number of points changes (e.g.
+    with `voxel_size` set, which downsamples the points for display).
+
+    GLFW requires the window to be created and its events to be processed on the main thread on
+    every platform, so the render loop runs on the main thread and the acquisition on a worker
+    thread, see run_with().
+    """
+
+    def __init__(self, max_fps: float = 30, voxel_size: float = None):
+        self.max_fps = max_fps
+        self.voxel_size = voxel_size
+        self.submitted = 0
+        self.rendered = 0
+        self.skipped = 0
+        self.should_close = False
+        self._pending: np.ndarray = None
+        self._latest: np.ndarray = None
+        self._rendering: np.ndarray = None
+        self._has_new = False
+        self._lock = threading.Lock()
+
+    def update(self, points: np.ndarray):
+        """Submits a frame from the acquisition thread, `points` may be reused after the call."""
+        points = points.reshape(-1, 3)
+        if self._pending is None or self._pending.shape != points.shape:
+            self._pending = np.empty(points.shape, dtype=np.float32)
+        np.copyto(self._pending, points, casting="same_kind")
+        with self._lock:
+            if self._has_new:
+                self.skipped += 1
+            self._pending, self._latest = self._latest, self._pending
+            self._has_new = True
+            self.submitted += 1
+
+    def _take_latest(self) -> np.ndarray:
+        # Three buffers: the one being written by update(), the latest complete frame and the one
+        # being rendered, so neither side waits for the other while copying
+        with self._lock:
+            if not self._has_new:
+                return None
+            self._has_new = False
+            self._latest, self._rendering = self._rendering, self._latest
+            return self._rendering
+
+    def _display_points(self, points: np.ndarray) -> np.ndarray:
+        if self.voxel_size is None:
+            return points
+        return voxel_downsample(points, self.voxel_size)
+
+    def run(self):
+        """
+        The render loop, returns when the window is closed or stop() is called. Has to be called
+        from the main thread.
+        """
+        renderer = RealTimePCLRenderer()
+        point_cloud = o3d.geometry.PointCloud()
+        added = False
+        period: float = 1 / self.max_fps
+        while not (self.should_close or renderer.should_close):
+            start: float = time.perf_counter()
+            points: np.ndarray = self._take_latest()
+            if points is not None:
+                display: np.ndarray = self._display_points(points)
+                if added and len(point_cloud.points) == len(display):
+                    np.asarray(point_cloud.points)[:] = display
+                else:
+                    point_cloud.points = o3d.utility.Vector3dVector(display.astype(np.float64))
+                if not added:
+                    renderer.vis.add_geometry(point_cloud)
+                    added = True
+                else:
+                    renderer.vis.update_geometry(point_cloud)
+                self.rendered += 1
+            if not renderer.vis.poll_events():
+                break
+            renderer.vis.update_renderer()
+            time.sleep(max(0.0, period - (time.perf_counter() - start)))
+        self.should_close = True
+        renderer.vis.destroy_window()
+
+    def stop(self):
+        """Closes the window, can be called from any thread."""
+        self.should_close = True
+
+    def run_with(self, target: Callable[[], None]):
+        """
+        Runs `target`, e.g. the acquisition loop calling update(), on a worker thread and the
+        render loop on the calling (main) thread. `target` should return once `should_close` is
+        set, the window is closed when it returns and its exceptions are raised here.
+        """
+        errors: List[BaseException] = []
+
+        def worker():
+            try:
+                target()
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                self.stop()
+
+        thread = threading.Thread(target=worker, name="PCLRendererWorker", daemon=True)
+        thread.start()
+        try:
+            self.run()
+        finally:
+            self.stop()
+            thread.join()
+            logger.debug(f"ThreadedPCLRenderer: {self.statistics()}")
+        if errors:
+            raise errors[0]
+
+    def statistics(self) -> str:
+        return f"submitted: {self.submitted}, rendered: {self.rendered}, skipped: {self.skipped}"
+
+
 @dataclass
 class OfflineRenderParams:
     background_color: tuple = (1, 1, 1, 1)
@@ -96,29 +258,146 @@ class OfflineRenderParams:
     distance_from_camera: float = 0.60
     width: int = 1920
     height: int = 1080
+    # Direction from the look-at point to the camera
+    view_direction: tuple = (0, 0, -1)
+    # Fixed look-at point and scene size, fitted to the bounds of each point cloud when None
+    center: Optional[tuple] = None
+    extent: Optional[float] = None
+
+
+OFFLINE_RENDER_PRESETS: Dict[str, OfflineRenderParams] = {
+    "front": OfflineRenderParams(),
+    "top": OfflineRenderParams(view_direction=(0, -1, 0), up_vector=(0, 0, 1)),
+    "side": OfflineRenderParams(view_direction=(1, 0, 0)),
+    "iso": OfflineRenderParams(view_direction=(0.5, -0.5, -0.7)),
+}
+
+
+@dataclass
+class BatchRenderStatistics:
+    images: int = 0
+    seconds: float = 0.0
+
+    @property
+    def images_per_second(self) -> float:
+        return self.images / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        rate = self.images_per_second
+        return f"{self.images} images in {self.seconds:.2f} s, {rate:.1f} images/s"
+
+
+class BatchOfflineRenderer:
+    """
+    Renders point clouds to images with a single OffscreenRenderer. Creating the renderer is far
+    more expensive than rendering a frame (and Open3D doesn't free it reliably), so it is kept
+    alive and only the geometry and camera are swapped between images.
+
+    The resolution is fixed by the params the renderer is created with. For CPU-only rendering on
+    Linux, set OPEN3D_CPU_RENDERING=true before open3d is imported.
+    """
+
+    GEOMETRY_NAME = "pcl"
+
+    def __init__(self, params: OfflineRenderParams = OfflineRenderParams()):
+        self.params = params
+        self.renderer = o3d.visualization.rendering.OffscreenRenderer(params.width, params.height)
+        self.stats = BatchRenderStatistics()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.renderer = None
+
+    def has_resolution(self, params: OfflineRenderParams) -> bool:
+        return (params.width, params.height) == (self.params.width, self.params.height)
+
+    def set_geometry(self, pcl, params: OfflineRenderParams):
+        scene = self.renderer.scene
+        if scene.has_geometry(self.GEOMETRY_NAME):
+            scene.remove_geometry(self.GEOMETRY_NAME)
+        mat = o3d.visualization.rendering.MaterialRecord()
+        mat.shader, mat.point_size = params.shader, params.point_size
+        scene.add_geometry(self.GEOMETRY_NAME, pcl, mat)
+
+    def setup_camera(self, pcl, params: OfflineRenderParams):
+        center, extent = params.center, params.extent
+        if center is None or extent is None:
+            bounds = pcl.get_axis_aligned_bounding_box()
+            center = bounds.get_center() if center is None else center
+            extent = np.linalg.norm(bounds.get_extent()) if extent is None else extent
+        center = np.asarray(center, dtype=np.float64)
+        direction = np.asarray(params.view_direction, dtype=np.float64)
+        eye = center + direction / np.linalg.norm(direction) * params.distance_from_camera * extent
+        self.renderer.setup_camera(params.fov, center, eye, params.up_vector)
+
+    def render(self, pcl, filename: str, params: OfflineRenderParams = None):
+        """
+        Renders the point cloud and saves it as an image. `params` overrides the camera, material
+        and background of this image, its resolution has to match the renderer's.
+        """
+        params = params or self.params
+        if not self.has_resolution(params):
+            raise Exception(
+                f"Resolution {params.width}x{params.height} doesn't match the renderer "
+                f"{self.params.width}x{self.params.height}"
+            )
+        start = time.perf_counter()
+        self.renderer.scene.set_background(params.background_color)
+        self.set_geometry(pcl, params)
+        self.setup_camera(pcl, params)
+        o3d.io.write_image(filename, self.renderer.render_to_image())
+        self.stats.images += 1
+        self.stats.seconds += time.perf_counter() - start
+        logger.debug(f"Saved image as {filename}")
+
+    def render_directory(
+        self,
+        input_dir: str,
+        output_dir: str,
+        presets: Dict[str, OfflineRenderParams] = None,
+        patterns=("*.ply", "*.pcd"),
+    ) -> BatchRenderStatistics:
+        """
+        Renders every point cloud in `input_dir` to `<output_dir>/<name>.png`, or to
+        `<output_dir>/<name>_<preset>.png` for each of the camera `presets`.
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        files = sorted(file for pattern in patterns for file in Path(input_dir).glob(pattern))
+        start_stats = BatchRenderStatistics(self.stats.images, self.stats.seconds)
+        for file in files:
+            pcl = o3d.io.read_point_cloud(str(file))
+            if presets is None:
+                self.render(pcl, str(output_path / f"{file.stem}.png"))
+                continue
+            for preset_name, params in presets.items():
+                self.render(pcl, str(output_path / f"{file.stem}_{preset_name}.png"), params)
+        stats = BatchRenderStatistics(
+            self.stats.images - start_stats.images, self.stats.seconds - start_stats.seconds
+        )
+        logger.info(f"Rendered {len(files)} point clouds: {stats}")
+        return stats
+
+
+_shared_renderer: Optional[BatchOfflineRenderer] = None
 
 
 def pcl_offline_render(pcl, filename: str, params=OfflineRenderParams()):
     """
-    Renders a point cloud offline and saves it as an image.
+    Renders a point cloud offline and saves it as an image. The offscreen renderer is shared
+    between calls and only recreated when the resolution changes.
 
     Args:
         pcl (o3d.geometry.PointCloud): The input point cloud.
         filename (str): The output image filename.
         params (OfflineRenderParams, optional): Rendering parameters. Defaults to OfflineRenderParams().
     """
-    renderer = o3d.visualization.rendering.OffscreenRenderer(params.width, params.height)
-    renderer.scene.set_background(params.background_color)
-
-    mat = o3d.visualization.rendering.MaterialRecord()
-    mat.shader, mat.point_size = params.shader, params.point_size
-
-    renderer.scene.add_geometry("pcl", pcl, mat)
-
-    bounds = pcl.get_axis_aligned_bounding_box()
-    center, extent = bounds.get_center(), np.linalg.norm(bounds.get_extent())
-    eye = center + [0, 0, -params.distance_from_camera * extent]
-
-    renderer.setup_camera(params.fov, center, eye, params.up_vector)
-    o3d.io.write_image(filename, renderer.render_to_image())
-    logger.debug(f"Saved image as {filename}")
+    global _shared_renderer
+    if _shared_renderer is None or not _shared_renderer.has_resolution(params):
+        _shared_renderer = BatchOfflineRenderer(params)
+    _shared_renderer.render(pcl, filename, params)
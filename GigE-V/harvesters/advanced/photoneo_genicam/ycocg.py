@@ -0,0 +1,98 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Bit depth of the Y, Co and Cg channels and of the resulting RGB channels
+PIXEL_DEPTH = 10
+DELTA = 1 << (PIXEL_DEPTH - 1)
+MAX_VALUE = 2 * DELTA - 1
+
+
+def ycocg_shift_and_mask(dtype: np.dtype) -> tuple:
+    """Y is stored in the upper PIXEL_DEPTH bits, the Co / Cg bits are split over each 2x2 block."""
+    y_shift: int = np.iinfo(dtype).bits - PIXEL_DEPTH
+    return y_shift, (1 << y_shift) - 1
+
+
+def ycocg_to_rgb_numpy(ycocg_img: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Vectorized conversion, used when numba is not available."""
+    y_shift, mask = ycocg_shift_and_mask(ycocg_img.dtype)
+    img = ycocg_img.astype(np.int32)
+    chroma = img & mask
+    co = (chroma[0::2, 0::2] << y_shift) + chroma[0::2, 1::2]
+    cg = (chroma[1::2, 0::2] << y_shift) + chroma[1::2, 1::2]
+    half_cg = cg // 2
+    b2 = (co + cg) // 2
+
+    # Every pixel of a 2x2 block shares the same Co / Cg values
+    for row_offset, col_offset in ((0, 0), (0, 1), (1, 0), (1, 1)):
+        y = img[row_offset::2, col_offset::2] >> y_shift
+        rgb = out[row_offset::2, col_offset::2]
+        r1 = 2 * y + co
+        g1 = y + half_cg
+        b1 = y + 2 * DELTA
+        rgb[..., 0] = np.where(r1 > cg, np.minimum((r1 - cg) // 2, MAX_VALUE), 0)
+        rgb[..., 1] = np.where(g1 > DELTA, np.minimum(g1 - DELTA, MAX_VALUE), 0)
+        rgb[..., 2] = np.where(b1 > b2, np.minimum(b1 - b2, MAX_VALUE), 0)
+        rgb[y == 0] = 0
+    return out
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(inline="always")
+    def _write_rgb(out, row, col, y, co, cg):
+        if y == 0:
+            out[row, col, 0] = 0
+            out[row, col, 1] = 0
+            out[row, col, 2] = 0
+            return
+
+        r1 = 2 * y + co
+        g1 = y + cg // 2
+        b1 = y + 2 * DELTA
+        b2 = (co + cg) // 2
+        out[row, col, 0] = min((r1 - cg) // 2, MAX_VALUE) if r1 > cg else 0
+        out[row, col, 1] = min(g1 - DELTA, MAX_VALUE) if g1 > DELTA else 0
+        out[row, col, 2] = min(b1 - b2, MAX_VALUE) if b1 > b2 else 0
+
+    @njit(parallel=True, cache=True)
+    def _ycocg_to_rgb_numba(ycocg_img, out, y_shift, mask):
+        # Each 2x2 block is independent, block rows are distributed across all cores
+        for block_row in prange(ycocg_img.shape[0] // 2):
+            row = 2 * block_row
+            for col in range(0, ycocg_img.shape[1], 2):
+                p00 = np.int64(ycocg_img[row, col])
+                p01 = np.int64(ycocg_img[row, col + 1])
+                p10 = np.int64(ycocg_img[row + 1, col])
+                p11 = np.int64(ycocg_img[row + 1, col + 1])
+
+                co = ((p00 & mask) << y_shift) + (p01 & mask)
+                cg = ((p10 & mask) << y_shift) + (p11 & mask)
+
+                _write_rgb(out, row, col, p00 >> y_shift, co, cg)
+                _write_rgb(out, row, col + 1, p01 >> y_shift, co, cg)
+                _write_rgb(out, row + 1, col, p10 >> y_shift, co, cg)
+                _write_rgb(out, row + 1, col + 1, p11 >> y_shift, co, cg)
+        return out
+
+
+def ycocg_to_rgb(ycocg_img: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Converts a (height, width) YCoCg image (ColorCamera component in Mono16) to a
+    (height, width, 3) uint16 RGB image with PIXEL_DEPTH bits per channel.
+
+    Pass `out` to reuse the output array between frames. Runs in parallel with numba when it's
+    installed, otherwise falls back to the vectorized NumPy implementation.
+    """
+    if out is None:
+        out = np.empty((*ycocg_img.shape, 3), dtype=np.uint16)
+    if NUMBA_AVAILABLE:
+        y_shift, mask = ycocg_shift_and_mask(ycocg_img.dtype)
+        return _ycocg_to_rgb_numba(ycocg_img, out, y_shift, mask)
+    return ycocg_to_rgb_numpy(ycocg_img, out)
@@ -3,14 +3,14 @@ import os
 import sys
 from pathlib import Path
 
-import open3d as o3d
 from genicam.genapi import NodeMap
 from harvesters.core import Component2DImage, Harvester
 
 from photoneo_genicam.components import enable_components
 from photoneo_genicam.default_gentl_producer import producer_path
 from photoneo_genicam.features import enable_software_trigger
-from photoneo_genicam.pointcloud import create_3d_vector
+from photoneo_genicam.pointcloud import create_tensor_point_cloud
+from photoneo_genicam.pointcloud_writer import write_ply
 from photoneo_genicam.user_set import load_default_user_set
 from photoneo_genicam.utils import data_stream_reset, logger
 from photoneo_genicam.visualizer import render_static
@@ -41,10 +41,10 @@ def main(device_sn: str):
             features.TriggerSoftware.execute()
             with ia.fetch() as buffer:
                 point_cloud_raw: Component2DImage = buffer.payload.components[0]
-                point_cloud = o3d.geometry.PointCloud()
-                point_cloud.points = create_3d_vector(point_cloud_raw.data.copy())
-                o3d.io.write_point_cloud("pointcloud.ply", point_cloud)
-                render_static([point_cloud])
+                write_ply("pointcloud.ply", point_cloud_raw.data)
+                # float32 point cloud backed by the buffer memory, valid only inside the fetch context
+                point_cloud = create_tensor_point_cloud(point_cloud_raw.data)
+                render_static([point_cloud.to_legacy()])
 
 
 if __name__ == "__main__":
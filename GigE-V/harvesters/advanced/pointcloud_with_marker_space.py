@@ -5,16 +5,14 @@ from pathlib import Path
 
 import numpy as np
 import open3d as o3d
-from genicam.genapi import NodeMap
 from harvesters.core import Component2DImage, Harvester
 
-from photoneo_genicam.chunks import (get_transformation_matrix_from_chunk,
-                                     parse_chunk_selector)
-from photoneo_genicam.components import enable_components, enabled_components
+from photoneo_genicam.chunks import TransformationMatrixDecoder
 from photoneo_genicam.default_gentl_producer import producer_path
+from photoneo_genicam.feature_cache import CachedFeatures
 from photoneo_genicam.features import enable_software_trigger
-from photoneo_genicam.pointcloud import create_3d_vector, map_texture
-from photoneo_genicam.user_set import load_default_user_set
+from photoneo_genicam.pointcloud import (create_3d_vector, map_texture,
+                                         transform_points)
 from photoneo_genicam.utils import data_stream_reset, logger
 from photoneo_genicam.visualizer import render_static
 
@@ -30,12 +28,12 @@ def main(device_sn: str):
 
         logger.info(f"Connecting to: {device_sn}")
         with h.create({"serial_number": device_sn}) as ia:
-            features: NodeMap = ia.remote_device.node_map
+            features = CachedFeatures(ia.remote_device.node_map)
             logger.info(f"Device Firmware version: {features.DeviceFirmwareVersion.value}")
 
-            load_default_user_set(features)
+            features.load_default_user_set()
             enable_software_trigger(features)
-            enable_components(features, ["Intensity", "Range"])
+            features.enable_components(["Intensity", "Range"])
 
             features.Scan3dOutputMode.value = "CalibratedABC_Grid"
             features.RecognizeMarkers.value = True
@@ -44,6 +42,7 @@ def main(device_sn: str):
             features.ChunkModeActive.value = True
             features.ChunkSelector.value = "CurrentCameraToCoordinateSpaceTransformation"
             features.ChunkEnable.value = True
+            transformation_decoder = TransformationMatrixDecoder(features.node_map)
 
             data_stream_reset(ia)
             ia.start()
@@ -51,24 +50,19 @@ def main(device_sn: str):
 
             # If no marker is recognized, the fetch will time out.
             with ia.fetch(timeout=10) as buffer:
-                components = dict(zip(enabled_components(features), buffer.payload.components))
+                components = dict(zip(features.enabled_components(), buffer.payload.components))
                 intensity_component: Component2DImage = components["Intensity"]
                 point_cloud_raw: Component2DImage = components["Range"]
 
-                chunk_name: str = "CurrentCameraToCoordinateSpaceTransformation"
-                parsed_chunk_data: dict = parse_chunk_selector(
-                    features, chunk_feature_name=chunk_name
-                )
-                transformation_matrix: np.ndarray = get_transformation_matrix_from_chunk(
-                    parsed_chunk_data
-                )
+                transformation_matrix: np.ndarray = transformation_decoder.decode()
 
                 logger.info("Transformation matrix:\n" + str(transformation_matrix))
 
+                # Transform the float32 Range buffer directly, before creating the Open3D cloud
+                points: np.ndarray = transform_points(point_cloud_raw.data, transformation_matrix)
                 point_cloud = o3d.geometry.PointCloud()
-                point_cloud.points = create_3d_vector(point_cloud_raw.data)
+                point_cloud.points = create_3d_vector(points)
                 point_cloud.colors = map_texture(intensity_component)
-                point_cloud.transform(transformation_matrix)
                 render_static([point_cloud])
 
 
@@ -4,14 +4,13 @@ import sys
 from pathlib import Path
 
 import open3d as o3d
-from genicam.genapi import NodeMap
 from harvesters.core import Component2DImage, Harvester
 
-from photoneo_genicam.components import enable_components, enabled_components
 from photoneo_genicam.default_gentl_producer import producer_path
+from photoneo_genicam.feature_cache import CachedFeatures
 from photoneo_genicam.features import enable_software_trigger
-from photoneo_genicam.pointcloud import create_3d_vector, map_texture
-from photoneo_genicam.user_set import load_default_user_set
+from photoneo_genicam.pointcloud import (ValidPoints, create_3d_vector,
+                                         map_texture)
 from photoneo_genicam.utils import data_stream_reset, logger
 from photoneo_genicam.visualizer import render_static
 
@@ -26,28 +25,30 @@ def main(device_sn: str):
 
         logger.info(f"Connecting to: {device_sn}")
         with h.create({"serial_number": device_sn}) as ia:
-            features: NodeMap = ia.remote_device.node_map
+            features = CachedFeatures(ia.remote_device.node_map)
             logger.info(f"Device Firmware version: {features.DeviceFirmwareVersion.value}")
 
-            load_default_user_set(features)
+            features.load_default_user_set()
             enable_software_trigger(features)
 
             features.Scan3dOutputMode.value = "CalibratedABC_Grid"
-            enable_components(features, ["Intensity", "Range", "Normal"])
+            features.enable_components(["Intensity", "Range", "Normal"])
 
             data_stream_reset(ia)
             ia.start()
             features.TriggerSoftware.execute()
             with ia.fetch(timeout=10) as buffer:
-                components = dict(zip(enabled_components(features), buffer.payload.components))
+                components = dict(zip(features.enabled_components(), buffer.payload.components))
                 intensity_component: Component2DImage = components["Intensity"]
                 point_cloud_raw: Component2DImage = components["Range"]
                 normal_component: Component2DImage = components["Normal"]
 
+                # Skip the invalid (0, 0, 0) points outside the calibration volume
+                valid_points = ValidPoints.from_frame(point_cloud_raw.data)
                 point_cloud = o3d.geometry.PointCloud()
-                point_cloud.points = create_3d_vector(point_cloud_raw.data)
-                point_cloud.normals = create_3d_vector(normal_component.data)
-                point_cloud.colors = map_texture(intensity_component)
+                point_cloud.points = create_3d_vector(valid_points.compact(point_cloud_raw.data))
+                point_cloud.normals = create_3d_vector(valid_points.compact(normal_component.data))
+                point_cloud.colors = map_texture(intensity_component, valid_points)
                 render_static([point_cloud])
 
 
@@ -4,18 +4,19 @@ import sys
 from pathlib import Path
 
 import numpy as np
-import open3d as o3d
 from genicam.genapi import NodeMap
-from harvesters.core import Component2DImage, Harvester
+from harvesters.core import Harvester
 
+from photoneo_genicam.chunks import (calibration_chunk_names, calibration_decoders,
+                                     decode_calibration, enable_chunks)
 from photoneo_genicam.components import enable_components
+from photoneo_genicam.coordinate_map_cache import load_coordinate_map
 from photoneo_genicam.default_gentl_producer import producer_path
-from photoneo_genicam.pointcloud import (calculate_point_cloud_from_projc,
-                                         create_3d_vector,
-                                         pre_fetch_coordinate_maps)
+from photoneo_genicam.grabber import FrameComponent, FrameGrabber
+from photoneo_genicam.pointcloud import ProjectedCReconstructor
 from photoneo_genicam.user_set import load_default_user_set
 from photoneo_genicam.utils import data_stream_reset, logger
-from photoneo_genicam.visualizer import RealTimePCLRenderer
+from photoneo_genicam.visualizer import ThreadedPCLRenderer
 
 # For Ubuntu24 support with Wayland
 os.environ["XDG_SESSION_TYPE"] = "x11"
@@ -33,9 +34,6 @@ def main(device_sn: str):
 
             load_default_user_set(features)
 
-            logger.info("Pre-fetch CoordinateMaps")
-            coordinate_map: np.array = pre_fetch_coordinate_maps(ia)
-
             enable_components(features, ["Range"])
 
             features.Scan3dOutputMode.value = "ProjectedC"
@@ -44,36 +42,46 @@ def main(device_sn: str):
             else:
                 features.TextureSource.value = "Laser"
 
+            # The cached CoordinateMap is looked up by the calibration chunks of the first frame
+            enable_chunks(features, calibration_chunk_names())
+            calibration_chunks = calibration_decoders(features)
+            data_stream_reset(ia)
+            ia.start()
+            with ia.fetch(timeout=10):
+                calibration = decode_calibration(calibration_chunks)
+            ia.stop()
+
+            logger.info("Load CoordinateMaps")
+            coordinate_map: np.ndarray = load_coordinate_map(ia, calibration=calibration)
+            reconstructor = ProjectedCReconstructor(coordinate_map)
+            # Fetching the CoordinateMap on a cache miss enables other components
+            enable_components(features, ["Range"])
+
             data_stream_reset(ia)
             ia.start()
-            frame_counter = 0
-            total_fps = 0.0
-            pcl_renderer = RealTimePCLRenderer()
-            while not pcl_renderer.should_close:
-                with ia.fetch(timeout=10) as buffer:
-                    depth_map: Component2DImage = buffer.payload.components[0]
-                    pcl: np.array = calculate_point_cloud_from_projc(
-                        depth_map.data.copy(), coordinate_map
-                    )
-
-                    points: o3d.utility.Vector3dVector = create_3d_vector(pcl)
-                    if frame_counter == 0:
-                        point_cloud: o3d.geometry.PointCloud = o3d.geometry.PointCloud(
-                            points=points
+            # Fetch on a background thread, reconstruct on a worker thread and render on the main
+            # thread (required by GLFW) at most at 30 FPS, so neither fetching nor rendering limit
+            # the acquisition rate
+            pcl_renderer = ThreadedPCLRenderer(max_fps=30)
+            with FrameGrabber(ia, num_slots=2) as grabber:
+
+                def reconstruct_frames():
+                    frame_counter = 0
+                    total_fps = 0.0
+                    while not pcl_renderer.should_close:
+                        with grabber.latest_frame(timeout=10) as frame:
+                            depth_map: FrameComponent = frame.components[0]
+                            pcl: np.array = reconstructor.reconstruct(depth_map.data)
+                            pcl_renderer.update(pcl)
+                        frame_counter += 1
+                        total_fps += ia.statistics.fps
+                        print(
+                            f"Avg FPS: {round(total_fps / frame_counter, 2)}  "
+                            f"Dropped: {grabber.dropped}  Rendered: {pcl_renderer.rendered}",
+                            end="\r",
                         )
-                        pcl_renderer.vis.add_geometry(point_cloud)
-                    else:
-                        point_cloud.points.clear()
-                        point_cloud.points.extend(points)
-                        pcl_renderer.vis.update_geometry(point_cloud)
-                    frame_counter += 1
-                    total_fps += ia.statistics.fps
-
-                    pcl_renderer.vis.poll_events()
-                    pcl_renderer.vis.update_renderer()
-                    print(f"Avg FPS: {round(total_fps / frame_counter, 2)}", end="\r")
-
-            pcl_renderer.vis.destroy_window()
+
+                pcl_renderer.run_with(reconstruct_frames)
 
 
 if __name__ == "__main__":
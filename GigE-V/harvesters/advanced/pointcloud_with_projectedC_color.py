@@ -6,14 +6,17 @@ from pathlib import Path
 import numpy as np
 import open3d as o3d
 from genicam.genapi import NodeMap
-from harvesters.core import Component2DImage, Harvester
+from harvesters.core import Harvester
 
+from photoneo_genicam.chunks import (calibration_chunk_names, calibration_decoders,
+                                     decode_calibration, enable_chunks)
 from photoneo_genicam.components import enable_components
+from photoneo_genicam.coordinate_map_cache import load_coordinate_map
 from photoneo_genicam.default_gentl_producer import producer_path
 from photoneo_genicam.features import enable_software_trigger
-from photoneo_genicam.pointcloud import (calculate_point_cloud_from_projc,
-                                         create_3d_vector, map_texture,
-                                         pre_fetch_coordinate_maps)
+from photoneo_genicam.grabber import Frame, FrameComponent
+from photoneo_genicam.pointcloud import (ProjectedCReconstructor,
+                                         create_3d_vector, map_texture)
 from photoneo_genicam.user_set import load_default_user_set
 from photoneo_genicam.utils import data_stream_reset, logger, OSType
 from photoneo_genicam.visualizer import pcl_offline_render, render_static
@@ -40,35 +43,42 @@ def main(device_sn: str):
             enable_software_trigger(features)
             features.CameraSpace.value = "ColorCamera"
 
-            logger.info("Pre-fetch CoordinateMaps")
-            coordinate_map: np.array = pre_fetch_coordinate_maps(ia)
-
             enable_components(features, ["Intensity", "Range"])
             features.CameraTextureSource.value = "Color"
             features.Scan3dOutputMode.value = "ProjectedC"
+            # The cached CoordinateMap is looked up by the calibration chunks of the frame
+            enable_chunks(features, calibration_chunk_names("ColorCamera"))
+            calibration_chunks = calibration_decoders(features, "ColorCamera")
 
             data_stream_reset(ia)
             ia.start()
 
+            frame = Frame()
             features.TriggerSoftware.execute()
             with ia.fetch(timeout=10) as buffer:
-                texture: Component2DImage = buffer.payload.components[0]
-                depth_map: Component2DImage = buffer.payload.components[1]
-
-                pcl: np.array = calculate_point_cloud_from_projc(
-                    depth_map.data.copy(), coordinate_map
-                )
-
-                point_cloud: o3d.geometry.PointCloud = o3d.geometry.PointCloud(
-                    points=create_3d_vector(pcl)
-                )
-                point_cloud.colors = map_texture(texture)
-
-                os_type = OSType.detect()
-                if os_type == OSType.LINUX:
-                    pcl_offline_render(point_cloud, "PointCloudWithColorMapped.png")
-                else:
-                    render_static([point_cloud])
+                frame.copy_from(buffer, 0)
+                calibration = decode_calibration(calibration_chunks)
+            ia.stop()
+
+            logger.info("Load CoordinateMaps")
+            coordinate_map: np.ndarray = load_coordinate_map(ia, calibration=calibration)
+            reconstructor = ProjectedCReconstructor(coordinate_map)
+
+            texture: FrameComponent = frame.components[0]
+            depth_map: FrameComponent = frame.components[1]
+
+            pcl: np.array = reconstructor.reconstruct(depth_map.data)
+
+            point_cloud: o3d.geometry.PointCloud = o3d.geometry.PointCloud(
+                points=create_3d_vector(pcl)
+            )
+            point_cloud.colors = map_texture(texture)
+
+            os_type = OSType.detect()
+            if os_type == OSType.LINUX:
+                pcl_offline_render(point_cloud, "PointCloudWithColorMapped.png")
+            else:
+                render_static([point_cloud])
 
 
 if __name__ == "__main__":
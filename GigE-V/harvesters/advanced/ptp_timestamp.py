@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 import sys
-import threading
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
+from typing import List
 
+from genicam.genapi import NodeMap
 from harvesters.core import Harvester
 
 from photoneo_genicam.default_gentl_producer import producer_path
-from photoneo_genicam.utils import (data_stream_reset, setup_logger,
-                                    version_check)
+from photoneo_genicam.features import enable_software_trigger
+from photoneo_genicam.multi_device import MultiDeviceAcquirer
+from photoneo_genicam.timestamp_index import ClockTracker
+from photoneo_genicam.user_set import load_default_user_set
+from photoneo_genicam.utils import logger, setup_logger, version_check
 
 
 class PtpStatus(Enum):
@@ -29,60 +33,59 @@ def to_datetime(timestamp: int) -> datetime:
     return datetime.fromtimestamp(ptp_timestamp_sec, tz=timezone.utc)
 
 
-def connect_device(h, serial_number):
-    logger = setup_logger(name=serial_number)
+def configure_device(features: NodeMap):
+    device_logger = setup_logger(name=features.DeviceSerialNumber.value)
+    device_logger.info(f"Device Firmware version: {features.DeviceFirmwareVersion.value}")
+    version_check(features, "1.14.0-a")
 
-    logger.info(f"Connecting to: {serial_number}")
-    with h.create({"serial_number": serial_number}) as ia:
-        features = ia.remote_device.node_map
-        logger.info(f"Device Firmware version: {features.DeviceFirmwareVersion.value}")
-        version_check(features, "1.14.0-a")
+    load_default_user_set(features)
+    enable_software_trigger(features)
 
-        features.UserSetSelector.value = "Default"
-        features.UserSetLoad.execute()
+    features.PtpEnable.value = True
+    features.TimestampLatch.execute()
 
-        features.TriggerSelector.value = "FrameStart"
-        features.TriggerMode.value = "On"
-        features.TriggerSource.value = "Software"
+    device_logger.info(f"PTP State: {PtpStatus(features.PtpStatus.value)}")
+    device_logger.info(f"GrandMaster ID: {features.PtpGrandmasterClockID.value}")
+    device_logger.info(f"Latched timestamp: {features.TimestampLatchValue.value}")
+    device_logger.info(f"Datetime: {to_datetime(features.TimestampLatchValue.value)}")
 
-        features.PtpEnable.value = True
-        features.TimestampLatch.execute()
 
-        logger.info(f"PTP State: {PtpStatus(features.PtpStatus.value)}")
-        logger.info(f"GrandMaster ID: {features.PtpGrandmasterClockID.value}")
-        logger.info(f"Latched timestamp: {features.TimestampLatchValue.value}")
-        logger.info(f"Datetime: {to_datetime(features.TimestampLatchValue.value)}")
-
-        data_stream_reset(ia)
-        ia.start()
-        features.TriggerSoftware.execute()
-        with ia.fetch(timeout=10) as buffer:
-            logger.info(f"Frame timestamp: {buffer.timestamp}")
-            logger.info(f"Frame timestamp as datetime: {to_datetime(buffer.timestamp_ns)}")
-        ia.stop()
-
-
-def main(device1_sn: str, device2_sn: str):
+def main(device_sns: List[str]):
     with Harvester() as h:
         h.add_file(str(producer_path), check_existence=True, check_validity=True)
         h.update()
 
-        thread1 = threading.Thread(target=connect_device, args=(h, device1_sn))
-        thread2 = threading.Thread(target=connect_device, args=(h, device2_sn))
-
-        thread1.start()
-        thread2.start()
-
-        thread1.join()
-        thread2.join()
+        clock = ClockTracker()
+        # Devices are opened, configured and triggered in parallel, their frames are matched by
+        # the PTP timestamps with a TimestampIndex
+        with MultiDeviceAcquirer(
+            h, device_sns, configure=configure_device, tolerance_ns=1_000_000
+        ) as devices:
+            for group in devices.groups(count=10):
+                devices.latch_clocks(clock)
+                if not group.complete:
+                    continue
+                reference_ns: int = group.frames[device_sns[0]].timestamp_ns
+                logger.info(f"Frame set taken at: {to_datetime(reference_ns)}")
+                for serial_number, frame in group.frames.items():
+                    offset_us: float = (frame.timestamp_ns - reference_ns) / 1e3
+                    logger.info(f"    {serial_number}: frame {frame.frame_id}, {offset_us:+.1f} us")
+            logger.info(
+                f"Matched frame sets: {devices.index.matched}, "
+                f"unmatched frames: {devices.index.unmatched}"
+            )
+
+            for serial_number in device_sns:
+                setup_logger(name=serial_number).info(
+                    f"Clock offset to host: {clock.offset_ns(serial_number) / 1e6:.3f} ms, "
+                    f"drift: {clock.drift_ppm(serial_number):.2f} ppm"
+                )
+            logger.info(f"Statistics:\n{devices.statistics()}")
 
 
 if __name__ == "__main__":
-    try:
-        device1_id = sys.argv[1]
-        device2_id = sys.argv[2]
-        main(device1_id, device2_id)
-    except IndexError:
-        print("Error: no device given, please run it with the device serial number as argument:")
-        print(f"{Path(__file__).name} <device1 serial> <device2 serial>")
+    if len(sys.argv) < 3:
+        print("Error: no devices given, please run it with the device serial numbers as arguments:")
+        print(f"{Path(__file__).name} <device1 serial> <device2 serial> [<device3 serial> ...]")
         sys.exit(1)
+    main(sys.argv[1:])
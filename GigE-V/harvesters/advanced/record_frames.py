@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import sys
+from pathlib import Path
+from typing import List
+
+from harvesters.core import Harvester
+
+from photoneo_genicam.default_gentl_producer import producer_path
+from photoneo_genicam.feature_cache import CachedFeatures
+from photoneo_genicam.features import enable_software_trigger
+from photoneo_genicam.replay import FrameRecorder
+from photoneo_genicam.utils import data_stream_reset, logger
+
+FRAME_COUNT = 20
+
+
+def main(device_sn: str, output_dir: str, *components: str):
+    if len(components) == 0:
+        logger.warning("No component specified, using default: Range, Intensity.")
+        components = ["Range", "Intensity"]
+
+    with Harvester() as h:
+        h.add_file(str(producer_path), check_existence=True, check_validity=True)
+        h.update()
+
+        logger.info(f"Connecting to: {device_sn}")
+        with h.create({"serial_number": device_sn}) as ia:
+            features = CachedFeatures(ia.remote_device.node_map)
+            logger.info(f"Device Firmware version: {features.DeviceFirmwareVersion.value}")
+
+            features.load_default_user_set()
+            enable_software_trigger(features)
+            features.enable_components(list(components))
+            # The payload order, the recorder names the components with it
+            component_names: List[str] = features.enabled_components()
+
+            data_stream_reset(ia)
+            ia.start()
+            with FrameRecorder(Path(output_dir), component_names, features.node_map) as recorder:
+                for _ in range(FRAME_COUNT):
+                    features.TriggerSoftware.execute()
+                    with ia.fetch(timeout=10) as buffer:
+                        recorder.record(buffer)
+
+
+if __name__ == "__main__":
+    try:
+        device_id = sys.argv[1]
+        output = sys.argv[2]
+    except IndexError:
+        print("Error: no device given, please run it with the device serial number as argument:")
+        print(f"    {Path(__file__).name} <device serial> <output dir> [<component> ...]")
+        sys.exit(1)
+    main(device_id, output, *sys.argv[3:])
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+import os
+import sys
+from pathlib import Path
+
+# Open3D reads it when it's imported, render with the CPU on headless Linux machines without a GPU
+if sys.platform.startswith("linux"):
+    os.environ.setdefault("OPEN3D_CPU_RENDERING", "true")
+
+from photoneo_genicam.utils import logger
+from photoneo_genicam.visualizer import OFFLINE_RENDER_PRESETS, BatchOfflineRenderer
+
+
+def main(input_dir: str, output_dir: str, *preset_names: str):
+    if len(preset_names) == 0:
+        logger.warning("No preset specified, using default: front.")
+        preset_names = ["front"]
+    unknown = [name for name in preset_names if name not in OFFLINE_RENDER_PRESETS]
+    if unknown:
+        logger.error(f"Unknown presets: {unknown}, available: {list(OFFLINE_RENDER_PRESETS)}")
+        return
+
+    presets = {name: OFFLINE_RENDER_PRESETS[name] for name in preset_names}
+    with BatchOfflineRenderer(OFFLINE_RENDER_PRESETS[preset_names[0]]) as renderer:
+        stats = renderer.render_directory(input_dir, output_dir, presets)
+    logger.info(f"Thumbnails saved to {output_dir}: {stats}")
+
+
+if __name__ == "__main__":
+    try:
+        input_path = sys.argv[1]
+        output_path = sys.argv[2]
+    except IndexError:
+        print("Error: no directories given, please run it with the directories as arguments:")
+        print(f"    {Path(__file__).name} <point cloud dir> <output dir> [<preset> ...]")
+        sys.exit(1)
+    main(input_path, output_path, *sys.argv[3:])
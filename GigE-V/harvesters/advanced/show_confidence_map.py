@@ -12,7 +12,7 @@ from photoneo_genicam.default_gentl_producer import producer_path
 from photoneo_genicam.features import enable_software_trigger
 from photoneo_genicam.user_set import load_default_user_set
 from photoneo_genicam.utils import data_stream_reset, logger
-from photoneo_genicam.visualizer import process_for_visualisation
+from photoneo_genicam.visualizer import VisualisationConverter
 
 
 def main(device_sn: str):
@@ -33,17 +33,21 @@ def main(device_sn: str):
 
             data_stream_reset(ia)
             ia.start()
-            features.TriggerSoftware.execute()
-            with ia.fetch(timeout=10) as buffer:
-                depth: Component2DImage = buffer.payload.components[0]
-                confidence: Component2DImage = buffer.payload.components[1]
+            depth_converter, confidence_converter = None, None
+            logger.info("Press ESC to close all windows")
+            while True:
+                features.TriggerSoftware.execute()
+                with ia.fetch(timeout=10) as buffer:
+                    depth: Component2DImage = buffer.payload.components[0]
+                    confidence: Component2DImage = buffer.payload.components[1]
+                    # Created on the first frame, the next frames reuse their output buffers
+                    if depth_converter is None:
+                        depth_converter = VisualisationConverter.for_image(depth)
+                        confidence_converter = VisualisationConverter.for_image(confidence)
 
-                dept_img = process_for_visualisation(depth)
-                cnf_img = process_for_visualisation(confidence)
-                cv2.imshow("DepthMap", dept_img)
-                cv2.imshow("ConfidenceMap", cnf_img)
+                    cv2.imshow("DepthMap", depth_converter(depth))
+                    cv2.imshow("ConfidenceMap", confidence_converter(confidence))
 
-            while True:
                 key = cv2.waitKey(1) & 0xFF
                 if key == 27:
                     break
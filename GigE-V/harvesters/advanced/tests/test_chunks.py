@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("genicam")
+
+from benchmarks.common import SyntheticChunkNodeMap
+from photoneo_genicam.chunks import (
+    CALIBRATION_CHUNKS,
+    TRANSFORMATION_MATRIX_ORDER,
+    ChunkSelectorDecoder,
+    TransformationMatrixDecoder,
+    calibration_decoders,
+    decode_calibration,
+)
+
+
+class FakeSelectorNode:
+    def __init__(self, entries):
+        self.symbolics = list(entries)
+        self.value = self.symbolics[0]
+
+
+class FakeValueNode:
+    def __init__(self, selector: FakeSelectorNode, values: dict):
+        self.selector = selector
+        self.values = values
+
+    @property
+    def value(self):
+        return self.values[self.selector.value]
+
+
+class FakeChunkFeatures:
+    def __init__(self, name: str, values: dict):
+        # Symbolics in a different order than the values
+        selector = FakeSelectorNode(reversed(list(values)))
+        value = FakeValueNode(selector, values)
+        self.nodes = {f"Chunk{name}Selector": selector, f"Chunk{name}Value": value}
+
+    def get_node(self, name: str):
+        return self.nodes[name]
+
+
+def transformation_features() -> FakeChunkFeatures:
+    values = {entry: float(i) for i, entry in enumerate(TRANSFORMATION_MATRIX_ORDER)}
+    return FakeChunkFeatures("CurrentCameraToCoordinateSpaceTransformation", values)
+
+
+def test_transformation_matrix_is_decoded_in_order():
+    decoder = TransformationMatrixDecoder(transformation_features())
+    matrix = decoder.decode()
+    np.testing.assert_array_equal(matrix[:3].reshape(-1), np.arange(12))
+    np.testing.assert_array_equal(matrix[3], [0, 0, 0, 1])
+    assert decoder.decode() is matrix
+
+
+def test_decode_into_out():
+    features = FakeChunkFeatures("SensorAxis", {"X": 1.0, "Y": 2.0, "Z": 3.0})
+    decoder = ChunkSelectorDecoder(features, "SensorAxis", ["X", "Y", "Z"])
+    out = np.zeros(3)
+    assert decoder.decode(out=out) is not None
+    np.testing.assert_array_equal(out, [1, 2, 3])
+    assert decoder.as_dict(out) == {"X": 1.0, "Y": 2.0, "Z": 3.0}
+
+
+@pytest.mark.parametrize(
+    "out",
+    [
+        np.zeros((4, 6))[:, ::2][:3],  # non-contiguous, values would land in a copy
+        np.zeros((4, 3)),
+        np.zeros((3, 4), dtype=np.float32),
+    ],
+)
+def test_invalid_out_raises(out):
+    decoder = ChunkSelectorDecoder(
+        transformation_features(),
+        "CurrentCameraToCoordinateSpaceTransformation",
+        TRANSFORMATION_MATRIX_ORDER,
+        (3, 4),
+    )
+    with pytest.raises(Exception, match="C-contiguous float64"):
+        decoder.decode(out=out)
+
+
+def test_calibration_decoders():
+    chunks = {
+        f"ColorCamera{chunk}": {f"Value{i}": 10.0 * n + i for i in range(3 + n)}
+        for n, chunk in enumerate(CALIBRATION_CHUNKS)
+    }
+    decoders = calibration_decoders(SyntheticChunkNodeMap(chunks), "ColorCamera")
+    assert list(decoders) == CALIBRATION_CHUNKS
+    for n, chunk in enumerate(CALIBRATION_CHUNKS):
+        values = decoders[chunk].decode()
+        assert values.dtype == np.float64
+        np.testing.assert_array_equal(values, 10.0 * n + np.arange(3 + n))
+        assert decoders[chunk].as_dict(values) == chunks[f"ColorCamera{chunk}"]
+    assert decode_calibration(decoders)["SensorAxis"] == [20.0, 21.0, 22.0, 23.0, 24.0]
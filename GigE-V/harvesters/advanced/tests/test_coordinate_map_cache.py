@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("harvesters")
+pytest.importorskip("open3d")
+
+from genicam.genapi import LogicalErrorException
+
+from photoneo_genicam import coordinate_map_cache
+from photoneo_genicam.coordinate_map_cache import coordinate_map_cache_key, load_coordinate_map
+
+FEATURES = {
+    "DeviceSerialNumber": "ABC-123",
+    "DeviceFirmwareVersion": "1.13.0",
+    "Width": 4,
+    "Height": 2,
+    "Scan3dFocalLength": 2000.0,
+    "Scan3dAspectRatio": 1.0,
+    "Scan3dPrincipalPointU": 2.0,
+    "Scan3dPrincipalPointV": 1.0,
+}
+CALIBRATION = {
+    "CameraMatrix": [2000.0, 0.0, 2.0, 0.0, 2000.0, 1.0, 0.0, 0.0, 1.0],
+    "DistortionCoefficients": [0.1, -0.05, 0.0, 0.0, 0.01],
+}
+
+
+class FakeNodeMap:
+    def __init__(self, values: dict):
+        self.values = dict(values)
+
+    def get_node(self, name: str):
+        if name not in self.values:
+            raise LogicalErrorException(f"Node not existing: {name}")
+        if isinstance(self.values[name], Exception):
+            raise self.values[name]
+        return SimpleNamespace(value=self.values[name])
+
+
+def fake_acquirer(values: dict) -> SimpleNamespace:
+    return SimpleNamespace(remote_device=SimpleNamespace(node_map=FakeNodeMap(values)))
+
+
+def cache_key(values: dict, calibration: dict = CALIBRATION) -> str:
+    return coordinate_map_cache_key(FakeNodeMap(values), calibration)
+
+
+def test_key_depends_on_resolution_and_calibration():
+    key = cache_key(FEATURES)
+    assert key.startswith("ABC-123_")
+    assert key == cache_key(FEATURES)
+    assert key != cache_key({**FEATURES, "Width": 8})
+    assert key != cache_key({**FEATURES, "CameraSpace": "ColorCamera"})
+    # A recalibration which only changes the distortion
+    distortion = [0.1, -0.04, 0.0, 0.0, 0.01]
+    assert key != cache_key(FEATURES, {**CALIBRATION, "DistortionCoefficients": distortion})
+
+
+def test_missing_required_feature_raises():
+    values = {name: value for name, value in FEATURES.items() if name != "Scan3dFocalLength"}
+    with pytest.raises(LogicalErrorException):
+        cache_key(values)
+
+
+def test_unexpected_error_of_optional_feature_raises():
+    with pytest.raises(RuntimeError):
+        cache_key({**FEATURES, "CameraSpace": RuntimeError("lost")})
+
+
+def test_map_is_fetched_once_and_reloaded_from_cache(tmp_path, monkeypatch):
+    coordinate_map = np.arange(2 * 4 * 3, dtype=np.float32).reshape(2, 4, 3)
+    fetches = []
+
+    def pre_fetch(ia):
+        fetches.append(ia)
+        return coordinate_map
+
+    monkeypatch.setattr(coordinate_map_cache, "pre_fetch_coordinate_maps", pre_fetch)
+    first = load_coordinate_map(fake_acquirer(FEATURES), tmp_path, CALIBRATION)
+    second = load_coordinate_map(fake_acquirer(FEATURES), tmp_path, CALIBRATION)
+
+    assert len(fetches) == 1
+    assert isinstance(second, np.memmap)
+    np.testing.assert_array_equal(first, second)
+    assert [path.suffix for path in tmp_path.iterdir()] == [".npy"]
+
+    load_coordinate_map(fake_acquirer({**FEATURES, "Height": 3}), tmp_path, CALIBRATION)
+    assert len(fetches) == 2
+
+
+def test_map_is_not_cached_without_calibration(tmp_path, monkeypatch):
+    fetches = []
+    monkeypatch.setattr(
+        coordinate_map_cache,
+        "pre_fetch_coordinate_maps",
+        lambda ia: fetches.append(ia) or np.zeros((2, 4, 3), dtype=np.float32),
+    )
+    for _ in range(2):
+        load_coordinate_map(fake_acquirer(FEATURES), tmp_path)
+    assert len(fetches) == 2
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from photoneo_genicam.depth_colormap import (DepthColorMapper, colormap_lut, depth_display_range,
+                                             normals_to_image)
+
+
+@pytest.fixture
+def depth() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    depth = rng.uniform(500, 1500, (40, 60)).astype(np.float32)
+    depth[:10] = 0
+    depth[10, :5] = np.nan
+    return depth
+
+
+def reference_colors(depth: np.ndarray, low: float, high: float) -> np.ndarray:
+    lut = colormap_lut()[:, 0]
+    indices = np.zeros(depth.shape, dtype=np.int64)
+    valid = depth > 0
+    scaled = (np.clip(depth[valid], low, high) - low) * (254 / (high - low))
+    indices[valid] = np.round(scaled).astype(np.int64) + 1
+    return lut[indices]
+
+
+def test_display_range_ignores_invalid_pixels_and_outliers(depth):
+    depth[11, :3] = 1e6
+    low, high = depth_display_range(depth, (1, 99), subsample=1)
+    assert 500 <= low < 520 and 1480 < high <= 1500
+    assert depth_display_range(np.zeros((4, 4), dtype=np.float32)) == (0.0, 0.0)
+
+
+def test_mapper_colors_the_display_range(depth):
+    mapper = DepthColorMapper(60, 40, subsample=1)
+
+    colors = mapper(depth.reshape(-1))
+
+    assert colors is mapper.output
+    low, high = mapper.display_range
+    np.testing.assert_array_equal(colors[:10], 0)
+    np.testing.assert_array_equal(colors[10, :5], 0)
+    expected = reference_colors(depth, low, high)
+    # Rounding in float32 may land on the neighbouring LUT entry
+    np.testing.assert_allclose(colors, expected, atol=8)
+
+
+def test_mapper_reuses_the_range_between_updates(depth):
+    mapper = DepthColorMapper(60, 40, update_interval=3)
+    mapper(depth)
+    first_range = mapper.display_range
+    for _ in range(2):
+        mapper(depth * 2)
+        assert mapper.display_range == first_range
+    mapper(depth * 2)
+    assert mapper.display_range[1] > first_range[1]
+
+
+def test_mapper_keeps_range_on_frames_without_depth(depth):
+    mapper = DepthColorMapper(60, 40, update_interval=1)
+    mapper(depth)
+    display_range = mapper.display_range
+    colors = mapper(np.zeros_like(depth))
+    assert mapper.display_range == display_range
+    np.testing.assert_array_equal(colors, 0)
+
+
+def test_colorize_clamps_out_of_range_depths():
+    mapper = DepthColorMapper(4, 1)
+    depth = np.array([[0, 100, 700, 5000]], dtype=np.float32)
+    lut = colormap_lut()[:, 0]
+    np.testing.assert_array_equal(mapper.colorize(depth, 500, 1000)[0], lut[[0, 1, 103, 255]])
+
+
+def test_normals_use_fixed_range():
+    normals = np.array([[[-1.0, 0.0, 1.0]]], dtype=np.float32)
+    out = np.empty((1, 1, 3), dtype=np.uint8)
+    np.testing.assert_array_equal(normals_to_image(normals, out), [[[0, 128, 255]]])
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("open3d")
+
+from photoneo_genicam.pointcloud import (block_median_downsample, stride_downsample,
+                                         voxel_downsample)
+
+
+@pytest.fixture
+def grid() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    points = rng.uniform(1, 5, (8, 12, 3)).astype(np.float32)
+    points[4:, :4] = 0
+    points[0, 0] = 0
+    return points
+
+
+def test_stride_downsample_skips_invalid(grid):
+    points = stride_downsample(grid.reshape(-1), 12, 8, stride=2)
+    expected = grid[::2, ::2].reshape(-1, 3)
+    np.testing.assert_array_equal(points, expected[expected[:, 2] != 0])
+    assert len(stride_downsample(grid.reshape(-1), 12, 8, 2, skip_invalid=False)) == 24
+
+
+def test_block_median_downsample(grid):
+    points = block_median_downsample(grid.reshape(-1), 12, 8, block=4)
+    expected = []
+    for row in range(2):
+        for col in range(3):
+            block = grid[row * 4 : row * 4 + 4, col * 4 : col * 4 + 4].reshape(-1, 3)
+            block = block[block[:, 2] != 0]
+            if len(block):
+                expected.append(np.median(block, axis=0))
+    np.testing.assert_allclose(points, expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize("extent", [10, 10_000])
+def test_voxel_downsample_averages_voxels(extent):
+    # The large extent makes the voxel keys sparse, which takes the np.unique path
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0, extent, (2000, 3)).astype(np.float32)
+    points[::7] = 0
+
+    downsampled = voxel_downsample(points, 2.0)
+
+    valid = points[points[:, 2] != 0]
+    voxels = {}
+    for voxel, point in zip(map(tuple, np.floor(valid / 2.0).astype(int)), valid):
+        voxels.setdefault(voxel, []).append(point)
+    expected = sorted(np.mean(members, axis=0).tolist() for members in voxels.values())
+    np.testing.assert_allclose(sorted(downsampled.tolist()), expected, rtol=1e-5)
+
+
+def test_voxel_downsample_without_valid_points():
+    assert voxel_downsample(np.zeros((10, 3), dtype=np.float32), 1.0).shape == (0, 3)
+
+
+def test_voxel_downsample_far_outlier():
+    # The voxel grid spanning the outlier has more cells than int64 keys can address
+    points = np.array(
+        [[0.1, 0.1, 1.0], [0.3, 0.2, 1.2], [5.0, 5.0, 5.0], [4e9, -4e9, 4e9]], dtype=np.float32
+    )
+    downsampled = voxel_downsample(points, 0.5)
+    expected = sorted([[0.2, 0.15, 1.1], [5.0, 5.0, 5.0], [4e9, -4e9, 4e9]])
+    np.testing.assert_allclose(sorted(downsampled.tolist()), expected, rtol=1e-6)
@@ -0,0 +1,100 @@
+import pytest
+
+pytest.importorskip("genicam")
+
+from photoneo_genicam.feature_cache import CachedFeatures
+
+
+class FakeNode:
+    def __init__(self, node_map: "FakeNodeMap", name: str, value=None, symbolics=None):
+        self.__dict__.update(node_map=node_map, name=name, _value=value, symbolics=symbolics)
+
+    @property
+    def value(self):
+        self.node_map.reads.append(self.name)
+        if self.name in ("ComponentEnable", "ComponentIDValue"):
+            return self.node_map.components[self.node_map.ComponentSelector._value][self.name]
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self.node_map.writes.append(self.name)
+        if self.name == "ComponentEnable":
+            self.node_map.components[self.node_map.ComponentSelector._value][self.name] = value
+        else:
+            self._value = value
+
+    def execute(self):
+        self.node_map.writes.append(self.name)
+
+
+class FakeNodeMap:
+    def __init__(self):
+        self.reads, self.writes = [], []
+        # Declared out of their ComponentIDValue order
+        self.components = {
+            "Range": {"ComponentIDValue": 2, "ComponentEnable": True},
+            "Intensity": {"ComponentIDValue": 1, "ComponentEnable": False},
+        }
+        symbolics = ["Range", "Intensity"]
+        self.ComponentSelector = FakeNode(self, "ComponentSelector", "Range", symbolics)
+        self.ComponentEnable = FakeNode(self, "ComponentEnable")
+        self.ComponentIDValue = FakeNode(self, "ComponentIDValue")
+        self.Scan3dOutputMode = FakeNode(self, "Scan3dOutputMode", "ProjectedC")
+        self.TriggerSoftware = FakeNode(self, "TriggerSoftware")
+        self.UserSetLoad = FakeNode(self, "UserSetLoad")
+
+    def get_node(self, name: str) -> FakeNode:
+        return getattr(self, name)
+
+
+@pytest.fixture
+def node_map() -> FakeNodeMap:
+    return FakeNodeMap()
+
+
+def test_memoises_metadata(node_map):
+    features = CachedFeatures(node_map)
+    assert features.sorted_components() == ["Intensity", "Range"]
+    assert features.enabled_components() == ["Range"]
+    assert features.value("Scan3dOutputMode") == "ProjectedC"
+    reads = len(node_map.reads)
+
+    for _ in range(3):
+        features.TriggerSoftware.execute()
+        assert features.enabled_components() == ["Range"]
+        assert features.value("Scan3dOutputMode") == "ProjectedC"
+    assert len(node_map.reads) == reads
+
+
+def test_set_value_invalidates(node_map):
+    features = CachedFeatures(node_map)
+    features.value("Scan3dOutputMode")
+    features.set_value("Scan3dOutputMode", "CalibratedABC_Grid")
+    assert features.value("Scan3dOutputMode") == "CalibratedABC_Grid"
+
+
+def test_forwarded_writes_invalidate(node_map):
+    features = CachedFeatures(node_map)
+    assert features.value("Scan3dOutputMode") == "ProjectedC"
+    features.Scan3dOutputMode.value = "CalibratedABC_Grid"
+    assert node_map.Scan3dOutputMode._value == "CalibratedABC_Grid"
+    assert features.value("Scan3dOutputMode") == "CalibratedABC_Grid"
+
+    features.get_node("Scan3dOutputMode").value = "ProjectedC"
+    assert features.value("Scan3dOutputMode") == "ProjectedC"
+
+    assert features.enabled_components() == ["Range"]
+    node_map.components["Intensity"]["ComponentEnable"] = True
+    # Loading a user set may change anything
+    features.UserSetLoad.execute()
+    assert features.enabled_components() == ["Intensity", "Range"]
+
+
+def test_enable_components_records_states(node_map):
+    features = CachedFeatures(node_map)
+    features.enable_components(["Intensity"])
+    reads = len(node_map.reads)
+    assert features.enabled_components() == ["Intensity"]
+    assert len(node_map.reads) == reads
+    assert node_map.components["Intensity"]["ComponentEnable"] is True
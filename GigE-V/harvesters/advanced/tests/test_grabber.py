@@ -0,0 +1,120 @@
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("harvesters")
+
+from genicam.gentl import TimeoutException
+
+from photoneo_genicam.grabber import FrameGrabber
+
+
+class FakeAcquirer:
+    """Delivers the queued frames right away, otherwise waits the whole fetch timeout."""
+
+    def __init__(self, num_frames: int = 0):
+        self.pending = num_frames
+        self.fetched = 0
+        self.timeouts = []
+        self.all_fetched = threading.Event()
+        if num_frames == 0:
+            self.all_fetched.set()
+
+    @contextmanager
+    def fetch(self, timeout=None):
+        self.timeouts.append(timeout)
+        if not self.pending:
+            time.sleep(timeout)
+            raise TimeoutException()
+        self.pending -= 1
+        component = SimpleNamespace(
+            data=np.full(4, self.fetched, dtype=np.uint16),
+            width=2,
+            height=2,
+            data_format="Mono16",
+            num_components_per_pixel=1,
+        )
+        yield SimpleNamespace(
+            payload=SimpleNamespace(components=[component]), timestamp_ns=self.fetched
+        )
+        self.fetched += 1
+        if not self.pending:
+            self.all_fetched.set()
+
+
+def grab_all(ia: FakeAcquirer, grabber: FrameGrabber):
+    assert ia.all_fetched.wait(1)
+    # The grabber counts the last frame after the fetch context is left
+    deadline = time.perf_counter() + 1
+    while grabber.fetched < ia.fetched and time.perf_counter() < deadline:
+        time.sleep(0.001)
+
+
+def test_slow_consumer_gets_the_newest_frames_in_order():
+    ia = FakeAcquirer(5)
+    with FrameGrabber(ia, num_slots=2) as grabber:
+        grab_all(ia, grabber)
+        frame_ids = []
+        for _ in range(2):
+            with grabber.next_frame(timeout=1) as frame:
+                assert frame.components[0].data[0] == frame.frame_id
+                frame_ids.append(frame.frame_id)
+    assert frame_ids == [3, 4]
+    assert grabber.fetched == 5
+    assert grabber.delivered == 2
+    assert grabber.dropped == 3
+
+
+def test_latest_frame_drops_older_unread_frames():
+    ia = FakeAcquirer(3)
+    with FrameGrabber(ia, num_slots=4) as grabber:
+        grab_all(ia, grabber)
+        with grabber.latest_frame(timeout=1) as frame:
+            assert frame.frame_id == 2
+            assert frame.timestamp_ns == 2
+        assert grabber.dropped == 2
+        with pytest.raises(TimeoutError):
+            with grabber.next_frame(timeout=0.05):
+                pass
+    assert grabber.delivered == 1
+
+
+def test_frame_held_by_consumer_is_not_overwritten():
+    ia = FakeAcquirer(1)
+    with FrameGrabber(ia, num_slots=1) as grabber:
+        with grabber.next_frame(timeout=1) as frame:
+            ia.pending = 2
+            ia.all_fetched.clear()
+            assert ia.all_fetched.wait(1)
+            assert frame.frame_id == 0
+            np.testing.assert_array_equal(frame.components[0].data, 0)
+    assert grabber.dropped == 2
+
+
+def test_stop_without_frames_returns_quickly():
+    ia = FakeAcquirer()
+    grabber = FrameGrabber(ia)
+    grabber.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    grabber.stop()
+    assert time.perf_counter() - start < 5 * grabber.fetch_timeout
+    assert not grabber._thread.is_alive()
+    assert set(ia.timeouts) == {grabber.fetch_timeout}
+
+
+def test_fetch_error_is_raised_to_the_consumer():
+    class FailingAcquirer(FakeAcquirer):
+        @contextmanager
+        def fetch(self, timeout=None):
+            raise RuntimeError("device lost")
+            yield
+
+    with FrameGrabber(FailingAcquirer()) as grabber:
+        with pytest.raises(RuntimeError, match="device lost"):
+            with grabber.next_frame(timeout=1):
+                pass
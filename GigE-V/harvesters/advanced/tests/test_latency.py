@@ -0,0 +1,104 @@
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("harvesters")
+
+from photoneo_genicam.latency import LatencyProfiler
+from photoneo_genicam.timestamp_index import ClockTracker
+
+TRIGGER_DELAY = 0.002
+EXPOSURE_DELAY = 0.010
+TRANSFER_DELAY = 0.015
+PROCESSING_DELAY = 0.005
+# Device clock ahead of the host clock
+CLOCK_OFFSET_NS = 3_000_000_000
+
+
+class FakeAcquirer:
+    """Software triggered device with fixed trigger, exposure and transfer delays."""
+
+    def __init__(self):
+        self.frame_start_ns = 0
+        self.remote_device = SimpleNamespace(
+            node_map=SimpleNamespace(TriggerSoftware=SimpleNamespace(execute=self.trigger))
+        )
+
+    def trigger(self):
+        time.sleep(TRIGGER_DELAY)
+        self.frame_start_ns = time.time_ns() + int(EXPOSURE_DELAY * 1e9)
+
+    @contextmanager
+    def fetch(self, timeout=None):
+        time.sleep(EXPOSURE_DELAY + TRANSFER_DELAY)
+        component = SimpleNamespace(data=np.zeros(16, dtype=np.float32))
+        yield SimpleNamespace(
+            payload=SimpleNamespace(components=[component]),
+            timestamp_ns=self.frame_start_ns + CLOCK_OFFSET_NS,
+        )
+
+
+def process(buffer):
+    time.sleep(PROCESSING_DELAY)
+    return len(buffer.payload.components)
+
+
+def test_stage_latencies():
+    clock = ClockTracker()
+    host_ns = time.time_ns()
+    clock.add_sample("fake", host_ns, host_ns + CLOCK_OFFSET_NS)
+    profiler = LatencyProfiler(clock, "fake")
+
+    ia = FakeAcquirer()
+    for _ in range(5):
+        assert profiler.profile_frame(ia, process) == 1
+
+    assert profiler.frames == 5
+    medians = {stage: values[50] for stage, values in profiler.percentiles_ms().items()}
+    # Sleeping takes at least the given time, give it some slack for slow machines
+    expected = {
+        "trigger": TRIGGER_DELAY,
+        "exposure": EXPOSURE_DELAY,
+        "transfer": TRANSFER_DELAY,
+        "delivery": EXPOSURE_DELAY + TRANSFER_DELAY,
+        "processing": PROCESSING_DELAY,
+        "total": TRIGGER_DELAY + EXPOSURE_DELAY + TRANSFER_DELAY + PROCESSING_DELAY,
+    }
+    for stage, seconds in expected.items():
+        assert seconds * 1000 - 1 <= medians[stage] <= seconds * 1000 + 10, stage
+    assert "transfer" in profiler.report()
+
+
+def test_hardware_trigger_without_clock():
+    # Without a trigger reference, the wait in fetch() isn't a latency
+    profiler = LatencyProfiler()
+    profiler.profile_frame(FakeAcquirer(), software_trigger=False)
+    assert set(profiler.percentiles_ms()) == {"parse", "processing"}
+    counts, edges = profiler.histogram("parse", bins=4)
+    assert counts.sum() == 1
+
+
+def test_hardware_trigger_measured_from_frame_timestamp():
+    clock = ClockTracker()
+    host_ns = time.time_ns()
+    clock.add_sample("fake", host_ns, host_ns + CLOCK_OFFSET_NS)
+    profiler = LatencyProfiler(clock, "fake")
+
+    ia = FakeAcquirer()
+    for _ in range(3):
+        # The trigger edge arrives while the host is already waiting in fetch()
+        ia.trigger()
+        time.sleep(0.05)
+        profiler.profile_frame(ia, process, software_trigger=False)
+
+    medians = {stage: values[50] for stage, values in profiler.percentiles_ms().items()}
+    # Without the trigger edge, delivery would be the same interval as transfer
+    assert set(medians) == {"transfer", "parse", "processing", "total"}
+    # Measured from the frame start, not from the start of the fetch: the frame starts during the
+    # sleep above and the fake fetch returns a transfer delay after the end of the exposure
+    transfer_ms = (0.05 + TRANSFER_DELAY) * 1000
+    assert transfer_ms - 1 <= medians["transfer"] <= transfer_ms + 10
+    assert medians["total"] >= medians["transfer"] + PROCESSING_DELAY * 1000 - 1
@@ -0,0 +1,58 @@
+import json
+import threading
+
+import pytest
+
+from photoneo_genicam.metrics import (NO_TIMING, Metrics, bucket_index, bucket_value,
+                                      percentile)
+
+
+def test_histogram_buckets_are_accurate():
+    for value in [0, 1, 15, 16, 31, 32, 1000, 123_456, 10**9, 2**62]:
+        assert bucket_value(bucket_index(value)) == pytest.approx(value, rel=1 / 16)
+
+
+def test_percentiles():
+    buckets = [0] * 1024
+    for value in range(1, 101):
+        buckets[bucket_index(value * 1000)] += 1
+    assert percentile(buckets, 100, 50) == pytest.approx(50_000, rel=1 / 16)
+    assert percentile(buckets, 100, 99) == pytest.approx(99_000, rel=1 / 16)
+
+
+def test_threads_record_into_shards(tmp_path):
+    metrics = Metrics(enabled=True)
+
+    def work():
+        for i in range(1, 1001):
+            metrics.record("stage", i * 1000)
+            metrics.count("frames")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with metrics.timer("stage"):
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["frames"] == 4000
+    stage = snapshot["timers"]["stage"]
+    assert stage["count"] == 4001
+    assert stage["max_ms"] == 1.0
+    assert stage["p50_ms"] == pytest.approx(0.5, rel=1 / 16)
+
+    metrics.export_json(tmp_path / "metrics.json")
+    assert json.loads((tmp_path / "metrics.json").read_text())["counters"]["frames"] == 4000
+
+    metrics.reset()
+    assert metrics.snapshot() == {"timers": {}, "counters": {}}
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics(enabled=False)
+    assert metrics.timer("stage") is NO_TIMING
+    metrics.record("stage", 100)
+    metrics.count("frames")
+    assert metrics.snapshot() == {"timers": {}, "counters": {}}
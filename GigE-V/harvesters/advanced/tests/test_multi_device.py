@@ -0,0 +1,155 @@
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("harvesters")
+
+from genicam.gentl import TimeoutException
+
+from photoneo_genicam.multi_device import MultiDeviceAcquirer
+
+CONFIGURE_DELAY = 0.2
+
+
+class FakeDevice:
+    """Software triggered device, which takes `delay` seconds for a frame."""
+
+    def __init__(self, serial_number: str, delay: float = 0.05, lost_frames: int = 0):
+        self.serial_number = serial_number
+        self.delay = delay
+        self.lost_frames = lost_frames
+        self.triggered = threading.Event()
+        self.trigger_time_ns = 0
+        self.started = False
+        self.remote_device = SimpleNamespace(
+            node_map=SimpleNamespace(TriggerSoftware=SimpleNamespace(execute=self.trigger))
+        )
+
+    def trigger(self):
+        self.trigger_time_ns = time.perf_counter_ns()
+        self.triggered.set()
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.started = False
+
+    def destroy(self):
+        pass
+
+    @contextmanager
+    def fetch(self, timeout=None):
+        assert self.triggered.wait(timeout)
+        self.triggered.clear()
+        time.sleep(self.delay)
+        if self.lost_frames:
+            self.lost_frames -= 1
+            raise TimeoutException()
+        component = SimpleNamespace(
+            data=np.zeros(16, dtype=np.float32),
+            width=4,
+            height=4,
+            data_format="Coord3D_C32f",
+            num_components_per_pixel=1,
+        )
+        yield SimpleNamespace(
+            payload=SimpleNamespace(components=[component]), timestamp_ns=self.trigger_time_ns
+        )
+
+
+class FakeHarvester:
+    def __init__(self, devices):
+        self.devices = {device.serial_number: device for device in devices}
+
+    def create(self, search_key):
+        return self.devices[search_key["serial_number"]]
+
+
+def configure(features):
+    time.sleep(CONFIGURE_DELAY)
+
+
+@pytest.fixture(autouse=True)
+def no_stream_reset(monkeypatch):
+    monkeypatch.setattr("photoneo_genicam.multi_device.data_stream_reset", lambda ia: None)
+
+
+def test_devices_are_configured_and_triggered_in_parallel():
+    devices = [FakeDevice(f"DEV-{i}") for i in range(6)]
+    start = time.perf_counter()
+    serial_numbers = [device.serial_number for device in devices]
+    with MultiDeviceAcquirer(FakeHarvester(devices), serial_numbers, configure):
+        assert time.perf_counter() - start < 3 * CONFIGURE_DELAY
+        assert all(device.started for device in devices)
+    assert not any(device.started for device in devices)
+
+    # The fake timestamps are taken by the trigger threads, which may be scheduled late
+    with MultiDeviceAcquirer(
+        FakeHarvester(devices), serial_numbers, tolerance_ns=20_000_000
+    ) as acquirer:
+        groups = list(acquirer.groups(3))
+    assert all(group.complete for group in groups)
+    assert len(groups[0].frames) == len(devices)
+    assert all(stats.frames == 3 for stats in acquirer.stats.values())
+    assert np.mean(acquirer.cycle_times_ms) < 3 * 1000 * devices[0].delay
+
+
+def test_lost_frames_are_counted():
+    devices = [FakeDevice("DEV-0"), FakeDevice("DEV-1", lost_frames=1)]
+    with MultiDeviceAcquirer(FakeHarvester(devices), ["DEV-0", "DEV-1"]) as acquirer:
+        group = acquirer.grab()
+        assert not group.complete
+        assert group.frames == {}
+        group = acquirer.grab()
+        assert group.complete
+        assert group.cycle == 1
+        assert group.timestamp_spread_ns < acquirer.tolerance_ns
+    assert acquirer.stats["DEV-1"].dropped == 1
+    assert acquirer.stats["DEV-1"].frames == 1
+    # The frame of DEV-0 without a partner is dropped once it can't be matched anymore
+    assert acquirer.index.matched == 1
+    assert acquirer.index.unmatched == 1
+
+
+def test_late_frames_are_held_until_matched():
+    devices = [FakeDevice("DEV-0", delay=0.0), FakeDevice("DEV-1", delay=0.0)]
+    with MultiDeviceAcquirer(FakeHarvester(devices), ["DEV-0", "DEV-1"]) as acquirer:
+        # DEV-1 delivered a frame of the same moment, but out of the trigger cycle
+        late = acquirer._frames["DEV-1"][-1]
+        late.frame_id, late.timestamp_ns = 0, 5_000
+        acquirer.index.add("DEV-0", 5_100, acquirer._frames["DEV-0"][-1])
+        acquirer.index.add("DEV-1", 5_000, late)
+        first, second = acquirer.grab(), acquirer.grab()
+    assert first.frames["DEV-1"] is late
+    assert second.complete
+    assert second.frames["DEV-0"] is not first.frames["DEV-0"]
+
+
+def test_executor_is_shut_down_when_close_fails():
+    class FailingDevice(FakeDevice):
+        def destroy(self):
+            raise RuntimeError("connection lost")
+
+    devices = [FakeDevice("DEV-0"), FailingDevice("DEV-1")]
+    acquirer = MultiDeviceAcquirer(FakeHarvester(devices), ["DEV-0", "DEV-1"])
+    acquirer.open()
+    with pytest.raises(RuntimeError):
+        acquirer.close()
+    assert acquirer.devices == {}
+    with pytest.raises(RuntimeError):
+        acquirer._executor.submit(print)
+
+
+def test_staggered_trigger():
+    devices = [FakeDevice(f"DEV-{i}", delay=0.0) for i in range(3)]
+    with MultiDeviceAcquirer(
+        FakeHarvester(devices), [d.serial_number for d in devices], stagger=0.05
+    ) as acquirer:
+        group = acquirer.grab()
+    timestamps = [group.frames[d.serial_number].timestamp_ns for d in devices]
+    assert np.all(np.diff(timestamps) >= 40_000_000)
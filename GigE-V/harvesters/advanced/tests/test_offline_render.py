@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("open3d")
+pytest.importorskip("glfw")
+
+from photoneo_genicam import visualizer
+from photoneo_genicam.visualizer import (OFFLINE_RENDER_PRESETS, BatchOfflineRenderer,
+                                         OfflineRenderParams)
+
+
+class FakeScene:
+    def __init__(self):
+        self.geometries = {}
+
+    def set_background(self, color):
+        self.background = color
+
+    def has_geometry(self, name):
+        return name in self.geometries
+
+    def remove_geometry(self, name):
+        del self.geometries[name]
+
+    def add_geometry(self, name, geometry, material):
+        assert name not in self.geometries
+        self.geometries[name] = geometry
+
+
+class FakeOffscreenRenderer:
+    created = 0
+
+    def __init__(self, width, height):
+        FakeOffscreenRenderer.created += 1
+        self.size = (width, height)
+        self.scene = FakeScene()
+        self.cameras = []
+
+    def setup_camera(self, fov, center, eye, up):
+        self.cameras.append((np.asarray(center), np.asarray(eye)))
+
+    def render_to_image(self):
+        return self.scene.geometries["pcl"]
+
+
+class FakePointCloud:
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=np.float64)
+
+    def get_axis_aligned_bounding_box(self):
+        low, high = self.points.min(axis=0), self.points.max(axis=0)
+        return SimpleNamespace(get_center=lambda: (low + high) / 2, get_extent=lambda: high - low)
+
+
+@pytest.fixture
+def written(monkeypatch):
+    images = {}
+    rendering = SimpleNamespace(
+        OffscreenRenderer=FakeOffscreenRenderer, MaterialRecord=SimpleNamespace
+    )
+    io = SimpleNamespace(
+        write_image=lambda filename, image: images.__setitem__(filename, image),
+        read_point_cloud=lambda filename: FakePointCloud([[0, 0, 1], [1, 1, 2]]),
+    )
+    monkeypatch.setattr(visualizer.o3d.visualization, "rendering", rendering, raising=False)
+    monkeypatch.setattr(visualizer.o3d, "io", io, raising=False)
+    monkeypatch.setattr(visualizer, "_shared_renderer", None)
+    FakeOffscreenRenderer.created = 0
+    return images
+
+
+def test_renderer_swaps_geometry(written):
+    clouds = [FakePointCloud([[0, 0, i], [1, 1, i + 1]]) for i in range(3)]
+    with BatchOfflineRenderer() as renderer:
+        for i, cloud in enumerate(clouds):
+            renderer.render(cloud, f"{i}.png")
+        assert list(renderer.renderer.scene.geometries) == ["pcl"]
+        assert renderer.stats.images == 3
+
+    assert FakeOffscreenRenderer.created == 1
+    assert [written[f"{i}.png"] for i in range(3)] == clouds
+
+
+def test_camera_presets(written):
+    renderer = BatchOfflineRenderer()
+    cloud = FakePointCloud([[-1, -1, 1], [1, 1, 3]])
+    fixed = OfflineRenderParams(center=(0, 0, 0), extent=10.0, distance_from_camera=1.0)
+
+    renderer.render(cloud, "front.png", OFFLINE_RENDER_PRESETS["front"])
+    renderer.render(cloud, "fixed.png", fixed)
+
+    (center, eye), (fixed_center, fixed_eye) = renderer.renderer.cameras
+    np.testing.assert_allclose(center, [0, 0, 2])
+    np.testing.assert_allclose(eye, [0, 0, 2 - 0.6 * np.sqrt(12)])
+    np.testing.assert_allclose(fixed_center, [0, 0, 0])
+    np.testing.assert_allclose(fixed_eye, [0, 0, -10])
+    with pytest.raises(Exception, match="Resolution"):
+        renderer.render(cloud, "small.png", OfflineRenderParams(width=640, height=480))
+
+
+def test_render_directory(written, tmp_path):
+    for name in ("a.ply", "b.pcd", "c.txt"):
+        (tmp_path / name).touch()
+    presets = {name: OFFLINE_RENDER_PRESETS[name] for name in ("front", "top")}
+
+    stats = BatchOfflineRenderer().render_directory(str(tmp_path), str(tmp_path / "out"), presets)
+
+    assert stats.images == 4 and stats.images_per_second > 0
+    expected = {f"{stem}_{preset}.png" for stem in "ab" for preset in presets}
+    assert {name.split("/")[-1] for name in written} == expected
+
+
+def test_pcl_offline_render_reuses_renderer(written):
+    cloud = FakePointCloud([[0, 0, 1], [1, 1, 2]])
+    for i in range(3):
+        visualizer.pcl_offline_render(cloud, f"{i}.png")
+    visualizer.pcl_offline_render(cloud, "small.png", OfflineRenderParams(width=640, height=480))
+    assert FakeOffscreenRenderer.created == 2
+    assert len(written) == 4
@@ -0,0 +1,66 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from photoneo_genicam.pipeline import ProcessingPipeline
+
+
+def scale_task(inputs, outputs, factor):
+    # Later frames finish first, the pipeline has to restore the order
+    time.sleep(0.01 * (int(inputs[0][0]) % 3))
+    np.multiply(inputs[0], factor, out=outputs[0])
+
+
+def failing_task(inputs, outputs):
+    raise ValueError("broken frame")
+
+
+def dying_task(inputs, outputs):
+    os._exit(1)
+
+
+def test_pipeline_preserves_order():
+    frames = [[np.full(16, i, dtype=np.float32)] for i in range(12)]
+    with ProcessingPipeline(
+        scale_task, [((16,), np.float32)], [((16,), np.float32)], (2.0,), num_workers=2
+    ) as pipeline:
+        results = [outputs[0][0] for outputs in pipeline.process(frames)]
+        assert pipeline.completed == len(frames)
+    assert results == [2.0 * i for i in range(12)]
+
+
+def test_pipeline_reports_task_errors():
+    with ProcessingPipeline(
+        failing_task, [((4,), np.uint8)], [((4,), np.uint8)], num_workers=1
+    ) as pipeline:
+        pipeline.submit([np.zeros(4, dtype=np.uint8)])
+        with pytest.raises(RuntimeError, match="broken frame"):
+            with pipeline.result(timeout=10):
+                pass
+
+
+def test_result_raises_when_a_worker_dies():
+    with ProcessingPipeline(
+        dying_task, [((4,), np.uint8)], [((4,), np.uint8)], num_workers=1
+    ) as pipeline:
+        pipeline.submit([np.zeros(4, dtype=np.uint8)])
+        with pytest.raises(RuntimeError, match="exited with code 1"):
+            with pipeline.result():
+                pass
+
+
+def test_submit_raises_when_all_slots_are_in_flight():
+    with ProcessingPipeline(
+        scale_task, [((4,), np.float32)], [((4,), np.float32)], (1.0,), num_workers=1, num_slots=2
+    ) as pipeline:
+        for _ in range(2):
+            pipeline.submit([np.zeros(4, dtype=np.float32)])
+        with pytest.raises(RuntimeError, match="All 2 slots are in flight"):
+            pipeline.submit([np.zeros(4, dtype=np.float32)])
+        with pytest.raises(RuntimeError, match="All 2 slots are in flight"):
+            pipeline.submit([np.zeros(4, dtype=np.float32)], timeout=0.05)
+        with pipeline.result(timeout=10):
+            pass
+        pipeline.submit([np.zeros(4, dtype=np.float32)])
@@ -0,0 +1,134 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("open3d")
+
+from photoneo_genicam.pointcloud import ValidPoints, texture_colors, texture_lut
+
+WIDTH, HEIGHT = 6, 4
+
+
+@pytest.fixture
+def frame():
+    """Range, Normal, Intensity and Confidence data of a frame, flat like the buffer data."""
+    rng = np.random.default_rng(0)
+    num_points = WIDTH * HEIGHT
+    points = rng.uniform(1, 100, (num_points, 3)).astype(np.float32)
+    points[[0, 5, 11, 17]] = 0
+    normals = rng.uniform(-1, 1, (num_points, 3)).astype(np.float32)
+    intensity = np.arange(num_points, dtype=np.uint16) * 100
+    confidence = rng.integers(0, 256, num_points, dtype=np.uint8)
+    return points.reshape(-1), normals.reshape(-1), intensity, confidence
+
+
+def test_invalid_range_points_are_masked(frame):
+    points, _, _, _ = frame
+    valid_points = ValidPoints.from_frame(points)
+    assert valid_points.num_points == WIDTH * HEIGHT
+    np.testing.assert_array_equal(
+        valid_points.indices, np.setdiff1d(np.arange(WIDTH * HEIGHT), [0, 5, 11, 17])
+    )
+
+
+def test_min_confidence_threshold(frame):
+    points, _, _, confidence = frame
+    confident = ValidPoints.from_frame(confidence=confidence, min_confidence=128)
+    np.testing.assert_array_equal(confident.indices, np.flatnonzero(confidence >= 128))
+
+    combined = ValidPoints.from_frame(points, confidence, min_confidence=128)
+    expected = np.flatnonzero((points.reshape(-1, 3)[:, 2] != 0) & (confidence >= 128))
+    np.testing.assert_array_equal(combined.indices, expected)
+
+
+def test_range_or_confidence_is_required():
+    with pytest.raises(ValueError):
+        ValidPoints.from_frame()
+
+
+def test_all_invalid_frame():
+    valid_points = ValidPoints.from_frame(np.zeros(WIDTH * HEIGHT * 3, dtype=np.float32))
+    assert len(valid_points.indices) == 0
+    assert valid_points.compact(np.ones(WIDTH * HEIGHT * 3, dtype=np.float32)).shape == (0, 3)
+    assert valid_points.compact(np.ones(WIDTH * HEIGHT, dtype=np.uint16)).shape == (0,)
+
+
+def test_compacted_components_stay_aligned(frame):
+    points, normals, intensity, confidence = frame
+    valid_points = ValidPoints.from_frame(points, confidence, min_confidence=50)
+
+    compact_points = valid_points.compact(points)
+    compact_normals = valid_points.compact(normals)
+    compact_intensity = valid_points.compact(intensity)
+
+    assert compact_points.shape == compact_normals.shape == (len(valid_points.indices), 3)
+    assert compact_intensity.shape == (len(valid_points.indices),)
+    assert np.all(compact_points[:, 2] != 0)
+    # Every row still belongs to the same pixel in all components
+    for row, pixel in enumerate(valid_points.indices):
+        np.testing.assert_array_equal(compact_points[row], points.reshape(-1, 3)[pixel])
+        np.testing.assert_array_equal(compact_normals[row], normals.reshape(-1, 3)[pixel])
+        assert compact_intensity[row] == intensity[pixel]
+
+
+def texture(data_format: str, seed=0) -> SimpleNamespace:
+    rng = np.random.default_rng(seed)
+    num_points = WIDTH * HEIGHT
+    if data_format == "RGB8":
+        data = rng.integers(0, 256, num_points * 3, dtype=np.uint8)
+        return SimpleNamespace(data=data, data_format=data_format)
+    levels = {"Mono10": 1024, "Mono12": 4096, "Mono16": 65536}[data_format]
+    data = rng.integers(0, levels, num_points, dtype=np.uint16)
+    data[:2] = (0, levels - 1)
+    return SimpleNamespace(data=data, data_format=data_format)
+
+
+def reference_colors(texture: SimpleNamespace) -> np.ndarray:
+    # The float64 normalisation map_texture used before the lookup tables
+    if texture.data_format == "RGB8":
+        return texture.data.reshape(-1, 3).astype(np.float64) / 255.0
+    levels = {"Mono10": 1024.0, "Mono12": 4096.0, "Mono16": 65536.0}[texture.data_format]
+    normalized = texture.data.reshape(-1, 1).astype(np.float64) / levels
+    return np.repeat(normalized, 3, axis=-1)
+
+
+@pytest.mark.parametrize("data_format", ["Mono10", "Mono12", "Mono16", "RGB8"])
+def test_texture_colors_match_the_float64_normalisation(data_format):
+    image = texture(data_format)
+    reference = reference_colors(image)
+    np.testing.assert_array_equal(texture_colors(image, np.float64), reference)
+    np.testing.assert_allclose(texture_colors(image, np.float32), reference, rtol=1e-6)
+    assert texture_lut(data_format, np.float64).flags.writeable is False
+
+
+@pytest.mark.parametrize("data_format", ["Mono10", "Mono12", "Mono16", "RGB8"])
+def test_texture_colors_uint8(data_format):
+    image = texture(data_format)
+    colors = texture_colors(image, np.uint8)
+    assert colors.dtype == np.uint8
+    assert colors.shape == (WIDTH * HEIGHT, 3)
+    np.testing.assert_allclose(colors, reference_colors(image) * 256, atol=1.0)
+    # The colors outlive the buffer, which is reused by the driver after the fetch
+    assert not np.shares_memory(colors, image.data)
+
+
+@pytest.mark.parametrize("data_format", ["Mono12", "RGB8"])
+@pytest.mark.parametrize("dtype", [np.float32, np.uint8])
+def test_texture_colors_into_out(data_format, dtype):
+    image = texture(data_format)
+    out = np.empty((WIDTH * HEIGHT, 3), dtype=dtype)
+    assert texture_colors(image, dtype, out=out) is out
+    np.testing.assert_array_equal(out, texture_colors(image, dtype))
+    assert not np.shares_memory(out, image.data)
+
+
+@pytest.mark.parametrize("data_format", ["Mono16", "RGB8"])
+@pytest.mark.parametrize("dtype", [np.float64, np.uint8])
+def test_texture_colors_of_valid_points(frame, data_format, dtype):
+    points = frame[0]
+    valid_points = ValidPoints.from_frame(points)
+    image = texture(data_format)
+    colors = texture_colors(image, dtype, valid_points=valid_points)
+    np.testing.assert_array_equal(colors, texture_colors(image, dtype)[valid_points.indices])
+    assert not np.shares_memory(colors, image.data)
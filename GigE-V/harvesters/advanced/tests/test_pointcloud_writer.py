@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from photoneo_genicam.pointcloud_writer import write_pcd, write_ply
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(1.0, 1000.0, size=(1000, 3)).astype(np.float32)
+    points[::3] = 0.0
+    normals = rng.uniform(-1.0, 1.0, size=(1000, 3)).astype(np.float32)
+    intensity = rng.integers(0, 1 << 12, size=1000, dtype=np.uint16)
+    confidence = rng.integers(0, 256, size=1000, dtype=np.uint8)
+    return points.reshape(-1), normals.reshape(-1), intensity, confidence
+
+
+def read_binary(filename, end_of_header: bytes, dtype) -> np.ndarray:
+    content = open(filename, "rb").read()
+    body = content[content.index(end_of_header) + len(end_of_header) :]
+    return np.frombuffer(body, dtype=dtype)
+
+
+PLY_DTYPE = [(n, "<f4") for n in ("x", "y", "z", "nx", "ny", "nz")] + [
+    ("intensity", "<u2"),
+    ("confidence", "u1"),
+]
+
+
+@pytest.mark.parametrize("skip_invalid", [False, True])
+def test_write_ply(tmp_path, frame, skip_invalid):
+    points, normals, intensity, confidence = frame
+    filename = tmp_path / "cloud.ply"
+    count = write_ply(filename, points, normals, intensity, confidence, skip_invalid, chunk_size=64)
+
+    valid = points.reshape(-1, 3)[:, 2] != 0 if skip_invalid else slice(None)
+    records = read_binary(filename, b"end_header\n", PLY_DTYPE)
+    assert count == len(records) == len(points.reshape(-1, 3)[valid])
+    assert f"element vertex {count}\n".encode() in open(filename, "rb").read()
+    np.testing.assert_array_equal(
+        np.stack([records["x"], records["y"], records["z"]], axis=-1), points.reshape(-1, 3)[valid]
+    )
+    np.testing.assert_array_equal(records["nz"], normals.reshape(-1, 3)[valid, 2])
+    np.testing.assert_array_equal(records["intensity"], intensity[valid])
+    np.testing.assert_array_equal(records["confidence"], confidence[valid])
+
+
+def test_write_pcd_packs_rgb(tmp_path, frame):
+    points = frame[0]
+    colors = np.random.default_rng(1).integers(0, 256, size=points.size, dtype=np.uint8)
+    filename = tmp_path / "cloud.pcd"
+    write_pcd(filename, points, intensity=colors)
+
+    records = read_binary(
+        filename, b"DATA binary\n", [("x", "<f4"), ("y", "<f4"), ("z", "<f4"), ("rgb", "<u4")]
+    )
+    rgb = colors.reshape(-1, 3).astype(np.uint32)
+    np.testing.assert_array_equal(records["rgb"], (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2])
+    assert b"FIELDS x y z rgb\n" in open(filename, "rb").read()
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from photoneo_genicam.raw_dump import (HEADER_SIZE, RawDumpHeader, create_raw_dump,
+                                       dump_component, read_raw_dump, read_raw_dump_header,
+                                       write_raw_dump)
+
+
+@pytest.fixture
+def range_component():
+    data = np.random.default_rng(0).random(4 * 3 * 3, dtype=np.float32)
+    return SimpleNamespace(
+        data=data, width=4, height=3, data_format="Coord3D_ABC32f", num_components_per_pixel=3
+    )
+
+
+def test_dump_roundtrip(tmp_path, range_component):
+    filename = str(tmp_path / "range.raw")
+    dump_component(filename, range_component, timestamp_ns=123456789)
+
+    header, data = read_raw_dump(filename)
+
+    assert header == RawDumpHeader(4, 3, "Coord3D_ABC32f", "<f4", 3, 123456789)
+    np.testing.assert_array_equal(data, range_component.data.reshape(3, 4, 3))
+    assert (tmp_path / "range.raw").stat().st_size == HEADER_SIZE + range_component.data.nbytes
+
+
+def test_create_raw_dump_fills_memory_map(tmp_path):
+    filename = str(tmp_path / "intensity.raw")
+    header = RawDumpHeader(5, 2, "Mono12", "<u2", timestamp_ns=7)
+    image = np.arange(10, dtype=np.uint16).reshape(2, 5, 1)
+
+    dump = create_raw_dump(filename, header)
+    np.copyto(dump, image)
+    dump.flush()
+    del dump
+
+    assert read_raw_dump_header(filename) == header
+    np.testing.assert_array_equal(read_raw_dump(filename)[1], image)
+
+
+def test_write_raw_dump_checks_size(tmp_path):
+    header = RawDumpHeader(4, 4, "Mono16", "<u2")
+    with pytest.raises(Exception, match="doesn't match"):
+        write_raw_dump(str(tmp_path / "short.raw"), header, np.zeros(8, dtype=np.uint16))
+
+
+def test_read_rejects_files_without_header(tmp_path, range_component):
+    filename = str(tmp_path / "range.dat")
+    range_component.data.tofile(filename)
+    np.testing.assert_array_equal(np.fromfile(filename, dtype=np.float32), range_component.data)
+    with pytest.raises(Exception, match="header is missing"):
+        read_raw_dump(filename)
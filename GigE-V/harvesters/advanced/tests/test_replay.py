@@ -0,0 +1,70 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("harvesters")
+
+from genicam.gentl import TimeoutException
+
+from photoneo_genicam.grabber import FrameGrabber
+from photoneo_genicam.replay import FrameRecorder, ReplayAcquirer
+
+
+def fake_buffer(index: int) -> SimpleNamespace:
+    points = np.full(4 * 4 * 3, index, dtype=np.float32)
+    intensity = np.full(4 * 4, index, dtype=np.uint16)
+    components = [
+        SimpleNamespace(
+            data=points, width=4, height=4, data_format="Coord3D_ABC32f", num_components_per_pixel=3
+        ),
+        SimpleNamespace(
+            data=intensity, width=4, height=4, data_format="Mono12", num_components_per_pixel=1
+        ),
+    ]
+    return SimpleNamespace(payload=SimpleNamespace(components=components), timestamp_ns=index * 100)
+
+
+@pytest.fixture
+def recording(tmp_path):
+    with FrameRecorder(tmp_path, ["Range", "Intensity"]) as recorder:
+        for index in range(3):
+            matrix = np.eye(4) * (index + 1)
+            recorder.record(fake_buffer(index), {"TransformationMatrix": matrix})
+    return tmp_path
+
+
+def test_replay_roundtrip(recording):
+    with ReplayAcquirer(recording) as ia:
+        assert len(ia) == 3
+        assert ia.component_names == ["Range", "Intensity"]
+        ia.start()
+        for index in range(3):
+            with ia.fetch() as buffer:
+                points, intensity = buffer.payload.components
+                assert buffer.timestamp_ns == index * 100
+                assert isinstance(points.data, np.memmap)
+                expected = fake_buffer(index).payload.components[0].data
+                np.testing.assert_array_equal(points.data, expected)
+                assert intensity.data_format == "Mono12"
+                assert intensity.data.dtype == np.uint16
+                matrix = ia.remote_device.node_map.TransformationMatrix.value
+                assert matrix[0][0] == index + 1
+        with pytest.raises(TimeoutException):
+            with ia.fetch():
+                pass
+        assert ia.statistics.num_images == 3
+
+
+def test_replay_rate_and_loop(recording):
+    ia = ReplayAcquirer(recording, fps=50, loop=True)
+    ia.start()
+    start = time.perf_counter()
+    with FrameGrabber(ia) as grabber:
+        frame_ids = []
+        for _ in range(10):
+            with grabber.next_frame(timeout=1) as frame:
+                frame_ids.append(int(frame.components[1].data[0]))
+    assert time.perf_counter() - start >= 9 / 50
+    assert frame_ids == [0, 1, 2] * 3 + [0]
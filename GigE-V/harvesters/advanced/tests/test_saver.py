@@ -0,0 +1,105 @@
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from photoneo_genicam import saver as saver_module
+from photoneo_genicam.raw_dump import read_raw_dump
+from photoneo_genicam.saver import ComponentSaver
+
+
+def component(data: np.ndarray, data_format: str, width=4, height=3, channels=1):
+    return SimpleNamespace(
+        data=data,
+        width=width,
+        height=height,
+        data_format=data_format,
+        num_components_per_pixel=channels,
+    )
+
+
+@pytest.fixture
+def components():
+    rng = np.random.default_rng(0)
+    return [
+        ("Intensity", component(rng.integers(0, 1024, 12, dtype=np.uint16), "Mono10")),
+        ("Confidence", component(rng.integers(0, 256, 12, dtype=np.uint8), "Confidence8")),
+        ("ColorCamera", component(rng.integers(0, 256, 36, dtype=np.uint8), "RGB8", channels=3)),
+        ("Range", component(rng.random(36, dtype=np.float32), "Coord3D_ABC32f", channels=3)),
+    ]
+
+
+def test_saves_images_and_raw_components(tmp_path, components):
+    originals = {name: part.data.copy() for name, part in components}
+    with ComponentSaver(str(tmp_path), png_compression=1) as saver:
+        saver.save(components, timestamp_ns=42)
+        # The buffer can be reused as soon as save() returns
+        for _, part in components:
+            part.data[:] = 0
+
+    intensity = cv2.imread(str(tmp_path / "Intensity_Mono10.png"), cv2.IMREAD_UNCHANGED)
+    np.testing.assert_array_equal(intensity, (originals["Intensity"] << 6).reshape(3, 4))
+    confidence = cv2.imread(str(tmp_path / "Confidence_Confidence8.png"), cv2.IMREAD_UNCHANGED)
+    np.testing.assert_array_equal(confidence, originals["Confidence"].reshape(3, 4))
+    color = cv2.imread(str(tmp_path / "ColorCamera_RGB8.png"))
+    np.testing.assert_array_equal(color[..., ::-1], originals["ColorCamera"].reshape(3, 4, 3))
+    header, range_data = read_raw_dump(str(tmp_path / "Range_Coord3D_ABC32f.raw"))
+    assert header.timestamp_ns == 42
+    np.testing.assert_array_equal(range_data, originals["Range"].reshape(3, 4, 3))
+
+    stats = saver.statistics()
+    assert (stats.frames, stats.components) == (1, 4)
+    assert stats.bytes_written > 0 and stats.frames_per_second > 0
+
+
+@pytest.mark.parametrize("raw_format", ["npy", "npz"])
+def test_raw_formats(tmp_path, components, raw_format):
+    with ComponentSaver(str(tmp_path), raw_format=raw_format, image_format=raw_format) as saver:
+        saver.save(components, suffix="_0001")
+
+    intensity = np.load(tmp_path / f"Intensity_Mono10_0001.{raw_format}")
+    range_data = np.load(tmp_path / f"Range_Coord3D_ABC32f_0001.{raw_format}")
+    if raw_format == "npz":
+        intensity, range_data = intensity["data"], range_data["data"]
+    np.testing.assert_array_equal(intensity, components[0][1].data.reshape(3, 4, 1))
+    np.testing.assert_array_equal(range_data, components[3][1].data.reshape(3, 4, 3))
+
+
+def test_save_blocks_when_writers_fall_behind(tmp_path, components, monkeypatch):
+    release = threading.Event()
+    original_write = ComponentSaver._write_frame
+
+    def slow_write(self, copies, suffix):
+        release.wait(5)
+        original_write(self, copies, suffix)
+
+    monkeypatch.setattr(ComponentSaver, "_write_frame", slow_write)
+    saver = ComponentSaver(str(tmp_path), max_workers=1, max_pending=2)
+    for i in range(2):
+        saver.save(components[:1], suffix=f"_{i}")
+
+    blocked = threading.Thread(target=saver.save, args=(components[:1], "_2"))
+    blocked.start()
+    blocked.join(0.2)
+    assert blocked.is_alive()
+
+    release.set()
+    blocked.join(5)
+    saver.close()
+    assert saver.statistics().frames == 3
+
+
+def test_write_errors_are_raised(tmp_path, components, monkeypatch):
+    monkeypatch.setattr(saver_module.cv2, "imwrite", lambda *args: False)
+    saver = ComponentSaver(str(tmp_path))
+    saver.save(components[:1])
+    with pytest.raises(Exception, match="Failed to write"):
+        saver.close()
+
+
+def test_unknown_formats(tmp_path):
+    with pytest.raises(Exception, match="Unknown raw format"):
+        ComponentSaver(str(tmp_path), raw_format="tiff")
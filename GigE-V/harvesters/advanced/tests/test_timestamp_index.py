@@ -0,0 +1,69 @@
+import pytest
+
+from photoneo_genicam.timestamp_index import ClockTracker, TimestampIndex
+
+EPOCH_NS = 1_760_000_000_000_000_000
+
+
+def test_frames_are_matched_by_nearest_timestamp():
+    index = TimestampIndex(["A", "B", "C"], tolerance_ns=100)
+    for timestamp in (1000, 2000, 3000):
+        index.add("A", timestamp, f"A{timestamp}")
+        index.add("B", timestamp + 30, f"B{timestamp}")
+    # Out of order and one frame which matches nothing
+    for timestamp in (2010, 1005, 1500, 3500):
+        index.add("C", timestamp, f"C{timestamp}")
+
+    sets = index.match()
+    assert [{device: frame for device, (_, frame) in s.items()} for s in sets] == [
+        {"A": "A1000", "B": "B1000", "C": "C1005"},
+        {"A": "A2000", "B": "B2000", "C": "C2010"},
+    ]
+    # C1500 can't be matched anymore, A3000 neither since C3500 is already newer
+    assert index.matched == 2
+    assert index.unmatched == 2
+    assert len(index) == 2
+
+
+def test_incomplete_sets_wait_for_frames():
+    index = TimestampIndex(["A", "B"], tolerance_ns=100)
+    index.add("A", 1000)
+    assert index.match() == []
+    index.add("B", 950)
+    assert len(index.match()) == 1
+
+
+def test_clock_offset_and_drift():
+    clock = ClockTracker()
+    for i in range(5):
+        host_ns = EPOCH_NS + i * 1_000_000_000
+        # 5 ms ahead of the host and 20 us faster every second
+        clock.add_sample("A", host_ns, host_ns + 5_000_000 + i * 20_000)
+
+    assert clock.drift_ppm("A") == pytest.approx(20)
+    assert clock.offset_ns("A", EPOCH_NS) == 5_000_000
+    assert clock.offset_ns("A", EPOCH_NS + 10_000_000_000) == 5_200_000
+    assert clock.to_host_ns("A", EPOCH_NS + 3_000_000_000 + 5_060_000) == EPOCH_NS + 3_000_000_000
+
+
+def test_index_converts_device_time_with_clock():
+    clock = ClockTracker()
+    clock.add_sample("A", EPOCH_NS, EPOCH_NS)
+    clock.add_sample("B", EPOCH_NS, EPOCH_NS + 7_000_000)
+    index = TimestampIndex(["A", "B"], tolerance_ns=1000, clock=clock)
+    index.add("A", EPOCH_NS + 500)
+    index.add("B", EPOCH_NS + 7_000_700)
+    assert len(index.match()) == 1
+
+
+def test_clock_fit_is_cached_between_samples(monkeypatch):
+    clock = ClockTracker()
+    for i in range(3):
+        clock.add_sample("A", EPOCH_NS + i * 1_000_000_000, EPOCH_NS + i * 1_000_000_100 + 500)
+    fits = []
+    monkeypatch.setattr(ClockTracker, "_fit", lambda self, device: fits.append(device))
+    for i in range(100):
+        clock.to_host_ns("A", EPOCH_NS + i)
+        clock.offset_ns("A")
+    clock.drift_ppm("A")
+    assert fits == []
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("open3d")
+
+from photoneo_genicam.pointcloud import (ProjectedCReconstructor, construct_coordinate_map,
+                                         transform_points)
+
+
+@pytest.fixture
+def transformation_matrix() -> np.ndarray:
+    angle = 0.3
+    matrix = np.eye(4)
+    matrix[:3, :3] = [
+        [np.cos(angle), -np.sin(angle), 0],
+        [np.sin(angle), np.cos(angle), 0],
+        [0, 0, 1],
+    ]
+    matrix[:3, 3] = [10, -20, 30]
+    return matrix
+
+
+@pytest.fixture
+def depth_map() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    depth = rng.uniform(500, 1500, size=1000).astype(np.float32)
+    depth[::4] = 0
+    return depth
+
+
+@pytest.fixture
+def reconstructor() -> ProjectedCReconstructor:
+    rng = np.random.default_rng(1)
+    u, v = rng.random((2, 1000), dtype=np.float32)
+    return ProjectedCReconstructor(construct_coordinate_map(u, v, 2.0, 1.0, 0.5, 0.5))
+
+
+def reference_transform(points, matrix):
+    transformed = points @ matrix[:3, :3].T + matrix[:3, 3]
+    transformed[points[:, 2] == 0] = 0
+    return transformed
+
+
+def test_transform_points_keeps_invalid_points(reconstructor, depth_map, transformation_matrix):
+    points = reconstructor.reconstruct(depth_map).copy()
+    out = np.empty_like(points)
+    assert transform_points(points.reshape(-1), transformation_matrix, out) is out
+    np.testing.assert_allclose(out, reference_transform(points, transformation_matrix), atol=1e-3)
+
+
+def test_transform_points_in_place_keeps_invalid_points(
+    reconstructor, depth_map, transformation_matrix
+):
+    points = reconstructor.reconstruct(depth_map).copy()
+    expected = reference_transform(points, transformation_matrix)
+    assert transform_points(points, transformation_matrix, points) is points
+    np.testing.assert_allclose(points, expected, atol=1e-3)
+
+
+def test_transform_points_in_place_masks_the_input_points():
+    # Rotates the second point onto z == 0, it still has to be translated
+    angle = np.pi / 4
+    matrix = np.eye(4)
+    matrix[:3, :3] = [
+        [np.cos(angle), 0, np.sin(angle)],
+        [0, 1, 0],
+        [-np.sin(angle), 0, np.cos(angle)],
+    ]
+    matrix[:3, 3] = [10, -20, 30]
+    points = np.array([[0, 0, 0], [1, 2, 1], [5, 2, 3]], dtype=np.float32)
+    expected = reference_transform(points, matrix)
+    assert transform_points(points, matrix, points) is points
+    np.testing.assert_allclose(points, expected, atol=1e-5)
+
+
+def test_fused_reconstruction_matches_transform(reconstructor, depth_map, transformation_matrix):
+    points = reconstructor.reconstruct(depth_map).copy()
+    reconstructor.set_transformation(transformation_matrix)
+    np.testing.assert_allclose(
+        reconstructor.reconstruct(depth_map),
+        reference_transform(points, transformation_matrix),
+        atol=1e-3,
+    )
+
+    reconstructor.set_transformation(None)
+    np.testing.assert_array_equal(reconstructor.reconstruct(depth_map), points)
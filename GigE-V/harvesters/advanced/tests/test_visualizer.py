@@ -0,0 +1,122 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("open3d")
+pytest.importorskip("glfw")
+
+from photoneo_genicam.visualizer import (ThreadedPCLRenderer, VisualisationConverter,
+                                          process_for_visualisation)
+
+
+def test_renderer_takes_only_the_latest_frame():
+    renderer = ThreadedPCLRenderer()
+    points = np.zeros((10, 3), dtype=np.float32)
+    for i in range(3):
+        points[:] = i
+        renderer.update(points)
+    # The caller may reuse its array right after update()
+    points[:] = -1
+
+    latest = renderer._take_latest()
+    np.testing.assert_array_equal(latest, 2)
+    assert renderer._take_latest() is None
+    assert (renderer.submitted, renderer.skipped) == (3, 2)
+
+
+def test_renderer_doesnt_overwrite_the_rendered_frame():
+    renderer = ThreadedPCLRenderer()
+    renderer.update(np.full((10, 3), 1, dtype=np.float32))
+    rendered = renderer._take_latest()
+    for i in range(2, 5):
+        renderer.update(np.full(30, i, dtype=np.float32))
+    np.testing.assert_array_equal(rendered, 1)
+    np.testing.assert_array_equal(renderer._take_latest(), 4)
+
+
+def test_renderer_runs_on_the_calling_thread(monkeypatch):
+    renderer = ThreadedPCLRenderer()
+    render_threads = []
+
+    def fake_run():
+        # Stands in for the GLFW loop, which has to run on the main thread
+        render_threads.append(threading.current_thread())
+        while not renderer.should_close:
+            renderer._take_latest()
+            time.sleep(0.001)
+
+    def acquire():
+        for i in range(3):
+            renderer.update(np.full((10, 3), i, dtype=np.float32))
+        raise RuntimeError("device lost")
+
+    monkeypatch.setattr(renderer, "run", fake_run)
+    with pytest.raises(RuntimeError, match="device lost"):
+        renderer.run_with(acquire)
+    assert render_threads == [threading.main_thread()]
+    assert renderer.should_close
+    assert renderer.submitted == 3
+
+
+def reference_visualisation(data: np.ndarray, data_format: str, width: int, height: int):
+    # The conversions of the original per-call process_for_visualisation, except for the normals
+    # which now use the fixed [-1, 1] range
+    if data_format in ("Mono10", "Mono12"):
+        shift = 16 - int(data_format[4:])
+        return (data.astype(np.uint16) << shift).reshape(height, width, 1)
+    if data_format in ("Confidence8", "Mono16"):
+        return data.reshape(height, width, 1)
+    if data_format == "RGB8":
+        return data.reshape(height, width, 3)[..., ::-1]
+    return np.round(data.reshape(height, width, 3) * 127.5 + 127.5).clip(0, 255)
+
+
+@pytest.mark.parametrize(
+    "data_format, dtype, channels",
+    [
+        ("Mono10", np.uint16, 1),
+        ("Mono12", np.uint16, 1),
+        ("Mono16", np.uint16, 1),
+        ("Confidence8", np.uint8, 1),
+        ("RGB8", np.uint8, 3),
+        ("Coord3D_ABC32f", np.float32, 3),
+    ],
+)
+def test_converter_reuses_its_output(data_format, dtype, channels):
+    width, height = 6, 4
+    converter = VisualisationConverter(data_format, width, height)
+    rng = np.random.default_rng(0)
+    for _ in range(2):
+        if dtype == np.float32:
+            data = rng.uniform(-1, 1, width * height * channels).astype(dtype)
+        else:
+            data = rng.integers(0, 1 << 10, width * height * channels).astype(dtype)
+        image = SimpleNamespace(data=data, data_format=data_format, width=width, height=height)
+
+        converted = converter(image)
+
+        assert converted is converter.output
+        expected = reference_visualisation(data, data_format, width, height)
+        np.testing.assert_allclose(converted, expected, atol=1)
+        np.testing.assert_array_equal(process_for_visualisation(image), converted)
+
+
+def test_converter_rejects_unknown_format():
+    with pytest.raises(Exception, match="Unexpected pixel format"):
+        VisualisationConverter("BayerRG8", 4, 4)
+
+
+def test_converter_colors_depth():
+    depth = np.linspace(0, 1000, 24, dtype=np.float32)
+    image = SimpleNamespace(data=depth, data_format="Coord3D_C32f", width=6, height=4)
+    converter = VisualisationConverter.for_image(image)
+
+    converted = converter(image)
+
+    assert converted is converter.output
+    assert converted.shape == (4, 6, 3) and converted.dtype == np.uint8
+    np.testing.assert_array_equal(converted[0, 0], 0)
+    assert converted[1:].any()
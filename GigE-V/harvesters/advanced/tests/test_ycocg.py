@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from photoneo_genicam.ycocg import NUMBA_AVAILABLE, ycocg_to_rgb, ycocg_to_rgb_numpy
+
+# 10-bit Y in the upper bits of a uint16 pixel, 6-bit chroma halves in the lower ones
+Y_SHIFT, CHROMA_MASK = 6, 0x3F
+DELTA, MAX_VALUE = 512, 1023
+
+
+def reference_rgb(ycocg_img: np.ndarray) -> np.ndarray:
+    """Per-pixel conversion of a uint16 image, the same as pixel_rgb of ycocg_color_convert."""
+    img = ycocg_img.astype(np.int64)
+    rgb = np.zeros((*img.shape, 3), dtype=np.uint16)
+    for row in range(0, img.shape[0], 2):
+        for col in range(0, img.shape[1], 2):
+            co = ((img[row, col] & CHROMA_MASK) << Y_SHIFT) + (img[row, col + 1] & CHROMA_MASK)
+            cg = ((img[row + 1, col] & CHROMA_MASK) << Y_SHIFT) + (
+                img[row + 1, col + 1] & CHROMA_MASK
+            )
+            for r, c in ((row, col), (row, col + 1), (row + 1, col), (row + 1, col + 1)):
+                y = img[r, c] >> Y_SHIFT
+                if y == 0:
+                    continue
+                r1, g1, b1, b2 = 2 * y + co, y + cg // 2, y + 2 * DELTA, (co + cg) // 2
+                rgb[r, c] = (
+                    min((r1 - cg) // 2 if r1 > cg else 0, MAX_VALUE),
+                    min(g1 - DELTA if g1 > DELTA else 0, MAX_VALUE),
+                    min(b1 - b2 if b1 > b2 else 0, MAX_VALUE),
+                )
+    return rgb
+
+
+@pytest.fixture
+def ycocg_image() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 1 << 16, size=(38, 52), dtype=np.uint16)
+    # Include pixels with Y == 0, they are black regardless of the chroma
+    image[rng.random(image.shape) < 0.05] &= 0x3F
+    return image
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba is not installed")
+def test_ycocg_to_rgb_numba_matches_reference(ycocg_image):
+    np.testing.assert_array_equal(ycocg_to_rgb(ycocg_image), reference_rgb(ycocg_image))
+
+
+def test_ycocg_to_rgb_numpy_matches_reference(ycocg_image):
+    out = np.empty((*ycocg_image.shape, 3), dtype=np.uint16)
+    np.testing.assert_array_equal(ycocg_to_rgb_numpy(ycocg_image, out), reference_rgb(ycocg_image))
+
+
+def test_ycocg_to_rgb_writes_into_out(ycocg_image):
+    out = np.empty((*ycocg_image.shape, 3), dtype=np.uint16)
+    assert ycocg_to_rgb(ycocg_image, out) is out
+
+
+def test_ycocg_to_rgb_matches_the_example(ycocg_image):
+    pytest.importorskip("harvesters")
+    pytest.importorskip("genicam")
+    pytest.importorskip("cv2")
+    pytest.importorskip("numba")
+    from ycocg_color_convert import convert_to_rgb
+
+    np.testing.assert_array_equal(ycocg_to_rgb(ycocg_image), convert_to_rgb(ycocg_image))
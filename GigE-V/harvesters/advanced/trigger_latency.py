@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+import sys
+from pathlib import Path
+
+from genicam.genapi import NodeMap
+from harvesters.core import Buffer, Harvester
+
+from photoneo_genicam.components import enable_components
+from photoneo_genicam.default_gentl_producer import producer_path
+from photoneo_genicam.features import enable_software_trigger
+from photoneo_genicam.latency import LatencyProfiler
+from photoneo_genicam.pointcloud import as_point_array
+from photoneo_genicam.timestamp_index import ClockTracker
+from photoneo_genicam.user_set import load_default_user_set
+from photoneo_genicam.utils import data_stream_reset, logger
+
+
+def count_valid_points(buffer: Buffer) -> int:
+    points = as_point_array(buffer.payload.components[0].data)
+    return int((points[:, 2] != 0).sum())
+
+
+def main(device_sn: str, frames: int = 50):
+    with Harvester() as h:
+        h.add_file(str(producer_path), check_existence=True, check_validity=True)
+        h.update()
+
+        logger.info(f"Connecting to: {device_sn}")
+        with h.create({"serial_number": device_sn}) as ia:
+            features: NodeMap = ia.remote_device.node_map
+
+            load_default_user_set(features)
+            enable_software_trigger(features)
+            enable_components(features, ["Range"])
+
+            # Correlates the device timestamps of the frames with the host clock
+            clock = ClockTracker()
+            profiler = LatencyProfiler(clock, device_sn)
+
+            data_stream_reset(ia)
+            ia.start()
+            for _ in range(frames):
+                clock.latch(device_sn, features)
+                valid_points: int = profiler.profile_frame(ia, count_valid_points)
+                logger.debug(f"Valid points: {valid_points}")
+
+            logger.info(profiler.report())
+
+
+if __name__ == "__main__":
+    try:
+        device_id = sys.argv[1]
+    except IndexError:
+        print("Error: no device given, please run it with the device serial number as argument:")
+        print(f"    {Path(__file__).name} <device serial> [<number of frames>]")
+        sys.exit(1)
+    main(device_id, *map(int, sys.argv[2:3]))
@@ -14,11 +14,14 @@ from photoneo_genicam.features import enable_software_trigger
 from photoneo_genicam.user_set import load_default_user_set
 from photoneo_genicam.utils import (data_stream_reset, logger, logging,
                                     measure_time)
+from photoneo_genicam.ycocg import ycocg_to_rgb
 
 numba_logger = logging.getLogger("numba")
 numba_logger.setLevel(logging.WARNING)
 
 
+# Straightforward per-pixel implementation of the conversion, kept as a reference.
+# The example uses the parallel photoneo_genicam.ycocg.ycocg_to_rgb, which gives identical results.
 @jit(nopython=True)
 def pixel_rgb(y: int, co: int, cg: int) -> np.ndarray:
     pixel_depth = 10
@@ -103,7 +106,7 @@ def main(device_sn: str):
                 ).copy()
                 cv2.imshow("YCoCg", reshaped_ycocg)
                 logger.debug("Converting YCoCg to RGB...")
-                img = convert_to_rgb(reshaped_ycocg)
+                img = ycocg_to_rgb(reshaped_ycocg)
                 image_uint8 = cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
                 cv2.imshow("YCoCg Converted", cv2.cvtColor(image_uint8, cv2.COLOR_RGB2BGR))
 
@@ -12,9 +12,8 @@ from utils import data_stream_reset, logger
 
 
 def write_raw_array(filename: str, array):
-    with open(filename, "wb") as file:
-        for element in array:
-            file.write(element.tobytes())
+    # One write of the whole buffer, instead of one per element
+    array.tofile(filename)
 
 
 def main(device_sn: str):
@@ -61,7 +60,7 @@ def main(device_sn: str):
 
                     # Optional: Save some of the data
                     # print(f"Saving raw data to: {raw_data_name}")
-                    # write_raw_array(raw_data_name, component.data.copy())
+                    # write_raw_array(raw_data_name, component.data)
 
 
 if __name__ == "__main__":